@@ -1,16 +1,109 @@
-import re
-from dotenv import load_dotenv
-from langchain.prompts import ChatPromptTemplate
-from llm_lib_lag.models import LLMConfig
-from llm_lib_lag.ground_truths import GROUND_TRUTHS
-from llm_lib_lag.runner import run_single_evaluation
-from llm_lib_lag.evaluation import evaluate_runs
-from llm_lib_lag.io_utils import load_runs_from_jsonl, get_missing_runs
-from tqdm import tqdm
+import argparse
 import logging
 import logging.handlers
+import os
 from pathlib import Path
 from datetime import datetime
+from llm_lib_lag.profiling import ProfileMode, ProfileSession, profile_phase
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate LLMs on library versions")
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="DIR",
+        help="Profile the run phase by phase and write the profiles to DIR",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        type=ProfileMode,
+        choices=[mode.value for mode in ProfileMode],
+        default=ProfileMode.DETERMINISTIC,
+        help="cProfile (exact call counts) or stack sampling (low overhead)",
+    )
+    parser.add_argument(
+        "--initial-concurrency",
+        type=float,
+        default=2,
+        help="Concurrent calls per provider at start; adapts to rate limits "
+        "(default: 2)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=16,
+        help="Upper bound of the concurrent calls per provider (default: 16)",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        metavar="DB",
+        help="Drain the sweep from a shared SQLite work queue, created if "
+        "needed; start any number of workers with the same DB",
+    )
+    parser.add_argument(
+        "--worker-id",
+        help="Name of this worker in the queue (default: host name and pid)",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=300,
+        help="Time after which the tasks of a silent worker are handed to "
+        "another one (default: 300)",
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        metavar="P",
+        help="Duplicate LLM calls slower than the P-th latency percentile of "
+        "their LLM in the stored runs, keeping the first answer",
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=0.05,
+        help="Maximum ratio of duplicated calls to calls (default: 0.05)",
+    )
+    return parser.parse_args()
+
+
+# Started before the heavy imports below, so their cost shows in the profile
+ARGS = parse_args() if __name__ == "__main__" else None
+PROFILE = (
+    ProfileSession(ARGS.profile, ARGS.profile_mode).start()
+    if ARGS is not None and ARGS.profile
+    else None
+)
+
+with profile_phase("startup"):
+    from dotenv import load_dotenv
+    from langchain_core.prompts import ChatPromptTemplate
+    from llm_lib_lag.models import (
+        EvaluationRun,
+        LLMConfig,
+        RunStatus,
+        SimulationConfig,
+    )
+    from llm_lib_lag.ground_truths import load_ground_truths
+    from llm_lib_lag.runner import run_single_evaluation
+    from llm_lib_lag.concurrency import AdaptiveExecutor
+    from llm_lib_lag.evaluation import evaluate_runs
+    from llm_lib_lag.hedging import Hedger
+    from llm_lib_lag.aggregator import MetricsAggregator
+    from llm_lib_lag.io_utils import load_runs_from_jsonl, get_missing_runs
+    from llm_lib_lag.monitoring import start_exporters_from_env
+    from llm_lib_lag.run_writer import RunWriter
+    from llm_lib_lag.versions import VERSION_REGEX
+    from llm_lib_lag.work_queue import (
+        WorkQueue,
+        default_worker_id,
+        drain,
+        sweep_run_files,
+        worker_runs_file,
+    )
+    from tqdm import tqdm
 
 
 # ------------------------------------------------------
@@ -58,15 +151,13 @@ def setup_logging(log_level: int = logging.INFO) -> None:
     logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
-load_dotenv()
-setup_logging()
-
 logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------
 # Globals & Constants
 # ------------------------------------------------------
 RUNS_FILE = "runs.jsonl"
+SIMULATED_RUNS_FILE = "runs.simulated.jsonl"
 
 LLMS = [
     LLMConfig(provider="openai", model="gpt-4o-mini"),
@@ -86,6 +177,26 @@ LLMS = [
     LLMConfig(provider="groq", model="deepseek-r1-distill-qwen-32b"),
 ]
 
+# Offline stand-ins for benchmarking the loop: LLM_LIB_LAG_SIMULATE=1 python main.py
+SIMULATED_LLMS = [
+    LLMConfig(
+        provider="simulated",
+        model="sim-fast",
+        simulation=SimulationConfig(latency_ms=300, exact_rate=0.5, seed=1),
+    ),
+    LLMConfig(
+        provider="simulated",
+        model="sim-slow-flaky",
+        simulation=SimulationConfig(
+            latency_ms=2000,
+            tokens_per_second=80,
+            hallucination_rate=0.15,
+            error_rate=0.02,
+            seed=2,
+        ),
+    ),
+]
+
 # Reusable prompt for "latest stable version"
 VERSION_PROMPT = ChatPromptTemplate.from_messages(  # type: ignore
     [
@@ -105,43 +216,14 @@ Output your final answer for the latest version inside <answer> tags.
     ]
 )
 
-VERSION_REGEX = r"(?s)<answer>.*?(\d+\.\d+(?:\.\d+)?(?:[-.][A-Za-z0-9]+)*).*?</answer>"
-
-# Sanity check on the regex
-assert (
-    re.search(VERSION_REGEX, "<answer>3.12.1</answer>").group(  # type: ignore
-        1
-    )
-    == "3.12.1"
-)
-
-assert (
-    re.search(VERSION_REGEX, "<answer> 3.12.1 </answer>").group(  # type: ignore
-        1
-    )
-    == "3.12.1"
-)
-
-assert (
-    re.search(
-        VERSION_REGEX,
-        """<answer>
-The latest stable version of pydantic is <version>2.3.3</version>.
-</answer>""",
-    ).group(1)  # type: ignore
-    == "2.3.3"
-)
 
-assert (
-    re.search(
-        VERSION_REGEX,
-        """</thinking>
-<answer>
-FastAPI version 0.110.0
-</answer>""",
-    ).group(1)  # type: ignore
-    == "0.110.0"
-)
+def load_sweep_runs(sweep_file: str) -> list[EvaluationRun]:
+    """Runs of `sweep_file` and of the queue workers' files next to it."""
+    return [
+        run
+        for path in sweep_run_files(sweep_file)
+        for run in load_runs_from_jsonl(str(path))
+    ]
 
 
 # ------------------------------------------------------
@@ -154,42 +236,129 @@ def main() -> None:
     Usage Example:
         python main.py
     """
+    # Here rather than at import, so importing this module has no side effect
+    load_dotenv()
+    setup_logging()
     logger.info("Starting LLM version evaluation")
 
-    # Load existing runs
-    runs = load_runs_from_jsonl(RUNS_FILE)
-    logger.info(f"Loaded {len(runs)} existing runs from {RUNS_FILE}")
+    # Live metrics for alerting, if $LLM_LIB_LAG_METRICS_FILE/_PORT are set
+    metrics_file, _ = start_exporters_from_env()
 
-    # Determine which (LLM, TechVersion) combos have not yet been evaluated
-    pairs_to_run = [(llm, gt) for llm in LLMS for gt in GROUND_TRUTHS]
-    missing = get_missing_runs(pairs_to_run, runs)
-
-    if missing:
-        logger.info(f"Executing {len(missing)} new runs...")
+    # Offline stand-ins for the providers, in a sweep file of their own
+    if os.environ.get("LLM_LIB_LAG_SIMULATE"):
+        llms, sweep_file = SIMULATED_LLMS, SIMULATED_RUNS_FILE
     else:
-        logger.info("No new runs to execute.")
-
-    # Execute runs for missing pairs
-    for llm_config, ground_truth in tqdm(missing, desc="Evaluating LLMs"):
-        logger.info(f"Running {llm_config.model} for {ground_truth.tech.name}...")
-        run = run_single_evaluation(
-            llm_config=llm_config,
-            ground_truth=ground_truth,
-            prompt=VERSION_PROMPT,
-            version_regex=VERSION_REGEX,
+        llms, sweep_file = LLMS, RUNS_FILE
+
+    # With a shared queue, workers drain one sweep, each into its own file
+    work_queue = None
+    runs_file = Path(sweep_file)
+    worker_id = (ARGS.worker_id if ARGS is not None else None) or default_worker_id()
+    if ARGS is not None and ARGS.queue is not None:
+        work_queue = WorkQueue(ARGS.queue, lease_seconds=ARGS.lease_seconds)
+        runs_file = worker_runs_file(sweep_file, worker_id)
+        logger.info(f"Worker {worker_id} on queue {ARGS.queue}")
+
+    # Opening the writer first repairs a torn last record left by a killed run
+    with RunWriter(runs_file) as writer:
+        # Load existing runs, including those of the other workers
+        with profile_phase("run_loading"):
+            runs = load_sweep_runs(sweep_file)
+        logger.info(f"Loaded {len(runs)} existing runs")
+
+        # Determine which (LLM, TechVersion) combos have not yet been evaluated
+        with profile_phase("missing_pairs"):
+            ground_truths = load_ground_truths()
+            pairs_to_run = [(llm, gt) for llm in llms for gt in ground_truths]
+            missing = get_missing_runs(pairs_to_run, runs)
+
+        hedger: Hedger | None = None
+        executor = AdaptiveExecutor(
+            lambda llm_config, ground_truth: run_single_evaluation(
+                llm_config=llm_config,
+                ground_truth=ground_truth,
+                prompt=VERSION_PROMPT,
+                version_regex=VERSION_REGEX,
+                hedger=hedger,
+            ),
+            initial_concurrency=ARGS.initial_concurrency if ARGS else 2,
+            max_concurrency=ARGS.max_concurrency if ARGS else 16,
         )
-        runs.append(run)
-
-        # Persist runs to file
-        with open(RUNS_FILE, "a") as f:
-            f.write(run.model_dump_json() + "\n")
-            logger.debug(f"Wrote run to {RUNS_FILE}")
+        if ARGS is not None and ARGS.hedge_percentile is not None:
+            # Hedges take slots of the providers' limiters, like first calls
+            hedger = Hedger.from_runs(
+                runs,
+                percentile=ARGS.hedge_percentile,
+                budget=ARGS.hedge_budget,
+                limiter=executor.limiter,
+            )
+            logger.info(f"Hedge delays (s): {hedger.delays}")
+
+        if missing:
+            logger.info(f"Executing {len(missing)} new runs...")
+        else:
+            logger.info("No new runs to execute.")
+
+        # Live metrics, updated as each run lands
+        aggregator = MetricsAggregator()
+        aggregator.add_all(runs)
+
+        # Execute runs for missing pairs
+        with profile_phase("evaluation_loop"):
+            # Other workers share the queue: the count of this one is unknown
+            total = len(missing) if work_queue is None else None
+            progress = tqdm(total=total, desc="Evaluating LLMs")
+            timeouts = failures = 0
+            if work_queue is not None:
+                work_queue.enqueue(missing)
+                outcomes = drain(work_queue, executor, worker_id, flush=writer.flush)
+            else:
+                outcomes = executor.run(missing)
+            for outcome in outcomes:
+                progress.update(1)
+                run = outcome.run
+                if run is None:
+                    # Logged by the executor; retried by the queue or next sweep
+                    failures += 1
+                    continue
+                runs.append(run)
+
+                # Persisted in batches by the writer thread
+                writer.write(run)
+
+                # Timed out runs are kept on disk but not scored
+                if run.status == RunStatus.TIMEOUT:
+                    timeouts += 1
+                aggregator.add(run)
+                if not len(aggregator):
+                    continue
+                overall = aggregator.snapshot().overall
+                progress.set_postfix(
+                    exact=f"{overall.exact_match_rate:.1%}",
+                    median_lag=f"{overall.lag.median:.0f}d" if overall.lag else "n/a",
+                    timeouts=timeouts,
+                    failures=failures,
+                )
+            progress.close()
+
+    if work_queue is not None:
+        logger.info(f"Queue drained: {work_queue.counts()}")
+        work_queue.close()
+        # The sweep's results include the runs of the other workers
+        runs = load_sweep_runs(sweep_file)
 
     # Evaluate and print results
     logger.info("Evaluating final results...")
-    evaluate_runs(runs)
+    with profile_phase("metric_aggregation"):
+        evaluate_runs(runs)
     logger.info("Evaluation complete")
+    if metrics_file is not None:
+        metrics_file.stop()
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        if PROFILE is not None:
+            PROFILE.close()
@@ -0,0 +1,266 @@
+import math
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+from .metrics import (
+    GroupMetrics,
+    LagStats,
+    MetricsReport,
+    RunKey,
+    llm_key,
+    run_key,
+)
+from .models import EvaluationRun, RunStatus
+from .versions import compare_versions
+
+
+class LagSketch:
+    """
+    Mergeable quantile sketch for lag values (DDSketch-style).
+
+    Values are counted in logarithmically sized buckets, so any quantile is
+    returned within `relative_accuracy` of the true value while memory only
+    grows with the logarithm of the value range. Buckets are plain counters,
+    which makes the sketch mergeable and lets a value be removed again when
+    the run it came from is superseded.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, bucket: int) -> float:
+        return 2 * self._gamma**bucket / (self._gamma + 1)
+
+    def _update(self, value: float, delta: int) -> None:
+        if value == 0:
+            self._zero += delta
+        else:
+            store = self._positive if value > 0 else self._negative
+            bucket = self._bucket(abs(value))
+            remaining = store.get(bucket, 0) + delta
+            if remaining:
+                store[bucket] = remaining
+            else:
+                del store[bucket]
+        self.count += delta
+        self.sum += delta * value
+
+    def add(self, value: float) -> None:
+        self._update(value, 1)
+
+    def remove(self, value: float) -> None:
+        """Removes a value previously added to the sketch."""
+        self._update(value, -1)
+
+    def merge(self, other: "LagSketch") -> None:
+        """Adds all values of `other` to this sketch. Both must share the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        for bucket, n in other._positive.items():
+            self._positive[bucket] = self._positive.get(bucket, 0) + n
+        for bucket, n in other._negative.items():
+            self._negative[bucket] = self._negative.get(bucket, 0) + n
+        self._zero += other._zero
+        self.count += other.count
+        self.sum += other.sum
+
+    def _ordered_buckets(self) -> Iterable[tuple[float, int]]:
+        for bucket in sorted(self._negative, reverse=True):
+            yield -self._value(bucket), self._negative[bucket]
+        if self._zero:
+            yield 0.0, self._zero
+        for bucket in sorted(self._positive):
+            yield self._value(bucket), self._positive[bucket]
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: Quantile in [0, 1], e.g. 0.5 for the median.
+        :return: Approximate value at quantile q.
+        """
+        if self.count == 0:
+            raise ValueError("Cannot compute a quantile of an empty sketch")
+        rank = q * (self.count - 1)
+        seen = 0
+        value = 0.0
+        for value, n in self._ordered_buckets():
+            seen += n
+            if seen > rank:
+                break
+        return value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count
+
+
+class _Contribution(NamedTuple):
+    """What a single run adds to the aggregates, kept so it can be taken back."""
+
+    timestamp: datetime
+    tech: str
+    llm: str
+    execution_time: float
+    exact: bool
+    major: bool
+    minor: bool
+    lag_days: float | None
+
+
+class _GroupState:
+    def __init__(self, relative_accuracy: float) -> None:
+        self.total_runs = 0
+        self.exact_matches = 0
+        self.major_matches = 0
+        self.minor_matches = 0
+        self.execution_time = 0.0
+        self.lag = LagSketch(relative_accuracy)
+
+    def update(self, c: _Contribution, sign: int) -> None:
+        self.total_runs += sign
+        self.exact_matches += sign * c.exact
+        self.major_matches += sign * c.major
+        self.minor_matches += sign * c.minor
+        self.execution_time += sign * c.execution_time
+        if c.lag_days is not None:
+            if sign > 0:
+                self.lag.add(c.lag_days)
+            else:
+                self.lag.remove(c.lag_days)
+
+    def to_metrics(self) -> GroupMetrics:
+        lag = None
+        if self.lag.count:
+            lag = LagStats(
+                count=self.lag.count,
+                mean=self.lag.mean,
+                median=self.lag.quantile(0.5),
+                p90=self.lag.quantile(0.9),
+                p95=self.lag.quantile(0.95),
+                max=self.lag.quantile(1.0),
+            )
+        return GroupMetrics(
+            total_runs=self.total_runs,
+            exact_matches=self.exact_matches,
+            major_matches=self.major_matches,
+            minor_matches=self.minor_matches,
+            avg_execution_time=self.execution_time / self.total_runs
+            if self.total_runs
+            else 0.0,
+            lag=lag,
+        )
+
+
+class MetricsAggregator:
+    """
+    Maintains evaluation metrics incrementally as runs arrive.
+
+    Only the latest run per (technology, provider, model) counts, like in
+    `evaluate_runs`: ingesting a newer run for a known key first takes back
+    what the older run contributed. Aggregators built by different workers
+    can be combined with `merge`, which applies the same rule across them.
+
+    Usage:
+        aggregator = MetricsAggregator()
+        for run in runs:
+            aggregator.add(run)
+        report = aggregator.snapshot()
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """
+        :param relative_accuracy: Relative error bound of the lag quantiles.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.input_runs = 0
+        self._runs: dict[RunKey, _Contribution] = {}
+        self._overall = _GroupState(relative_accuracy)
+        self._by_tech: dict[str, _GroupState] = {}
+        self._by_llm: dict[str, _GroupState] = {}
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def add(self, run: EvaluationRun) -> bool:
+        """
+        Ingests one run.
+
+        :param run: The new run.
+        :return: True if the run is now the latest for its key, False if a
+            more recent run was already known or the run timed out.
+        """
+        self.input_runs += 1
+        if run.status != RunStatus.COMPLETED:
+            return False
+        return self._ingest(run_key(run), _contribution(run))
+
+    def add_all(self, runs: Iterable[EvaluationRun]) -> None:
+        for run in runs:
+            self.add(run)
+
+    def merge(self, other: "MetricsAggregator") -> None:
+        """
+        Folds the runs aggregated by `other` into this aggregator.
+
+        :param other: A partial aggregate, e.g. computed by another worker.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge aggregators with different accuracies")
+        self.input_runs += other.input_runs
+        for key, contribution in other._runs.items():
+            self._ingest(key, contribution)
+
+    def snapshot(self) -> MetricsReport:
+        """Returns the current metrics, with approximate lag quantiles."""
+        if not self._runs:
+            raise ValueError("Cannot compute metrics without runs")
+        return MetricsReport(
+            input_runs=self.input_runs,
+            overall=self._overall.to_metrics(),
+            by_tech={
+                k: s.to_metrics() for k, s in self._by_tech.items() if s.total_runs
+            },
+            by_llm={k: s.to_metrics() for k, s in self._by_llm.items() if s.total_runs},
+        )
+
+    def _ingest(self, key: RunKey, contribution: _Contribution) -> bool:
+        previous = self._runs.get(key)
+        if previous is not None:
+            if previous.timestamp >= contribution.timestamp:
+                return False
+            self._apply(previous, -1)
+        self._runs[key] = contribution
+        self._apply(contribution, 1)
+        return True
+
+    def _apply(self, c: _Contribution, sign: int) -> None:
+        accuracy = self.relative_accuracy
+        self._overall.update(c, sign)
+        self._by_tech.setdefault(c.tech, _GroupState(accuracy)).update(c, sign)
+        self._by_llm.setdefault(c.llm, _GroupState(accuracy)).update(c, sign)
+
+
+def _contribution(run: EvaluationRun) -> _Contribution:
+    flags = compare_versions(run.ground_truth.version, run.parsed_version)
+    exact, major, minor = flags or (False, False, False)
+    return _Contribution(
+        timestamp=run.timestamp,
+        tech=run.ground_truth.tech.name,
+        llm=llm_key(run),
+        execution_time=run.execution_time_seconds,
+        exact=exact,
+        major=major,
+        minor=minor,
+        lag_days=run.lag_days if flags is not None else None,
+    )
@@ -0,0 +1,406 @@
+"""
+Benchmarks of the hot paths, on synthetic data.
+
+Every benchmark builds its input for a given size (number of runs), then
+times the operation and measures its peak memory with tracemalloc. Results
+can be saved as baselines and later runs compared against them, failing when
+throughput drops or memory grows beyond a tolerance.
+
+Usage:
+    results = run_benchmarks(sizes=[1_000, 100_000])
+    regressions = compare_to_baselines(results, load_baselines("bench.json"), 0.2)
+"""
+
+import gc
+import json
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, UTC
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .evaluation import evaluate_runs
+from .fake_registry import FakeRegistry
+from .fetchers import fetch_latest_version_and_date, fetch_version_date
+from .fetchers.http import get_session, set_registry_endpoints
+from .fetchers.ruby_fetchers import parse_ruby_releases
+from .fetchers.snapshot import active_snapshot, use_snapshot
+from .io_utils import get_missing_runs, load_runs_from_jsonl, write_atomic
+from .models import (
+    EvaluationRun,
+    LibraryIdentifier,
+    LLMConfig,
+    PackageManager,
+    TechVersionGroundTruth,
+)
+from .versions import VERSION_REGEX, extract_versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BASELINES_SCHEMA_VERSION = 1
+
+
+class BenchResult(BaseModel):
+    """Measurements of one benchmark at one size."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    size: int = Field(..., description="Number of synthetic runs")
+    items: int = Field(..., description="Units of work of one iteration")
+    seconds: float = Field(..., description="Best time over the repeats")
+    peak_memory_bytes: int = Field(
+        ..., description="Peak traced allocation of one iteration"
+    )
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds > 0 else float("inf")
+
+
+class Baseline(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    items_per_second: float
+    peak_memory_bytes: int
+
+
+class BaselineFile(BaseModel):
+    """On-disk format of a baselines file."""
+
+    schema_version: int = BASELINES_SCHEMA_VERSION
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    baselines: dict[str, Baseline] = Field(
+        default_factory=dict, description="name@size -> baseline"
+    )
+
+
+class Regression(NamedTuple):
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change from the baseline, e.g. -0.3 for 30% slower."""
+        return self.current / self.baseline - 1 if self.baseline else 0.0
+
+
+# -------------------------------------------------------------
+# Synthetic data
+# -------------------------------------------------------------
+_MANAGERS = [PackageManager.NPM, PackageManager.PYPI, PackageManager.MAVEN]
+
+
+def synthetic_ground_truths(count: int, seed: int = 0) -> list[TechVersionGroundTruth]:
+    """`count` library ground truths with plausible versions and dates."""
+    rng = random.Random(seed)
+    ground_truths: list[TechVersionGroundTruth] = []
+    for i in range(count):
+        manager = _MANAGERS[i % len(_MANAGERS)]
+        name = f"org.bench:lib-{i}" if manager == PackageManager.MAVEN else f"lib-{i}"
+        ground_truths.append(
+            TechVersionGroundTruth(
+                tech=LibraryIdentifier(package_manager=manager, name=name),
+                version=f"{rng.randint(1, 20)}.{rng.randint(0, 30)}.{rng.randint(0, 9)}",
+                release_date=date(2025, 2, 1) - timedelta(days=rng.randint(0, 400)),
+            )
+        )
+    return ground_truths
+
+
+def synthetic_llms(count: int = 8) -> list[LLMConfig]:
+    return [LLMConfig(provider="simulated", model=f"bench-{i}") for i in range(count)]
+
+
+def synthetic_runs(count: int, seed: int = 0) -> list[EvaluationRun]:
+    """
+    `count` runs spread over 8 LLMs and about sqrt(count) techs, with a mix of
+    exact, stale, invented and unparseable answers.
+    """
+    rng = random.Random(seed)
+    llms = synthetic_llms()
+    ground_truths = synthetic_ground_truths(max(10, int(count**0.5)), seed)
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    runs: list[EvaluationRun] = []
+    for i in range(count):
+        gt = ground_truths[rng.randrange(len(ground_truths))]
+        draw = rng.random()
+        if draw < 0.05:
+            parsed, exists, lag = None, None, None
+        elif draw < 0.35:
+            parsed, exists, lag = gt.version, True, 0
+        elif draw < 0.4:
+            parsed, exists, lag = f"{rng.randint(21, 30)}.0.0", False, None
+        else:
+            parsed, exists, lag = f"{rng.randint(1, 20)}.1.0", True, rng.randint(1, 900)
+        answer = f"<answer>{parsed}</answer>" if parsed else "I don't know."
+        runs.append(
+            EvaluationRun(
+                ground_truth=gt,
+                llm_config=llms[i % len(llms)],
+                timestamp=start + timedelta(seconds=i),
+                execution_time_seconds=rng.uniform(0.2, 8.0),
+                output=f"<thinking>Recalling {gt.tech.name} releases.</thinking>{answer}",
+                parsed_version=parsed,
+                parsed_version_exists=exists,
+                lag_days=lag,
+            )
+        )
+    return runs
+
+
+def write_runs(path: str | Path, runs: list[EvaluationRun]) -> None:
+    write_atomic(path, "".join(run.model_dump_json() + "\n" for run in runs))
+
+
+def synthetic_ruby_releases_html(rows: int) -> str:
+    """A ruby-lang.org releases page listing `rows` releases."""
+    body = "".join(
+        f"<tr><td>Ruby {i // 100}.{i // 10 % 10}.{i % 10}</td>"
+        f"<td>{date(2025, 1, 1) - timedelta(days=i)}</td><td><a>notes</a></td></tr>"
+        for i in range(rows)
+    )
+    return (
+        "<html><body><table class='release-list'><thead><tr><th>Release</th>"
+        f"<th>Date</th></tr></thead><tbody>{body}</tbody></table></body></html>"
+    )
+
+
+# -------------------------------------------------------------
+# Benchmarks
+# -------------------------------------------------------------
+Workload = tuple[Callable[[], Any], int]
+"""The operation to time, and its number of units of work."""
+
+
+class Benchmark(NamedTuple):
+    name: str
+    prepare: Callable[[int, Path], Workload]
+    """(size, scratch directory) -> workload; not timed."""
+
+
+def _load_runs(size: int, tmp: Path) -> Workload:
+    path = tmp / f"runs-{size}.jsonl"
+    if not path.exists():
+        write_runs(path, synthetic_runs(size))
+    return lambda: load_runs_from_jsonl(str(path)), size
+
+
+def _missing_runs(size: int, tmp: Path) -> Workload:
+    runs = synthetic_runs(size)
+    ground_truths = list({run.ground_truth: None for run in runs})
+    ground_truths += synthetic_ground_truths(len(ground_truths), seed=1)
+    pairs = [(llm, gt) for llm in synthetic_llms() for gt in ground_truths]
+    return lambda: get_missing_runs(pairs, runs), size
+
+
+def _evaluate_runs(size: int, tmp: Path) -> Workload:
+    runs = synthetic_runs(size)
+    return lambda: evaluate_runs(runs), size
+
+
+def _extract_versions(size: int, tmp: Path) -> Workload:
+    outputs = [run.output for run in synthetic_runs(size)]
+    return lambda: [extract_versions(o, VERSION_REGEX) for o in outputs], size
+
+
+def _parse_ruby(size: int, tmp: Path) -> Workload:
+    # The real page lists a few hundred releases; the parser scales with rows
+    rows = min(size, 10_000)
+    html = synthetic_ruby_releases_html(rows)
+    return lambda: parse_ruby_releases(html), rows
+
+
+def _fetcher(
+    manager: PackageManager, releases: bool
+) -> Callable[[int, Path], Workload]:
+    def prepare(size: int, tmp: Path) -> Workload:
+        count = min(size, MAX_FETCHES)
+        techs = [gt.tech for gt in synthetic_ground_truths(count * len(_MANAGERS))]
+        techs = [t for t in techs if t.package_manager == manager][:count]
+        if not releases:
+            return lambda: [fetch_latest_version_and_date(t) for t in techs], count
+        # Look up versions that exist in the registry
+        versions = [fetch_latest_version_and_date(t)[0] for t in techs]
+        return lambda: [fetch_version_date(*tv) for tv in zip(techs, versions)], count
+
+    return prepare
+
+
+MAX_FETCHES = 200
+"""Fetcher benchmarks make at most this many requests per iteration."""
+
+BENCHMARKS = [
+    Benchmark("load_runs_from_jsonl", _load_runs),
+    Benchmark("get_missing_runs", _missing_runs),
+    Benchmark("evaluate_runs", _evaluate_runs),
+    Benchmark("extract_versions", _extract_versions),
+    Benchmark("parse_ruby_releases", _parse_ruby),
+    *(
+        Benchmark(f"fetch_{kind}_{manager.value}", _fetcher(manager, kind == "date"))
+        for manager in _MANAGERS
+        for kind in ("latest", "date")
+    ),
+]
+
+
+@contextmanager
+def _local_registry() -> Iterator[FakeRegistry]:
+    # Offline mode would answer from the snapshot instead of the registry
+    snapshot = active_snapshot()
+    use_snapshot(None)
+    with FakeRegistry() as registry:
+        set_registry_endpoints(registry.endpoints)
+        try:
+            yield registry
+        finally:
+            set_registry_endpoints(None)
+            use_snapshot(snapshot)
+            get_session().close()
+
+
+def _measure(workload: Workload, repeat: int) -> tuple[float, int]:
+    operation, _ = workload
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is traced in a separate pass: tracing distorts the timings
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(
+    sizes: list[int] | None = None,
+    only: list[str] | None = None,
+    repeat: int = 3,
+    on_result: Callable[[BenchResult], None] | None = None,
+) -> list[BenchResult]:
+    """
+    Runs the benchmark suite.
+
+    Fetchers are benchmarked against a local FakeRegistry, never the real
+    registries.
+
+    :param sizes: Numbers of synthetic runs (default: DEFAULT_SIZES).
+    :param only: Names (or name prefixes) of the benchmarks to run; default all.
+    :param repeat: Timed iterations per benchmark; the best one is kept.
+    :param on_result: Called with each result as soon as it is measured.
+    :return: One result per benchmark and size.
+    """
+    selected = [
+        b for b in BENCHMARKS if not only or any(b.name.startswith(p) for p in only)
+    ]
+    results: list[BenchResult] = []
+    with tempfile.TemporaryDirectory() as tmp, _local_registry():
+        for size in sizes or DEFAULT_SIZES:
+            for benchmark in selected:
+                logger.info(f"Benchmarking {benchmark.name} at {size} runs")
+                workload = benchmark.prepare(size, Path(tmp))
+                seconds, peak = _measure(workload, repeat)
+                result = BenchResult(
+                    name=benchmark.name,
+                    size=size,
+                    items=workload[1],
+                    seconds=seconds,
+                    peak_memory_bytes=peak,
+                )
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+    return results
+
+
+# -------------------------------------------------------------
+# Baselines
+# -------------------------------------------------------------
+def load_baselines(path: str | Path) -> dict[str, Baseline]:
+    """
+    :return: The baselines of a file written by save_baselines, by name@size;
+        empty if the file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    data = BaselineFile.model_validate_json(path.read_bytes())
+    if data.schema_version > BASELINES_SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} uses schema version {data.schema_version}, "
+            f"this version of llm-lib-lag only reads up to {BASELINES_SCHEMA_VERSION}"
+        )
+    return data.baselines
+
+
+def save_baselines(path: str | Path, results: list[BenchResult]) -> None:
+    """
+    Records results as baselines, keeping the baselines of benchmarks and
+    sizes that were not run.
+    """
+    baselines = load_baselines(path)
+    for result in results:
+        baselines[result.key] = Baseline(
+            items_per_second=result.items_per_second,
+            peak_memory_bytes=result.peak_memory_bytes,
+        )
+    content = BaselineFile(baselines=dict(sorted(baselines.items())))
+    write_atomic(path, json.dumps(content.model_dump(mode="json"), indent=2) + "\n")
+
+
+def compare_to_baselines(
+    results: list[BenchResult],
+    baselines: dict[str, Baseline],
+    tolerance: float = 0.2,
+) -> list[Regression]:
+    """
+    :param tolerance: Allowed relative loss of throughput, and growth of peak
+        memory, e.g. 0.2 for 20%.
+    :return: The results worse than their baseline beyond the tolerance.
+        Results without a baseline are not compared.
+    """
+    regressions: list[Regression] = []
+    for result in results:
+        baseline = baselines.get(result.key)
+        if baseline is None:
+            continue
+        if result.items_per_second < baseline.items_per_second * (1 - tolerance):
+            regressions.append(
+                Regression(
+                    result.key,
+                    "items_per_second",
+                    baseline.items_per_second,
+                    result.items_per_second,
+                )
+            )
+        if result.peak_memory_bytes > baseline.peak_memory_bytes * (1 + tolerance):
+            regressions.append(
+                Regression(
+                    result.key,
+                    "peak_memory_bytes",
+                    baseline.peak_memory_bytes,
+                    result.peak_memory_bytes,
+                )
+            )
+    return regressions
@@ -0,0 +1,194 @@
+from typing import Callable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, ConfigDict
+
+from .metrics import RunFrame, build_run_frame
+from .models import EvaluationRun
+
+# Upper bound on the size of a (resamples x rows) index matrix held at once
+_MAX_ELEMENTS = 8_000_000
+
+_Stat = Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]]
+
+# Statistics computed along axis 1 of a (resamples x rows) matrix
+_LAG_STATS: dict[str, _Stat] = {
+    "lag_mean": lambda m: m.mean(axis=1),
+    "lag_median": lambda m: np.median(m, axis=1),
+    "lag_p90": lambda m: np.percentile(m, 90, axis=1),
+    "lag_p95": lambda m: np.percentile(m, 95, axis=1),
+    "lag_max": lambda m: m.max(axis=1),
+}
+
+# Means of the columns of a (resamples x rows x columns) sample, in order
+_MEAN_STATS: dict[str, _Stat] = {
+    name: lambda m, i=i: m[:, :, i].mean(axis=1)
+    for i, name in enumerate(
+        [
+            "exact_match_rate",
+            "major_match_rate",
+            "minor_match_rate",
+            "avg_execution_time",
+        ]
+    )
+}
+
+
+class MetricInterval(BaseModel):
+    """Point estimate of a metric with its bootstrap confidence interval."""
+
+    model_config = ConfigDict(frozen=True)
+
+    estimate: float
+    low: float
+    high: float
+
+
+class GroupIntervals(BaseModel):
+    """Confidence intervals for every metric reported for a group of runs."""
+
+    model_config = ConfigDict(frozen=True)
+
+    total_runs: int
+    exact_match_rate: MetricInterval
+    major_match_rate: MetricInterval
+    minor_match_rate: MetricInterval
+    avg_execution_time: MetricInterval
+    lag_mean: MetricInterval | None = None
+    lag_median: MetricInterval | None = None
+    lag_p90: MetricInterval | None = None
+    lag_p95: MetricInterval | None = None
+    lag_max: MetricInterval | None = None
+
+
+class BootstrapReport(BaseModel):
+    """Bootstrap confidence intervals, overall and per tech / per LLM."""
+
+    model_config = ConfigDict(frozen=True)
+
+    n_resamples: int
+    confidence: float
+    seed: int | None
+    overall: GroupIntervals
+    by_tech: dict[str, GroupIntervals]
+    by_llm: dict[str, GroupIntervals]
+
+
+def _resample(
+    values: npt.NDArray[np.float64],
+    stats: dict[str, _Stat],
+    n_resamples: int,
+    rng: np.random.Generator,
+) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Draws `n_resamples` bootstrap samples of `values` as one index matrix and
+    evaluates each statistic on all of them at once. Large groups are processed
+    in chunks of resamples to bound memory.
+
+    `values` is one row per run: a vector, or a matrix whose columns are
+    resampled together (each draw takes a whole row).
+    """
+    n = len(values)
+    chunk = max(1, _MAX_ELEMENTS // values.size)
+    out = {name: np.empty(n_resamples) for name in stats}
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        sample = values[rng.integers(0, n, size=(size, n))]
+        for name, stat in stats.items():
+            out[name][start : start + size] = stat(sample)
+    return out
+
+
+def _interval(
+    estimate: float, resampled: npt.NDArray[np.float64], confidence: float
+) -> MetricInterval:
+    alpha = 1 - confidence
+    low, high = np.quantile(resampled, [alpha / 2, 1 - alpha / 2])
+    return MetricInterval(estimate=estimate, low=float(low), high=float(high))
+
+
+def _group_intervals(
+    frame: RunFrame,
+    rows: npt.NDArray[np.bool_],
+    n_resamples: int,
+    confidence: float,
+    rng: np.random.Generator,
+) -> GroupIntervals:
+    # Rates and timing are resampled over the same runs, using one column each
+    columns = np.stack(
+        [
+            frame.exact[rows],
+            frame.major[rows],
+            frame.minor[rows],
+            frame.execution_time[rows],
+        ],
+        axis=1,
+    ).astype(np.float64)
+    resampled = _resample(columns, _MEAN_STATS, n_resamples, rng)
+    estimates = columns.mean(axis=0)
+    intervals = {
+        name: _interval(float(estimates[i]), resampled[name], confidence)
+        for i, name in enumerate(_MEAN_STATS)
+    }
+
+    # Lag statistics only use the runs where a lag is available
+    lags = frame.lag_days[rows]
+    lags = lags[~np.isnan(lags)]
+    if len(lags):
+        resampled = _resample(lags, _LAG_STATS, n_resamples, rng)
+        for name, stat in _LAG_STATS.items():
+            estimate = float(stat(lags[np.newaxis, :])[0])
+            intervals[name] = _interval(estimate, resampled[name], confidence)
+
+    return GroupIntervals(total_runs=len(columns), **intervals)
+
+
+def bootstrap_metrics(
+    runs: Sequence[EvaluationRun],
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: int | None = None,
+) -> BootstrapReport:
+    """
+    Computes percentile bootstrap confidence intervals for the metrics of
+    `compute_metrics`: match rates, execution time and lag statistics.
+
+    All resamples of a group are drawn as a single index matrix and the
+    statistics are evaluated with NumPy along its rows.
+
+    :param runs: Runs to evaluate; only the latest run per key is used.
+    :param n_resamples: Number of bootstrap resamples.
+    :param confidence: Confidence level of the intervals, e.g. 0.95.
+    :param seed: Seed of the random generator, for reproducible intervals.
+    :return: A BootstrapReport with intervals overall, per tech and per LLM.
+    """
+    if not runs:
+        raise ValueError("Cannot bootstrap metrics without runs")
+    if n_resamples < 1:
+        raise ValueError("n_resamples must be at least 1")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    frame = build_run_frame(runs)
+    if not len(frame):
+        raise ValueError("Cannot bootstrap metrics without completed runs")
+    rng = np.random.default_rng(seed)
+
+    def intervals(rows: npt.NDArray[np.bool_]) -> GroupIntervals:
+        return _group_intervals(frame, rows, n_resamples, confidence, rng)
+
+    return BootstrapReport(
+        n_resamples=n_resamples,
+        confidence=confidence,
+        seed=seed,
+        overall=intervals(np.ones(len(frame), dtype=np.bool_)),
+        by_tech={
+            name: intervals(frame.tech == code)
+            for code, name in enumerate(frame.tech_names)
+        },
+        by_llm={
+            name: intervals(frame.llm == code)
+            for code, name in enumerate(frame.llm_names)
+        },
+    )
@@ -0,0 +1,219 @@
+"""
+Bulk ground-truth generation: resolve the latest version of thousands of
+packages (e.g. the top-N of a registry) into ground-truth records.
+"""
+
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, UTC
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+from pydantic import BaseModel, ConfigDict
+
+from .fetchers import fetch_latest_version_and_date
+from .io_utils import write_atomic
+from .models import LibraryIdentifier, PackageManager, TechVersionGroundTruth
+
+logger = logging.getLogger(__name__)
+
+
+class PackageFailure(BaseModel):
+    """A package whose latest version could not be resolved."""
+
+    model_config = ConfigDict(frozen=True)
+
+    tech: LibraryIdentifier
+    error: str
+
+
+class BulkResult(BaseModel):
+    """Outcome of a bulk resolution, in input order."""
+
+    model_config = ConfigDict(frozen=True)
+
+    ground_truths: list[TechVersionGroundTruth]
+    failures: list[PackageFailure]
+    cache_hits: int = 0
+
+
+def normalize_package_name(name: str, package_manager: PackageManager) -> str:
+    """
+    Canonical name of a package, so "Flask_Login" and "flask-login" are the
+    same PyPI project (PEP 503). Other registries are case-sensitive.
+    """
+    name = name.strip()
+    if package_manager == PackageManager.PYPI:
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+def read_package_list(
+    path: str | Path, package_manager: PackageManager, limit: int | None = None
+) -> list[LibraryIdentifier]:
+    """
+    Reads a package list: one name per line, most important first. Blank lines
+    and lines starting with '#' are ignored, duplicates are dropped.
+
+    :param path: The text file to read.
+    :param package_manager: Registry of every package in the file.
+    :param limit: Keep only the first `limit` packages (top-N).
+    :return: The packages, in file order.
+    """
+    names: dict[str, None] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names.setdefault(normalize_package_name(line, package_manager))
+            if limit is not None and len(names) >= limit:
+                break
+    return [
+        LibraryIdentifier(package_manager=package_manager, name=name) for name in names
+    ]
+
+
+def _cache_key(tech: LibraryIdentifier) -> str:
+    return f"{tech.package_manager.value}:{tech.name}"
+
+
+class ResolutionCache:
+    """
+    On-disk cache of resolved latest versions, so an interrupted or repeated
+    bulk run only queries the registries for stale or missing packages.
+    """
+
+    def __init__(self, path: str | Path, max_age: timedelta = timedelta(hours=24)):
+        """
+        :param path: JSON file holding the cache; created on first save.
+        :param max_age: Entries older than this are fetched again.
+        """
+        self.path = Path(path)
+        self.max_age = max_age
+        self._entries: dict[str, dict[str, str]] = {}
+        if self.path.exists():
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tech: LibraryIdentifier) -> TechVersionGroundTruth | None:
+        entry = self._entries.get(_cache_key(tech))
+        if entry is None:
+            return None
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        if datetime.now(UTC) - fetched_at > self.max_age:
+            return None
+        return TechVersionGroundTruth(
+            tech=tech,
+            version=entry["version"],
+            release_date=date.fromisoformat(entry["release_date"]),
+        )
+
+    def put(self, ground_truth: TechVersionGroundTruth) -> None:
+        assert isinstance(ground_truth.tech, LibraryIdentifier)
+        assert ground_truth.release_date is not None
+        self._entries[_cache_key(ground_truth.tech)] = {
+            "version": ground_truth.version,
+            "release_date": ground_truth.release_date.isoformat(),
+            "fetched_at": datetime.now(UTC).isoformat(),
+        }
+
+    def save(self) -> None:
+        write_atomic(self.path, json.dumps(self._entries, indent=1))
+
+
+def _batches(
+    items: Sequence[LibraryIdentifier], size: int
+) -> Iterator[Sequence[LibraryIdentifier]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _resolve(tech: LibraryIdentifier) -> TechVersionGroundTruth | PackageFailure:
+    try:
+        version, release_date = fetch_latest_version_and_date(tech)
+    except Exception as e:
+        return PackageFailure(tech=tech, error=f"{type(e).__name__}: {e}")
+    return TechVersionGroundTruth(tech=tech, version=version, release_date=release_date)
+
+
+def resolve_packages(
+    techs: Sequence[LibraryIdentifier],
+    max_workers: int = 32,
+    batch_size: int = 500,
+    cache: ResolutionCache | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> BulkResult:
+    """
+    Resolves the latest version and release date of many packages.
+
+    Cached packages are not fetched. The others are fetched concurrently over
+    the shared connection pool, one batch at a time; the cache is saved after
+    every batch so an interrupted run resumes where it stopped. A failing
+    package is reported in the result and never aborts the batch.
+
+    :param techs: The packages to resolve.
+    :param max_workers: Number of registry requests in flight.
+    :param batch_size: Number of packages between two cache checkpoints.
+    :param cache: Optional cache of previous resolutions.
+    :param on_progress: Called with the number of packages just completed.
+    :return: Ground truths and failures, each in input order.
+    """
+    resolved: dict[LibraryIdentifier, TechVersionGroundTruth] = {}
+    failures: dict[LibraryIdentifier, PackageFailure] = {}
+
+    to_fetch: list[LibraryIdentifier] = []
+    for tech in techs:
+        cached = cache.get(tech) if cache is not None else None
+        if cached is not None:
+            resolved[tech] = cached
+        else:
+            to_fetch.append(tech)
+    cache_hits = len(resolved)
+    if on_progress is not None and cache_hits:
+        on_progress(cache_hits)
+    logger.info(
+        f"Resolving {len(to_fetch)} packages ({cache_hits} cached) "
+        f"with {max_workers} workers"
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch in _batches(to_fetch, batch_size):
+            for outcome in pool.map(_resolve, batch):
+                if isinstance(outcome, PackageFailure):
+                    failures[outcome.tech] = outcome
+                else:
+                    assert isinstance(outcome.tech, LibraryIdentifier)
+                    resolved[outcome.tech] = outcome
+                    if cache is not None:
+                        cache.put(outcome)
+            if cache is not None:
+                cache.save()
+            if on_progress is not None:
+                on_progress(len(batch))
+
+    if failures:
+        logger.warning(f"{len(failures)} of {len(techs)} packages failed to resolve")
+
+    return BulkResult(
+        ground_truths=[resolved[tech] for tech in techs if tech in resolved],
+        failures=[failures[tech] for tech in techs if tech in failures],
+        cache_hits=cache_hits,
+    )
+
+
+def merge_ground_truths(
+    existing: Sequence[TechVersionGroundTruth],
+    updates: Sequence[TechVersionGroundTruth],
+) -> list[TechVersionGroundTruth]:
+    """
+    Replaces the entries of `existing` that have a newer resolution in
+    `updates`, keeping their position, and appends the new techs.
+    """
+    by_tech = {gt.tech: gt for gt in updates}
+    merged = [by_tech.pop(gt.tech, gt) for gt in existing]
+    return merged + list(by_tech.values())
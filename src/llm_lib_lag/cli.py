@@ -1,17 +1,110 @@
+# Imported first: its import time marks the start of the CLI startup phase
+from .profiling import (
+    IMPORTED_AT,
+    ProfileMode,
+    ProfileSession,
+    measure_startup,
+    profile_phase,
+)
+import time
 import typer
-from rich.console import Console
-from rich.table import Table
-from typing import Annotated
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, get_args
+
+from .distributions import LatencyDistribution
+from .technologies import PackageManager
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
 
-from llm_lib_lag.models import TechVersionGroundTruth
-from .ground_truths import GROUND_TRUTHS
-from .fetchers import fetch_latest_version_and_date
+    from .bootstrap import GroupIntervals
+    from .metrics import GroupMetrics, MetricsReport
 
+# Commands import what they use in their body, so `--help` and every command
+# only pay for their own dependencies (see the `startup` command)
 app = typer.Typer(
     help="LLM Library Lag CLI - Test and validate library version ground truths",
     add_completion=False,
 )
-console = Console()
+snapshot_app = typer.Typer(help="Capture registry timelines for offline evaluation")
+app.add_typer(snapshot_app, name="snapshot")
+
+
+@lru_cache(maxsize=1)
+def console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
+@app.callback()
+def configure(
+    ctx: typer.Context,
+    snapshot: Annotated[
+        Path | None,
+        typer.Option(
+            envvar="LLM_LIB_LAG_SNAPSHOT",
+            help="Offline mode: answer every registry lookup from this snapshot",
+            exists=True,
+        ),
+    ] = None,
+    trace: Annotated[
+        Path | None,
+        typer.Option(
+            envvar="LLM_LIB_LAG_TRACE_FILE",
+            help="Append tracing spans of every phase to this JSON Lines file",
+        ),
+    ] = None,
+    metrics_file: Annotated[
+        Path | None,
+        typer.Option(
+            envvar="LLM_LIB_LAG_METRICS_FILE",
+            help="Keep Prometheus metrics in this file (textfile collector)",
+        ),
+    ] = None,
+    metrics_port: Annotated[
+        int | None,
+        typer.Option(
+            envvar="LLM_LIB_LAG_METRICS_PORT",
+            help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+        ),
+    ] = None,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            help="Profile the command phase by phase and write the profiles here",
+            file_okay=False,
+        ),
+    ] = None,
+    profile_mode: Annotated[
+        ProfileMode,
+        typer.Option(help="cProfile (exact call counts) or stack sampling"),
+    ] = ProfileMode.DETERMINISTIC,
+) -> None:
+    if snapshot is not None:
+        from .fetchers.snapshot import use_snapshot
+
+        use_snapshot(snapshot)
+    if trace is not None:
+        from .tracing import configure_tracing
+
+        configure_tracing(trace)
+    if metrics_file is not None or metrics_port is not None:
+        from .monitoring import start_exporters
+
+        exporter, _ = start_exporters(metrics_file, metrics_port)
+        if exporter is not None:
+            ctx.call_on_close(exporter.stop)
+    if profile is not None:
+        session = ProfileSession(profile, profile_mode)
+        # Imports ran before any option was parsed: timed, not profiled
+        session.record("startup", time.perf_counter() - IMPORTED_AT)
+        session.start()
+        ctx.call_on_close(session.close)
 
 
 @app.command()
@@ -22,6 +115,10 @@ def test(
     fail_fast: Annotated[
         bool, typer.Option("--fail-fast", "-f", help="Stop on first failure")
     ] = False,
+    file: Annotated[
+        Path | None,
+        typer.Option(help="Ground truths file (default: the packaged data file)"),
+    ] = None,
 ) -> None:
     """
     Test ground truth versions against fetched latest versions.
@@ -30,6 +127,12 @@ def test(
     from package repositories. It helps ensure our test data stays accurate and catches
     any API or scraping issues.
     """
+    from rich.table import Table
+
+    from .fetchers import fetch_latest_version_and_date
+    from .ground_truths import load_ground_truths
+    from .models import TechVersionGroundTruth
+
     table = Table(title="Ground Truth Test Results")
     table.add_column("Library", style="cyan")
     table.add_column("Status", style="bold")
@@ -37,12 +140,16 @@ def test(
     table.add_column("Ground Truth", style="green")
     table.add_column("Release Date", style="yellow")
 
-    total_ground_truths = len(GROUND_TRUTHS)
+    ground_truths = load_ground_truths(file)
+    total_ground_truths = len(ground_truths)
     ground_truths_passed = 0
     failures: list[TechVersionGroundTruth] = []
 
-    with console.status("[bold blue]Testing ground truths..."):
-        for ground_truth in GROUND_TRUTHS:
+    with (
+        console().status("[bold blue]Testing ground truths..."),
+        profile_phase("registry_checks"),
+    ):
+        for ground_truth in ground_truths:
             try:
                 fetched_latest_version, latest_date = fetch_latest_version_and_date(
                     ground_truth.tech
@@ -87,18 +194,820 @@ def test(
                     break
 
     if verbose or failures:
-        console.print(table)
+        console().print(table)
 
     if ground_truths_passed == total_ground_truths:
-        console.print(
+        console().print(
             f"\n[green]All {total_ground_truths} ground truths passed! 🎉[/green]"
         )
     else:
-        console.print(
+        console().print(
             f"\n[red]{ground_truths_passed}/{total_ground_truths} ground truths passed[/red]"
         )
         raise typer.Exit(code=1)
 
 
+# Choices of --distribution: the members of the distributions module's Literal
+DistributionChoice = Enum(
+    "DistributionChoice",
+    {name.upper(): name for name in get_args(LatencyDistribution)},
+    type=str,
+)
+
+
+class GroupBy(str, Enum):
+    LLM = "llm"
+    TECH = "tech"
+
+
+class Percentile(str, Enum):
+    P50 = "p50"
+    P95 = "p95"
+    P99 = "p99"
+
+
+@app.command()
+def refresh(
+    file: Annotated[
+        Path | None,
+        typer.Option(help="Ground truths file (default: the packaged data file)"),
+    ] = None,
+    workers: Annotated[
+        int, typer.Option("--workers", "-w", help="Concurrent registry requests")
+    ] = 8,
+    dry_run: Annotated[
+        bool, typer.Option("--dry-run", help="Show the diff without writing it")
+    ] = False,
+) -> None:
+    """
+    Update ground truths to the latest versions published in the registries.
+
+    All entries are fetched concurrently; the file is rewritten atomically
+    when at least one version changed. Entries that fail to fetch are kept.
+    """
+    from rich.table import Table
+
+    from .ground_truths import (
+        default_ground_truths_path,
+        load_ground_truths,
+        refresh_ground_truths,
+        save_ground_truths,
+    )
+
+    path = file or default_ground_truths_path()
+    ground_truths = load_ground_truths(path)
+
+    with console().status(
+        f"[bold blue]Fetching {len(ground_truths)} latest versions..."
+    ):
+        updates = refresh_ground_truths(ground_truths, max_workers=workers)
+
+    table = Table(title=f"Ground Truth Refresh ({path})")
+    table.add_column("Library", style="cyan")
+    table.add_column("Status", style="bold")
+    table.add_column("Old", style="yellow")
+    table.add_column("New", style="green")
+
+    for update in updates:
+        old = f"{update.old.version} ({update.old.release_date})"
+        if update.new is None:
+            table.add_row(
+                str(update.old.tech), "❌ ERROR", old, update.error, style="red"
+            )
+        elif update.changed:
+            new = f"{update.new.version} ({update.new.release_date})"
+            table.add_row(str(update.old.tech), "⬆ UPDATED", old, new)
+
+    changed = [u for u in updates if u.changed]
+    failed = [u for u in updates if u.new is None]
+    if changed or failed:
+        console().print(table)
+    console().print(
+        f"\n{len(changed)} updated, {len(updates) - len(changed) - len(failed)} "
+        f"unchanged, {len(failed)} failed"
+    )
+
+    if changed and not dry_run:
+        save_ground_truths([u.new or u.old for u in updates], path)
+        console().print(f"[green]Wrote {path}[/green]")
+
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _metrics_table(title: str, rows: dict[str, "GroupMetrics"]) -> "Table":
+    from rich.table import Table
+
+    table = Table(title=title)
+    table.add_column("Name", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Exact", justify="right", style="green")
+    table.add_column("Major", justify="right")
+    table.add_column("Minor", justify="right")
+    table.add_column("Median Lag (days)", justify="right", style="yellow")
+    table.add_column("P95 Lag (days)", justify="right", style="yellow")
+
+    for name, metrics in rows.items():
+        table.add_row(
+            name,
+            str(metrics.total_runs),
+            f"{metrics.exact_match_rate:.1%}",
+            f"{metrics.major_match_rate:.1%}",
+            f"{metrics.minor_match_rate:.1%}",
+            f"{metrics.lag.median:.0f}" if metrics.lag else "-",
+            f"{metrics.lag.p95:.0f}" if metrics.lag else "-",
+        )
+    return table
+
+
+def _intervals_table(title: str, rows: dict[str, "GroupIntervals"]) -> "Table":
+    from rich.table import Table
+
+    from .evaluation import format_interval
+
+    table = Table(title=title)
+    table.add_column("Name", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Exact", justify="right", style="green")
+    table.add_column("Minor", justify="right")
+    table.add_column("Median Lag (days)", justify="right", style="yellow")
+
+    ranking = sorted(
+        rows.items(), key=lambda item: item[1].exact_match_rate.estimate, reverse=True
+    )
+    for name, intervals in ranking:
+        table.add_row(
+            name,
+            str(intervals.total_runs),
+            format_interval(intervals.exact_match_rate, ".1%"),
+            format_interval(intervals.minor_match_rate, ".1%"),
+            format_interval(intervals.lag_median, ".0f")
+            if intervals.lag_median
+            else "-",
+        )
+    return table
+
+
+@app.command()
+def evaluate(
+    run_files: Annotated[
+        list[Path],
+        typer.Argument(help="Run files to evaluate, e.g. runs*.jsonl", exists=True),
+    ],
+    workers: Annotated[
+        int | None,
+        typer.Option("--workers", "-w", help="Worker processes (default: all cores)"),
+    ] = None,
+    chunk_mb: Annotated[
+        int | None,
+        typer.Option(
+            min=1, help="Size of the shard read by each worker task (default: 64)"
+        ),
+    ] = None,
+    group_by: Annotated[
+        GroupBy, typer.Option(help="Breakdown to display")
+    ] = GroupBy.LLM,
+    bootstrap: Annotated[
+        int,
+        typer.Option(
+            help="Number of bootstrap resamples for confidence intervals (0 to disable)"
+        ),
+    ] = 0,
+    seed: Annotated[int | None, typer.Option(help="Seed of the bootstrap")] = None,
+    as_of: Annotated[
+        datetime | None,
+        typer.Option(
+            formats=["%Y-%m-%d"],
+            help="Rescore the answers against the latest versions as of this "
+            "date, from the registries' release histories",
+        ),
+    ] = None,
+) -> None:
+    """
+    Evaluate runs from many .jsonl files in parallel.
+
+    Every file is split into shards that are aggregated by a pool of worker
+    processes, then merged keeping only the latest run per technology/LLM.
+    With --bootstrap, runs are loaded in memory to add 95% confidence intervals.
+    With --as-of, runs are loaded in memory and rescored; no LLM is called.
+    """
+    if bootstrap > 0 or as_of is not None:
+        # Runs are rescored or resampled in memory, they are not read in shards
+        for name, value in (("--workers", workers), ("--chunk-mb", chunk_mb)):
+            if value is not None:
+                raise typer.BadParameter(
+                    "cannot be combined with --bootstrap or --as-of", param_hint=name
+                )
+
+        from .io_utils import load_runs_from_jsonl
+        from .models import EvaluationRun, RunStatus
+
+        runs: list[EvaluationRun] = []
+        with profile_phase("run_loading"):
+            for path in run_files:
+                runs.extend(load_runs_from_jsonl(str(path)))
+        if as_of is not None:
+            from .release_history import rescore_runs
+
+            with console().status(
+                f"[bold blue]Rescoring as of {as_of.date().isoformat()}..."
+            ):
+                runs = rescore_runs(runs, as_of.date())
+        if not any(run.status == RunStatus.COMPLETED for run in runs):
+            console().print("[red]No completed runs to evaluate[/red]")
+            raise typer.Exit(code=1)
+
+        if bootstrap > 0:
+            from .bootstrap import bootstrap_metrics
+
+            with (
+                console().status("[bold blue]Bootstrapping metrics..."),
+                profile_phase("metric_aggregation"),
+            ):
+                intervals = bootstrap_metrics(runs, n_resamples=bootstrap, seed=seed)
+            rows = intervals.by_llm if group_by == GroupBy.LLM else intervals.by_tech
+            console().print(
+                _intervals_table(f"Results by {group_by.value.upper()} (95% CI)", rows)
+            )
+            console().print(
+                _intervals_table("Overall (95% CI)", {"all": intervals.overall})
+            )
+            return
+
+        from .metrics import compute_metrics
+
+        with profile_phase("metric_aggregation"):
+            report = compute_metrics(runs)
+        _print_report(report, group_by)
+        return
+
+    from .sharded import evaluate_run_files
+
+    # Shards are loaded and aggregated together by the worker processes
+    with (
+        console().status("[bold blue]Evaluating runs..."),
+        profile_phase("metric_aggregation"),
+    ):
+        sharded_report = evaluate_run_files(
+            run_files, workers=workers, chunk_bytes=(chunk_mb or 64) * 1024 * 1024
+        )
+    if sharded_report is None:
+        console().print("[red]No completed runs to evaluate[/red]")
+        raise typer.Exit(code=1)
+    _print_report(sharded_report, group_by)
+
+
+def _print_report(report: "MetricsReport", group_by: GroupBy) -> None:
+    rows = report.by_llm if group_by == GroupBy.LLM else report.by_tech
+    console().print(_metrics_table(f"Results by {group_by.value.upper()}", rows))
+    console().print(_metrics_table("Overall", {"all": report.overall}))
+    console().print(
+        f"{report.input_runs} runs read, {report.overall.total_runs} kept "
+        "(latest per technology/LLM)"
+    )
+
+
+@app.command()
+def bulk(
+    packages_file: Annotated[
+        Path,
+        typer.Argument(
+            help="Package names, one per line, most popular first", exists=True
+        ),
+    ],
+    output: Annotated[
+        Path,
+        typer.Option("--output", "-o", help="Ground truths file to write or update"),
+    ],
+    registry: Annotated[
+        PackageManager, typer.Option(help="Registry of the listed packages")
+    ] = PackageManager.PYPI,
+    limit: Annotated[
+        int | None, typer.Option("--limit", "-n", help="Only the top N packages")
+    ] = None,
+    workers: Annotated[
+        int, typer.Option("--workers", "-w", help="Concurrent registry requests")
+    ] = 32,
+    cache: Annotated[
+        Path | None, typer.Option(help="Resolution cache, reused across runs")
+    ] = None,
+    max_age_hours: Annotated[
+        float, typer.Option(help="Cached resolutions older than this are refetched")
+    ] = 24,
+    registry_url: Annotated[
+        str | None,
+        typer.Option(
+            help="Serve every registry from this base URL (mirror, test server)"
+        ),
+    ] = None,
+) -> None:
+    """
+    Generate ground truths for a list of packages, e.g. the top-N of a registry.
+
+    Latest versions are resolved concurrently; packages that fail are reported
+    and skipped. Existing entries of the output file are updated in place.
+    """
+    from datetime import timedelta
+
+    from rich.progress import Progress
+    from rich.table import Table
+
+    from .bulk import (
+        ResolutionCache,
+        merge_ground_truths,
+        read_package_list,
+        resolve_packages,
+    )
+    from .fetchers.http import RegistryEndpoints, set_registry_endpoints
+    from .ground_truths import load_ground_truths, save_ground_truths
+
+    if registry_url:
+        set_registry_endpoints(RegistryEndpoints.from_base_url(registry_url))
+
+    techs = read_package_list(packages_file, registry, limit=limit)
+    resolution_cache = (
+        ResolutionCache(cache, max_age=timedelta(hours=max_age_hours))
+        if cache is not None
+        else None
+    )
+
+    with Progress(console=console()) as progress:
+        task = progress.add_task("Resolving packages", total=len(techs))
+        result = resolve_packages(
+            techs,
+            max_workers=workers,
+            cache=resolution_cache,
+            on_progress=lambda n: progress.advance(task, n),
+        )
+
+    if result.failures:
+        table = Table(title=f"Failed Packages ({len(result.failures)})")
+        table.add_column("Package", style="cyan")
+        table.add_column("Error", style="red")
+        for failure in result.failures[:20]:
+            table.add_row(failure.tech.name, failure.error)
+        if len(result.failures) > 20:
+            table.add_row("...", f"{len(result.failures) - 20} more")
+        console().print(table)
+
+    existing = load_ground_truths(output) if output.exists() else []
+    merged = merge_ground_truths(existing, result.ground_truths)
+    save_ground_truths(merged, output)
+    console().print(
+        f"{len(result.ground_truths)} resolved ({result.cache_hits} cached), "
+        f"{len(result.failures)} failed; wrote {len(merged)} ground truths to {output}"
+    )
+
+
+@snapshot_app.command("export")
+def snapshot_export(
+    output: Annotated[Path, typer.Argument(help="Snapshot file to write")],
+    file: Annotated[
+        Path | None,
+        typer.Option(help="Ground truths whose techs are captured (default: packaged)"),
+    ] = None,
+    workers: Annotated[
+        int, typer.Option("--workers", "-w", help="Techs fetched concurrently")
+    ] = 8,
+) -> None:
+    """
+    Capture the release timeline and latest version of every ground-truth tech.
+    """
+    from .fetchers.snapshot import capture_timelines, write_snapshot
+    from .ground_truths import load_ground_truths
+
+    techs = [gt.tech for gt in load_ground_truths(file)]
+    with console().status(f"[bold blue]Capturing {len(techs)} release timelines..."):
+        timelines, errors = capture_timelines(techs, max_workers=workers)
+
+    for tech, error in errors.items():
+        console().print(f"[red]❌ {tech.name}: {error}[/red]")
+    write_snapshot(output, timelines)
+    console().print(
+        f"Captured {len(timelines)} techs "
+        f"({sum(len(t.releases) for t in timelines)} releases) into {output} "
+        f"({output.stat().st_size / 1024:.1f} KiB)"
+    )
+    if errors:
+        raise typer.Exit(code=1)
+
+
+@snapshot_app.command("info")
+def snapshot_info(
+    path: Annotated[Path, typer.Argument(help="Snapshot file", exists=True)],
+) -> None:
+    """
+    List the techs recorded in a snapshot.
+    """
+    from rich.table import Table
+
+    from .fetchers.snapshot import RegistrySnapshot
+
+    snapshot = RegistrySnapshot(path)
+    table = Table(title=f"Snapshot {path} ({snapshot.created_at:%Y-%m-%d %H:%M} UTC)")
+    table.add_column("Tech", style="cyan")
+    table.add_column("Latest", style="green")
+    table.add_column("Release Date", style="yellow")
+    table.add_column("Releases", justify="right")
+    for entry in snapshot.index.entries:
+        table.add_row(
+            entry.tech.name,
+            entry.latest_version or "-",
+            str(entry.latest_release_date or "-"),
+            str(entry.releases),
+        )
+    console().print(table)
+    snapshot.close()
+
+
+@app.command("fake-registry")
+def fake_registry(
+    port: Annotated[int, typer.Option(help="Port to listen on")] = 8765,
+    latency_ms: Annotated[float, typer.Option(help="Mean response delay")] = 0,
+    distribution: Annotated[
+        DistributionChoice, typer.Option(help="Distribution of the delays")
+    ] = DistributionChoice("constant"),
+    error_rate: Annotated[float, typer.Option(help="Share of 500 responses")] = 0,
+    rate_limit_rate: Annotated[float, typer.Option(help="Share of 429 responses")] = 0,
+    versions: Annotated[int, typer.Option(help="Versions per package")] = 30,
+    padding_bytes: Annotated[int, typer.Option(help="Extra bytes per response")] = 0,
+) -> None:
+    """
+    Serve a local stand-in of every registry, for load and latency testing.
+
+    Point the fetchers at it with LLM_LIB_LAG_REGISTRY_URL=http://127.0.0.1:PORT
+    (or bulk --registry-url).
+    """
+    from .fake_registry import FakeRegistry, FakeRegistryConfig
+
+    config = FakeRegistryConfig(
+        latency_ms=latency_ms,
+        latency_distribution=distribution.value,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        versions_per_package=versions,
+        padding_bytes=padding_bytes,
+    )
+    registry = FakeRegistry(config, port=port)
+    console().print(f"Fake registry listening on [bold]{registry.url}[/bold]")
+    try:
+        registry.serve_forever()
+    except KeyboardInterrupt:
+        console().print(registry.stats().model_dump())
+
+
+@app.command()
+def bench(
+    size: Annotated[
+        list[int] | None,
+        typer.Option(
+            "--size", "-s", help="Synthetic runs per dataset (repeatable, up to 1M)"
+        ),
+    ] = None,
+    only: Annotated[
+        list[str] | None,
+        typer.Option(help="Only benchmarks whose name starts with this (repeatable)"),
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Timed iterations; the best counts")] = 3,
+    baseline: Annotated[
+        Path | None, typer.Option(help="Baselines file to compare against")
+    ] = None,
+    save_baseline: Annotated[
+        bool, typer.Option(help="Record these results in the baselines file")
+    ] = False,
+    tolerance: Annotated[
+        float,
+        typer.Option(help="Allowed throughput loss / memory growth, e.g. 0.2"),
+    ] = 0.2,
+) -> None:
+    """
+    Benchmark the hot paths on synthetic data: loading, missing-run detection,
+    evaluation, version extraction, Ruby page parsing and the fetchers (against
+    a local fake registry).
+
+    With --baseline, exits with code 1 if a benchmark regressed beyond the
+    tolerance.
+    """
+    from rich.table import Table
+
+    from .bench import (
+        compare_to_baselines,
+        load_baselines,
+        run_benchmarks,
+        save_baselines,
+    )
+
+    table = Table(title="Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Items", justify="right")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Items/s", justify="right", style="green")
+    table.add_column("Peak Memory", justify="right", style="yellow")
+
+    with console().status("[bold blue]Benchmarking...") as status:
+        results = run_benchmarks(
+            sizes=size,
+            only=only,
+            repeat=repeat,
+            on_result=lambda r: status.update(f"[bold blue]{r.key} done"),
+        )
+    for result in results:
+        table.add_row(
+            result.name,
+            f"{result.size:,}",
+            f"{result.items:,}",
+            f"{result.seconds:.4f}",
+            f"{result.items_per_second:,.0f}",
+            f"{result.peak_memory_bytes / 2**20:,.1f} MiB",
+        )
+    console().print(table)
+
+    if baseline is None:
+        return
+    regressions = compare_to_baselines(results, load_baselines(baseline), tolerance)
+    if save_baseline:
+        save_baselines(baseline, results)
+        console().print(f"Saved {len(results)} baselines to {baseline}")
+    if regressions:
+        table = Table(title=f"Regressions beyond {tolerance:.0%}")
+        table.add_column("Benchmark", style="cyan")
+        table.add_column("Metric")
+        table.add_column("Baseline", justify="right")
+        table.add_column("Current", justify="right")
+        table.add_column("Change", justify="right", style="red")
+        for r in regressions:
+            table.add_row(
+                r.key,
+                r.metric,
+                f"{r.baseline:,.0f}",
+                f"{r.current:,.0f}",
+                f"{r.change:+.1%}",
+            )
+        console().print(table)
+        raise typer.Exit(code=1)
+    console().print(f"[green]No regression beyond {tolerance:.0%}[/green]")
+
+
+@app.command()
+def startup(
+    command: Annotated[
+        list[str] | None,
+        typer.Argument(help="Command line to time (default: --help)"),
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Timed starts; the best counts")] = 5,
+    top: Annotated[int, typer.Option(help="Packages listed")] = 10,
+    max_seconds: Annotated[
+        float | None,
+        typer.Option(help="Exit with code 1 if startup is slower than this"),
+    ] = None,
+) -> None:
+    """
+    Time the startup of this CLI in fresh interpreters and list the packages
+    its imports spend the most time in.
+    """
+    from rich.table import Table
+
+    profile = measure_startup("llm_lib_lag.cli", command or ["--help"], repeat)
+
+    table = Table(title="Import Time by Package")
+    table.add_column("Package", style="cyan")
+    table.add_column("Time (ms)", justify="right", style="yellow")
+    for package, seconds in profile.imports[:top]:
+        table.add_row(package, f"{seconds * 1000:.1f}")
+    console().print(table)
+    console().print(
+        f"llm-lib-lag {' '.join(command or ['--help'])}: "
+        f"{profile.seconds * 1000:.0f} ms "
+        f"(bare interpreter: {profile.interpreter_seconds * 1000:.0f} ms)"
+    )
+    if max_seconds is not None and profile.seconds > max_seconds:
+        console().print(f"[red]Slower than {max_seconds:g}s[/red]")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def latency(
+    run_files: Annotated[
+        list[Path],
+        typer.Argument(help="Run files to analyse, e.g. runs*.jsonl", exists=True),
+    ],
+    history: Annotated[
+        Path | None,
+        typer.Option(help="Latency history file, updated with these sweeps"),
+    ] = None,
+    sweep_gap_hours: Annotated[
+        float, typer.Option(help="A pause longer than this starts a new sweep")
+    ] = 6,
+    percentile: Annotated[
+        Percentile, typer.Option(help="Tail statistic checked for regressions")
+    ] = Percentile.P95,
+    threshold: Annotated[
+        float, typer.Option(help="Allowed increase over the baseline, e.g. 0.25")
+    ] = 0.25,
+    baseline_sweeps: Annotated[
+        int, typer.Option(min=1, help="Previous sweeps forming the baseline")
+    ] = 3,
+    min_runs: Annotated[
+        int, typer.Option(help="Ignore sweeps with fewer runs of an LLM")
+    ] = 10,
+) -> None:
+    """
+    Report p50/p95/p99 LLM latency per provider/model and sweep, and flag
+    tail latency regressions against previous sweeps.
+
+    Exits with code 1 if the latest sweep of an LLM regressed.
+    """
+    from datetime import timedelta
+
+    from rich.table import Table
+
+    from .io_utils import load_runs_from_jsonl
+    from .latency import (
+        detect_regressions,
+        load_latency_history,
+        merge_latency_history,
+        save_latency_history,
+        sweep_latencies,
+    )
+    from .models import EvaluationRun
+
+    runs: list[EvaluationRun] = []
+    for path in run_files:
+        runs.extend(load_runs_from_jsonl(str(path)))
+    sweeps = sweep_latencies(runs, timedelta(hours=sweep_gap_hours))
+    if history is not None:
+        sweeps = merge_latency_history(load_latency_history(history), sweeps)
+        save_latency_history(history, sweeps)
+
+    table = Table(title="LLM Latency per Sweep (seconds)")
+    table.add_column("Sweep", style="yellow")
+    table.add_column("LLM", style="cyan")
+    table.add_column("Runs", justify="right")
+    for column in ("p50", "p95", "p99", "Max"):
+        table.add_column(column, justify="right")
+    for sweep in sweeps:
+        stats = sweep.stats
+        table.add_row(
+            f"{sweep.sweep_started_at:%Y-%m-%d %H:%M}",
+            sweep.llm,
+            str(stats.count),
+            f"{stats.p50:.2f}",
+            f"{stats.p95:.2f}",
+            f"{stats.p99:.2f}",
+            f"{stats.max:.2f}",
+        )
+    console().print(table)
+
+    regressions = detect_regressions(
+        sweeps,
+        threshold=threshold,
+        percentile=percentile.value,
+        baseline_sweeps=baseline_sweeps,
+        min_runs=min_runs,
+    )
+    if not regressions:
+        console().print(
+            f"[green]No {percentile.value} regression beyond {threshold:.0%}[/green]"
+        )
+        return
+
+    table = Table(title=f"{percentile.value} Latency Regressions")
+    table.add_column("LLM", style="cyan")
+    table.add_column("Sweep", style="yellow")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right", style="red")
+    for r in regressions:
+        table.add_row(
+            r.llm,
+            f"{r.sweep_started_at:%Y-%m-%d %H:%M}",
+            f"{r.baseline:.2f}s",
+            f"{r.current:.2f}s",
+            f"{r.change:+.0%}",
+        )
+    console().print(table)
+    raise typer.Exit(code=1)
+
+
+@app.command()
+def watch(
+    file: Annotated[
+        Path | None,
+        typer.Option(help="Ground truths file (default: the packaged data file)"),
+    ] = None,
+    runs: Annotated[
+        Path,
+        typer.Option(help="Run file of the sweep (its worker files are read too)"),
+    ] = Path("runs.jsonl"),
+    # watch.DEFAULT_INTERVAL, not imported to keep startup light
+    interval: Annotated[float, typer.Option(help="Seconds between two polls")] = 300.0,
+    ttl: Annotated[
+        float, typer.Option(help="Seconds registry responses are reused unchecked")
+    ] = 0,
+    workers: Annotated[
+        int, typer.Option("--workers", "-w", help="Concurrent registry requests")
+    ] = 8,
+    queue: Annotated[
+        Path | None,
+        typer.Option(help="Work queue to enqueue the re-queries into"),
+    ] = None,
+    once: Annotated[bool, typer.Option("--once", help="Poll once and exit")] = False,
+) -> None:
+    """
+    Poll the registries for new releases, update the ground truths and
+    re-evaluate only the techs that changed.
+
+    Stored answers of changed techs are rescored at once; their LLMs are
+    re-queried by the next `main.py` run, or by the workers of --queue.
+    """
+    from rich.table import Table
+
+    from .metrics import compute_metrics
+    from .watch import WatchEvent, watch as watch_releases
+    from .work_queue import WorkQueue, sweep_run_files
+
+    work_queue = WorkQueue(queue) if queue is not None else None
+
+    def report(event: WatchEvent) -> None:
+        for update in event.failures:
+            console().print(f"[red]{update.old.tech}: {update.error}[/red]")
+        if not event.changes:
+            return
+        table = Table(title="New Releases")
+        table.add_column("Library", style="cyan")
+        table.add_column("Old", style="yellow")
+        table.add_column("New", style="green")
+        for change in event.changes:
+            assert change.new is not None
+            table.add_row(
+                str(change.old.tech),
+                f"{change.old.version} ({change.old.release_date})",
+                f"{change.new.version} ({change.new.release_date})",
+            )
+        console().print(table)
+        if event.rescored:
+            metrics = compute_metrics(event.rescored)
+            console().print(_metrics_table("Rescored Answers by LLM", metrics.by_llm))
+        if work_queue is not None:
+            console().print(f"{event.scheduled} re-queries enqueued in {queue}")
+        else:
+            console().print("Run main.py to re-query the LLMs on the new versions")
+
+    try:
+        watch_releases(
+            file,
+            run_files=sweep_run_files(runs),
+            queue=work_queue,
+            interval=interval,
+            ttl_seconds=ttl,
+            max_workers=workers,
+            on_event=report,
+            iterations=1 if once else None,
+        )
+    except KeyboardInterrupt:
+        console().print("Stopped")
+    finally:
+        if work_queue is not None:
+            work_queue.close()
+
+
+@app.command()
+def serve(
+    runs: Annotated[
+        Path,
+        typer.Option(help="Run file of the sweep (its worker files are read too)"),
+    ] = Path("runs.jsonl"),
+    host: Annotated[str, typer.Option(help="Interface to listen on")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Port to listen on")] = 8000,
+    refresh_interval: Annotated[
+        float, typer.Option(help="Minimum seconds between two reads of new runs")
+    ] = 1.0,
+) -> None:
+    """
+    Serve lag metrics as JSON from an in-memory index of the runs.
+
+    Endpoints: /summary, /lag/llm, /lag/tech (with optional since/until
+    dates) and /lag/top?n=10&statistic=median. Runs appended to the files
+    are picked up incrementally.
+    """
+    from .server import RunIndex, RunQueryService, serve_runs
+
+    index = RunIndex(runs)
+    with console().status(f"[bold blue]Indexing {runs}..."):
+        index.refresh()
+    server = serve_runs(RunQueryService(index, refresh_interval), port, host)
+    console().print(
+        f"Serving {index.input_runs} runs on "
+        f"[cyan]http://{host}:{server.server_address[1]}[/cyan] (Ctrl+C to stop)"
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        server.server_close()
+
+
 def main() -> None:
     app()
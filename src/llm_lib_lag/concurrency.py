@@ -0,0 +1,385 @@
+"""
+Adaptive concurrency per provider, driven by rate-limit signals.
+
+Each provider gets an AIMD limiter (additive increase, multiplicative
+decrease, as in TCP congestion control): every successful call raises its
+concurrency limit by about one per window of calls, every 429/overload
+error halves it and pauses new calls for the provider's retry-after hint,
+and every timed out run halves it too (without a pause). The
+limit oscillates just under the provider's actual capacity, whatever the
+account tier, without per-provider tuning.
+
+AdaptiveExecutor sits between the list of pending (LLM, ground truth) pairs
+and `run_single_evaluation`: it runs each provider's pairs within that
+provider's limit and retries rate-limited calls.
+"""
+
+import email.utils
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+from .models import EvaluationRun, LLMConfig, RunStatus, TechVersionGroundTruth
+from .monitoring import CONCURRENCY_LIMIT, RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_STATUSES = frozenset({429})
+OVERLOAD_STATUSES = frozenset({503, 529})
+"""Server overload (Anthropic uses 529), handled like a rate limit."""
+
+RATE_LIMIT_NAMES = ("RateLimit", "Overloaded", "ResourceExhausted")
+"""Exception class name fragments of provider SDKs' rate-limit errors."""
+
+
+class RateLimited(NamedTuple):
+    retry_after: float | None
+    """Seconds the provider asked to wait, if it said."""
+
+
+def _status_code(error: BaseException) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _parse_retry_after(value: Any) -> float | None:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _retry_after(error: BaseException) -> float | None:
+    retry_after = _parse_retry_after(getattr(error, "retry_after", None))
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        return _parse_retry_after(headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def rate_limit_signal(error: BaseException) -> RateLimited | None:
+    """
+    Recognizes rate-limit and overload errors of the provider SDKs without
+    importing them: by HTTP status, then by class name. Chained causes are
+    inspected too, since LangChain sometimes wraps the SDK error.
+
+    :return: The signal, or None if `error` is not a rate limit.
+    """
+    seen: set[int] = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        status = _status_code(current)
+        if status in RATE_LIMIT_STATUSES or status in OVERLOAD_STATUSES:
+            return RateLimited(_retry_after(current))
+        if any(name in type(current).__name__ for name in RATE_LIMIT_NAMES):
+            return RateLimited(_retry_after(current))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+class AIMDLimiter:
+    """
+    A concurrency limit adapting to rate limits.
+
+    Usage:
+        started = limiter.acquire()
+        try:
+            result = call()
+        except RateLimitError as e:
+            limiter.on_rate_limit(started, e.retry_after)
+        else:
+            limiter.on_success(started)
+    """
+
+    def __init__(
+        self,
+        initial: float = 2.0,
+        min_limit: float = 1.0,
+        max_limit: float = 32.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        default_retry_after: float = 1.0,
+    ) -> None:
+        """
+        :param initial: Starting concurrency limit.
+        :param min_limit: The limit never drops below this.
+        :param max_limit: The limit never grows beyond this.
+        :param increase: Growth of the limit per window of successful calls
+            (a window being `limit` calls).
+        :param decrease: Factor applied to the limit on a rate limit.
+        :param default_retry_after: Pause after a rate limit without hint.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be within (0, 1), got {decrease}")
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.default_retry_after = default_retry_after
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def acquire(self, stop: threading.Event | None = None) -> float | None:
+        """
+        Waits for a free slot under the limit and outside any pause.
+
+        :param stop: If set while waiting, gives up.
+        :return: When the slot was acquired, to pass back with the outcome;
+            None if `stop` was set.
+        """
+        with self._condition:
+            while True:
+                if stop is not None and stop.is_set():
+                    return None
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._condition.wait(self._paused_until - now)
+                elif self.in_flight >= int(self.limit):
+                    self._condition.wait(0.1 if stop is not None else None)
+                else:
+                    self.in_flight += 1
+                    return now
+
+    def try_acquire(self) -> float | None:
+        """
+        Takes a free slot if there is one right now, without waiting.
+
+        :return: When the slot was acquired, or None if the limit is reached
+            or the provider is paused.
+        """
+        with self._condition:
+            now = time.monotonic()
+            if now < self._paused_until or self.in_flight >= int(self.limit):
+                return None
+            self.in_flight += 1
+            return now
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._condition.notify_all()
+
+    def on_success(self, started: float) -> None:
+        with self._condition:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._release()
+
+    def on_rate_limit(self, started: float, retry_after: float | None = None) -> None:
+        """
+        Backs off. Calls started before the last decrease were sent at the
+        old limit: their rate limits are the same congestion event and do
+        not shrink the limit again.
+        """
+        with self._condition:
+            now = self._decrease(started)
+            pause = self.default_retry_after if retry_after is None else retry_after
+            self._paused_until = max(self._paused_until, now + pause)
+            self._release()
+
+    def on_timeout(self, started: float) -> None:
+        """
+        Backs off without pausing: a call running out of time is a sign of a
+        provider queueing requests, like a rate limit without a hint.
+        """
+        with self._condition:
+            self._decrease(started)
+            self._release()
+
+    def _decrease(self, started: float) -> float:
+        """Shrinks the limit once per congestion event; returns the time now."""
+        now = time.monotonic()
+        if started >= self._last_decrease:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self._last_decrease = now
+        return now
+
+    def on_error(self, started: float) -> None:
+        """Releases the slot of a call failing for another reason, or never made."""
+        with self._condition:
+            self._release()
+
+
+class Outcome(NamedTuple):
+    llm_config: LLMConfig
+    ground_truth: TechVersionGroundTruth
+    run: EvaluationRun | None
+    error: BaseException | None
+
+
+class AdaptiveExecutor:
+    """
+    Runs evaluations concurrently, each provider within its AIMD limit.
+
+    Usage:
+        executor = AdaptiveExecutor(lambda llm, gt: run_single_evaluation(...))
+        for outcome in executor.run(missing):
+            ...
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[LLMConfig, TechVersionGroundTruth], EvaluationRun],
+        initial_concurrency: float = 2.0,
+        max_concurrency: int = 16,
+        max_attempts: int = 5,
+    ) -> None:
+        """
+        :param evaluate: Runs one evaluation; provider rate limits propagate
+            as exceptions.
+        :param initial_concurrency: Starting limit of every provider.
+        :param max_concurrency: Upper bound of every provider's limit.
+        :param max_attempts: Rate-limited attempts of one pair before it is
+            given up (it stays missing and is retried by the next sweep).
+        """
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.evaluate = evaluate
+        self.initial_concurrency = min(initial_concurrency, max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.limiters: dict[str, AIMDLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def limiter(self, provider: str) -> AIMDLimiter:
+        # The first workers of a provider ask for its limiter at the same time
+        with self._limiters_lock:
+            if provider not in self.limiters:
+                limiter = AIMDLimiter(
+                    initial=self.initial_concurrency, max_limit=self.max_concurrency
+                )
+                self.limiters[provider] = limiter
+                CONCURRENCY_LIMIT.set_function(lambda: limiter.limit, provider=provider)
+            return self.limiters[provider]
+
+    def _evaluate(
+        self,
+        provider: str,
+        llm_config: LLMConfig,
+        ground_truth: TechVersionGroundTruth,
+        stop: threading.Event,
+    ) -> Outcome | None:
+        limiter = self.limiter(provider)
+        error: BaseException | None = None
+        for attempt in range(1, self.max_attempts + 1):
+            started = limiter.acquire(stop)
+            if started is None:
+                return None
+            try:
+                run = self.evaluate(llm_config, ground_truth)
+            except Exception as e:
+                signal = rate_limit_signal(e)
+                if signal is None:
+                    limiter.on_error(started)
+                    logger.error(
+                        f"{llm_config.provider}/{llm_config.model} failed on "
+                        f"{ground_truth.tech.name}: {e}",
+                        exc_info=True,
+                    )
+                    return Outcome(llm_config, ground_truth, None, e)
+                limiter.on_rate_limit(started, signal.retry_after)
+                RATE_LIMITED.inc(provider=provider)
+                logger.info(
+                    f"{provider} rate limited (attempt {attempt}), concurrency "
+                    f"limit now {limiter.limit:.1f}"
+                )
+                error = e
+            except BaseException:
+                # Not a failure of the call (e.g. SystemExit): free the slot
+                limiter.on_error(started)
+                raise
+            else:
+                # Timed out runs are kept, but their slowness is congestion
+                if run.status == RunStatus.TIMEOUT:
+                    limiter.on_timeout(started)
+                else:
+                    limiter.on_success(started)
+                return Outcome(llm_config, ground_truth, run, None)
+        logger.error(
+            f"Giving up {llm_config.provider}/{llm_config.model} on "
+            f"{ground_truth.tech.name} after {self.max_attempts} rate limits"
+        )
+        return Outcome(llm_config, ground_truth, None, error)
+
+    def run(
+        self, pairs: Iterable[tuple[LLMConfig, TechVersionGroundTruth]]
+    ) -> Iterator[Outcome]:
+        """
+        Evaluates `pairs`, yielding each outcome as it completes (not in
+        input order). Failed evaluations are logged and yielded with their
+        error. Closing the iterator early lets in-flight calls finish but
+        starts no new one.
+        """
+        pending: dict[str, deque[tuple[LLMConfig, TechVersionGroundTruth]]] = (
+            defaultdict(deque)
+        )
+        total = 0
+        for llm_config, ground_truth in pairs:
+            pending[llm_config.provider].append((llm_config, ground_truth))
+            total += 1
+
+        outcomes: queue.Queue[Outcome] = queue.Queue()
+        stop = threading.Event()
+        lock = threading.Lock()
+
+        def worker(provider: str) -> None:
+            work = pending[provider]
+            while not stop.is_set():
+                with lock:
+                    if not work:
+                        return
+                    llm_config, ground_truth = work.popleft()
+                outcome = None
+                try:
+                    outcome = self._evaluate(provider, llm_config, ground_truth, stop)
+                except BaseException as e:
+                    # The consumer counts one outcome per pair: hand it the
+                    # error to re-raise rather than leave it waiting forever
+                    outcome = Outcome(llm_config, ground_truth, None, e)
+                    return
+                finally:
+                    if outcome is not None:
+                        outcomes.put(outcome)
+
+        for provider, work in pending.items():
+            # The limiter, not the thread count, bounds the concurrency
+            for i in range(min(self.max_concurrency, len(work))):
+                threading.Thread(
+                    target=worker,
+                    args=(provider,),
+                    name=f"evaluate-{provider}-{i}",
+                    daemon=True,
+                ).start()
+
+        try:
+            for _ in range(total):
+                outcome = outcomes.get()
+                if outcome.error is not None and not isinstance(
+                    outcome.error, Exception
+                ):
+                    raise outcome.error
+                yield outcome
+        finally:
+            stop.set()
@@ -0,0 +1,105 @@
+"""
+Deadlines bounding the time one evaluation run may take.
+
+A Deadline is a time budget shared by the steps of a run (LLM call, registry
+lookup). `call_with_deadline` runs one step against the remaining budget and
+raises DeadlineExceededError when it is spent.
+
+Blocking client calls cannot be interrupted from another thread, so the step
+runs in a daemon thread that is abandoned when the deadline passes: the
+caller moves on immediately, and the abandoned call ends on its own when the
+client's own timeout (set to the same budget) fires. Daemon threads never
+delay the interpreter's exit.
+"""
+
+import contextvars
+import threading
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceededError(TimeoutError):
+    """A step did not finish before the deadline of its run."""
+
+    def __init__(self, stage: str, budget_seconds: float) -> None:
+        super().__init__(f"{stage} exceeded the {budget_seconds:g}s deadline")
+        self.stage = stage
+        self.budget_seconds = budget_seconds
+
+
+class Deadline:
+    """
+    A time budget starting at creation.
+
+    Usage:
+        deadline = Deadline(30)
+        answer = call_with_deadline(lambda: llm.invoke(prompt), deadline, "llm")
+        date = call_with_deadline(lambda: lookup(answer), deadline, "registry")
+    """
+
+    def __init__(self, seconds: float | None) -> None:
+        """
+        :param seconds: The budget; None for no deadline.
+        """
+        if seconds is not None and seconds <= 0:
+            raise ValueError(f"Deadline budget must be positive, got {seconds}")
+        self.seconds = seconds
+        self._expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> float | None:
+        """:return: Seconds left (0 once expired), or None without deadline."""
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def check(self, stage: str) -> None:
+        """:raise DeadlineExceededError: If the deadline has passed."""
+        if self.expired:
+            assert self.seconds is not None
+            raise DeadlineExceededError(stage, self.seconds)
+
+
+def call_with_deadline(func: Callable[[], T], deadline: Deadline, stage: str) -> T:
+    """
+    Calls `func`, giving up when `deadline` passes.
+
+    The call runs in the caller's context (tracing spans nest as usual), and
+    its exceptions propagate to the caller.
+
+    :param func: The step to run.
+    :param deadline: The deadline of the run the step belongs to.
+    :param stage: Name of the step, reported by DeadlineExceededError.
+    :return: The result of `func`.
+    :raise DeadlineExceededError: If `func` did not return in time. It keeps
+        running in the background; its result is discarded.
+    """
+    remaining = deadline.remaining()
+    if remaining is None:
+        return func()
+    deadline.check(stage)
+
+    outcome: list[T] = []
+    error: list[BaseException] = []
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        try:
+            outcome.append(context.run(func))
+        except BaseException as e:
+            error.append(e)
+
+    thread = threading.Thread(target=target, name=f"deadline-{stage}", daemon=True)
+    thread.start()
+    thread.join(remaining)
+    if thread.is_alive():
+        assert deadline.seconds is not None
+        raise DeadlineExceededError(stage, deadline.seconds)
+    if error:
+        raise error[0]
+    return outcome[0]
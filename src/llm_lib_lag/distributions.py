@@ -0,0 +1,34 @@
+import math
+import random
+from typing import Literal
+
+LatencyDistribution = Literal["constant", "uniform", "exponential", "lognormal"]
+
+
+def sample_latency(
+    rng: random.Random,
+    mean: float,
+    distribution: LatencyDistribution = "constant",
+    sigma: float = 0.5,
+) -> float:
+    """
+    Draws a delay from a distribution with the given mean.
+
+    :param rng: The random generator to draw from.
+    :param mean: Mean delay, in any unit; the result has the same unit.
+    :param distribution: "constant" (always the mean), "uniform" on
+        [0, 2 * mean], "exponential", or "lognormal" (heavy tail, shaped by sigma).
+    :param sigma: Standard deviation of the log of a lognormal delay.
+    """
+    if mean <= 0:
+        return 0.0
+    match distribution:
+        case "constant":
+            return mean
+        case "uniform":
+            return rng.uniform(0, 2 * mean)
+        case "exponential":
+            return rng.expovariate(1 / mean)
+        case "lognormal":
+            # mu chosen so that the distribution has the requested mean
+            return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
@@ -1,202 +1,162 @@
 import logging
-from typing import Sequence
-from packaging.version import parse
-from .models import EvaluationRun
-import statistics  # Import the statistics module
+from datetime import date
+from typing import Mapping, Sequence
+from .bootstrap import BootstrapReport, MetricInterval, bootstrap_metrics
+from .metrics import GroupMetrics, MetricsReport, compute_metrics
+from .models import EvaluationRun, LLMConfig
+from .release_history import rescore_runs
 
 logger = logging.getLogger(__name__)
 
 
-def evaluate_runs(runs: Sequence[EvaluationRun]) -> None:
+def evaluate_runs(
+    runs: Sequence[EvaluationRun],
+    n_resamples: int = 0,
+    seed: int | None = None,
+    as_of: date | Mapping[LLMConfig, date] | None = None,
+) -> MetricsReport | None:
     """
     Takes a list of EvaluationRun objects and compares parsed versions
     to the ground truths. Logs per-LLM, per-software, and overall metrics.
 
     :param runs: A list of EvaluationRun objects with ground_truth + LLM outputs.
+    :param n_resamples: If > 0, also logs bootstrap confidence intervals
+        computed from this many resamples.
+    :param seed: Seed of the bootstrap, for reproducible intervals.
+    :param as_of: If set, stored answers are rescored against the latest version
+        as of this date (or as of a date per LLM, e.g. its training cutoff)
+        instead of the ground truth they were run with. No LLM is called.
+    :return: The computed MetricsReport, or None if there was nothing to evaluate.
     """
+    if as_of is not None:
+        runs = rescore_runs(runs, as_of)
+
     if not runs:
         logger.warning("No evaluation runs provided.")
+        return None
+
+    report = compute_metrics(runs)
+    log_report(report)
+
+    if n_resamples > 0:
+        log_intervals(bootstrap_metrics(runs, n_resamples=n_resamples, seed=seed))
+
+    return report
+
+
+def _log_matches(metrics: GroupMetrics, indent: str) -> None:
+    logger.info(
+        f"{indent}Exact Matches: {metrics.exact_matches} "
+        f"({metrics.exact_match_rate:.2%})"
+    )
+    logger.info(
+        f"{indent}Major Matches: {metrics.major_matches} "
+        f"({metrics.major_match_rate:.2%})"
+    )
+    logger.info(
+        f"{indent}Minor Matches: {metrics.minor_matches} "
+        f"({metrics.minor_match_rate:.2%})"
+    )
+
+
+def _log_lag(metrics: GroupMetrics, indent: str, subject: str) -> None:
+    if metrics.lag is None:
+        logger.info(f"{indent}Lag data not available for this {subject}.")
         return
+    logger.info(f"{indent}Average Lag (days): {metrics.lag.mean:.2f}")
+    logger.info(f"{indent}Median Lag (days): {metrics.lag.median:.2f}")
+    logger.info(f"{indent}P95 Lag (days): {metrics.lag.p95:.2f}")
+    logger.info(f"{indent}Max Lag (days): {metrics.lag.max:g}")
 
-    # First, group runs by (software, provider, model) and keep only the latest
-    latest_runs: dict[tuple[str, str, str], EvaluationRun] = {}
-    for run in runs:
-        key = (
-            run.ground_truth.tech.name,
-            run.llm_config.provider,
-            run.llm_config.model,
-        )
-        if key not in latest_runs or run.timestamp > latest_runs[key].timestamp:
-            latest_runs[key] = run
 
-    filtered_runs = list(latest_runs.values())
-    total_runs = len(filtered_runs)
+def log_report(report: MetricsReport) -> None:
+    """
+    Logs a MetricsReport: overall results, then a breakdown by tech and by LLM.
+
+    :param report: The report returned by compute_metrics.
+    """
+    overall = report.overall
 
     # Possibly some runs were duplicates
-    if len(runs) != total_runs:
+    if report.input_runs != overall.total_runs:
         logger.info(
-            f"Filtered out {len(runs) - total_runs} older/duplicate runs, "
+            f"Filtered out {report.input_runs - overall.total_runs} older/duplicate runs, "
             "keeping only the latest run for each technology/LLM combination."
         )
 
-    exact_matches = 0
-    major_matches = 0
-    minor_matches = 0
-    total_execution_time = 0.0
-
-    by_software: dict[str, list[EvaluationRun]] = {}
-    by_llm: dict[str, list[EvaluationRun]] = {}
-
-    for run in filtered_runs:
-        name = run.ground_truth.tech.name
-        llm_key = f"{run.llm_config.provider}/{run.llm_config.model}"
-
-        # Group by software name
-        by_software.setdefault(name, []).append(run)
-
-        # Group by LLM
-        by_llm.setdefault(llm_key, []).append(run)
-
-        total_execution_time += run.execution_time_seconds
-
-        if run.parsed_version:
-            try:
-                gt_version = parse(run.ground_truth.version)
-                response_version = parse(run.parsed_version)
-
-                if gt_version == response_version:
-                    exact_matches += 1
-                if gt_version.major == response_version.major:
-                    major_matches += 1
-                if (
-                    gt_version.major == response_version.major
-                    and gt_version.minor == response_version.minor
-                ):
-                    minor_matches += 1
-            except Exception as e:
-                logger.error(
-                    f"Error parsing version for {name} ({llm_key}): {str(e)}",
-                    exc_info=True,
-                )
-
     # Overall results
     logger.info("-" * 50)
     logger.info("Overall Evaluation Results:")
-    logger.info(f"Total Runs Evaluated: {total_runs}")
-    logger.info(f"Exact Matches: {exact_matches} ({exact_matches / total_runs:.2%})")
+    logger.info(f"Total Runs Evaluated: {overall.total_runs}")
     logger.info(
-        f"Major Version Matches: {major_matches} ({major_matches / total_runs:.2%})"
+        f"Exact Matches: {overall.exact_matches} ({overall.exact_match_rate:.2%})"
     )
     logger.info(
-        f"Minor Version Matches: {minor_matches} ({minor_matches / total_runs:.2%})"
+        f"Major Version Matches: {overall.major_matches} "
+        f"({overall.major_match_rate:.2%})"
     )
     logger.info(
-        f"Average Execution Time: {total_execution_time / total_runs:.2f} seconds"
+        f"Minor Version Matches: {overall.minor_matches} "
+        f"({overall.minor_match_rate:.2%})"
     )
+    logger.info(f"Average Execution Time: {overall.avg_execution_time:.2f} seconds")
     logger.info("-" * 50)
 
     # Breakdown by software
     logger.info("\nResults by Tech:")
-    for name, software_runs in by_software.items():
+    for name, metrics in report.by_tech.items():
         logger.info(f"\n  {name}:")
-        software_total = len(software_runs)
-        software_exact = 0
-        software_major = 0
-        software_minor = 0
-        software_lags: list[float] = []  # List to store lag_days for this software
-
-        for run in software_runs:
-            if run.parsed_version:
-                try:
-                    gt_version = parse(run.ground_truth.version)
-                    response_version = parse(run.parsed_version)
-
-                    if gt_version == response_version:
-                        software_exact += 1
-                    if gt_version.major == response_version.major:
-                        software_major += 1
-                    if (
-                        gt_version.major == response_version.major
-                        and gt_version.minor == response_version.minor
-                    ):
-                        software_minor += 1
-                    if run.lag_days is not None:  # Check if lag_days is available
-                        software_lags.append(run.lag_days)
-                except Exception as e:
-                    logger.error(
-                        f"Error parsing version for {name} "
-                        f"({run.llm_config.provider}/{run.llm_config.model}): {str(e)}",
-                        exc_info=True,
-                    )
-
-        logger.info(f"    Total Runs: {software_total}")
+        logger.info(f"    Total Runs: {metrics.total_runs}")
+        _log_matches(metrics, "    ")
+        _log_lag(metrics, "    ", "software")
+
+    # Breakdown by LLM
+    logger.info("\nResults by LLM:")
+    for llm, metrics in report.by_llm.items():
+        logger.info(f"\n  {llm}:")
+        logger.info(f"    Total Runs: {metrics.total_runs}")
+        _log_matches(metrics, "    ")
+        logger.info(
+            f"    Average Execution Time: {metrics.avg_execution_time:.2f} seconds"
+        )
+        _log_lag(metrics, "    ", "LLM")
+
+
+def format_interval(interval: MetricInterval, fmt: str = ".2f") -> str:
+    """Formats an interval as "estimate [low, high]"."""
+    return f"{interval.estimate:{fmt}} [{interval.low:{fmt}}, {interval.high:{fmt}}]"
+
+
+def log_intervals(report: BootstrapReport) -> None:
+    """
+    Logs the bootstrap confidence intervals of every LLM, best exact match rate first.
+
+    :param report: The report returned by bootstrap_metrics.
+    """
+    logger.info(
+        f"\nConfidence intervals by LLM ({report.confidence:.0%}, "
+        f"{report.n_resamples} resamples):"
+    )
+    ranking = sorted(
+        report.by_llm.items(),
+        key=lambda item: item[1].exact_match_rate.estimate,
+        reverse=True,
+    )
+    for llm, intervals in ranking:
+        logger.info(f"\n  {llm}:")
         logger.info(
-            f"    Exact Matches: {software_exact} "
-            f"({software_exact / software_total:.2%})"
+            f"    Exact Match Rate: {format_interval(intervals.exact_match_rate, '.2%')}"
         )
         logger.info(
-            f"    Major Matches: {software_major} "
-            f"({software_major / software_total:.2%})"
+            f"    Major Match Rate: {format_interval(intervals.major_match_rate, '.2%')}"
         )
         logger.info(
-            f"    Minor Matches: {software_minor} "
-            f"({software_minor / software_total:.2%})"
+            f"    Minor Match Rate: {format_interval(intervals.minor_match_rate, '.2%')}"
         )
-        if software_lags:
-            logger.info(f"    Average Lag (days): {statistics.mean(software_lags):.2f}")
+        if intervals.lag_mean and intervals.lag_median:
             logger.info(
-                f"    Median Lag (days): {statistics.median(software_lags):.2f}"
+                f"    Average Lag (days): {format_interval(intervals.lag_mean)}"
+            )
+            logger.info(
+                f"    Median Lag (days): {format_interval(intervals.lag_median)}"
             )
-            logger.info(f"    Max Lag (days): {max(software_lags)}")
-        else:
-            logger.info("    Lag data not available for this software.")
-
-    # Breakdown by LLM
-    logger.info("\nResults by LLM:")
-    for llm_key, llm_runs in by_llm.items():
-        logger.info(f"\n  {llm_key}:")
-        llm_total = len(llm_runs)
-        llm_exact = 0
-        llm_major = 0
-        llm_minor = 0
-        llm_total_time = 0.0
-        llm_lags: list[float] = []  # List to store lag_days for this LLM
-
-        for run in llm_runs:
-            llm_total_time += run.execution_time_seconds
-            if run.parsed_version:
-                try:
-                    gt_version = parse(run.ground_truth.version)
-                    response_version = parse(run.parsed_version)
-
-                    if gt_version == response_version:
-                        llm_exact += 1
-                    if gt_version.major == response_version.major:
-                        llm_major += 1
-                    if (
-                        gt_version.major == response_version.major
-                        and gt_version.minor == response_version.minor
-                    ):
-                        llm_minor += 1
-                    if run.lag_days is not None:
-                        llm_lags.append(run.lag_days)
-                except Exception as e:
-                    logger.error(
-                        f"Error parsing version for {run.ground_truth.tech.name} "
-                        f"({run.llm_config.provider}/{run.llm_config.model}): {str(e)}",
-                        exc_info=True,
-                    )
-
-        logger.info(f"    Total Runs: {llm_total}")
-        logger.info(f"    Exact Matches: {llm_exact} ({llm_exact / llm_total:.2%})")
-        logger.info(f"    Major Matches: {llm_major} ({llm_major / llm_total:.2%})")
-        logger.info(f"    Minor Matches: {llm_minor} ({llm_minor / llm_total:.2%})")
-        logger.info(
-            f"    Average Execution Time: {llm_total_time / llm_total:.2f} seconds"
-        )
-        if llm_lags:
-            logger.info(f"    Average Lag (days): {statistics.mean(llm_lags):.2f}")
-            logger.info(f"    Median Lag (days): {statistics.median(llm_lags):.2f}")
-            logger.info(f"    Max Lag (days): {max(llm_lags)}")
-        else:
-            logger.info("    Lag data not available for this LLM.")
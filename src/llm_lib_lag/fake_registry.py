@@ -0,0 +1,524 @@
+"""
+Local stand-in registry for load and latency testing of the fetchers.
+
+FakeRegistry serves synthetic npm packuments, PyPI JSON, Maven metadata and
+Solr search results, GitHub releases, the actions/python-versions manifest
+and the ruby-lang.org releases page, under the paths of
+RegistryEndpoints.from_base_url. Every package exists (unless its name
+starts with `not_found_prefix`) and its release timeline is derived from its
+name, so runs are reproducible. Latency, errors, 429s and response sizes are
+configurable. Responses carry an ETag and conditional requests get a 304.
+
+Usage:
+    with FakeRegistry(FakeRegistryConfig(latency_ms=20)) as registry:
+        set_registry_endpoints(registry.endpoints)
+        fetch_latest_version_and_date(...)
+        print(registry.stats())
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .distributions import LatencyDistribution, sample_latency
+from .fetchers.http import RegistryEndpoints
+
+logger = logging.getLogger(__name__)
+
+
+class FakeRegistryConfig(BaseModel):
+    """Behaviour of a FakeRegistry."""
+
+    model_config = ConfigDict(frozen=True)
+
+    latency_ms: float = Field(default=0.0, ge=0, description="Mean response delay")
+    latency_distribution: LatencyDistribution = "constant"
+    latency_sigma: float = Field(
+        default=0.5, ge=0, description="Shape of the lognormal distribution"
+    )
+    error_rate: float = Field(default=0.0, ge=0, le=1, description="Share of 500s")
+    rate_limit_rate: float = Field(default=0.0, ge=0, le=1, description="Share of 429s")
+    retry_after_seconds: int = Field(default=0, ge=0)
+    versions_per_package: int = Field(default=30, ge=1)
+    padding_bytes: int = Field(
+        default=0, ge=0, description="Extra bytes per response (readme, description)"
+    )
+    not_found_prefix: str = Field(
+        default="missing-", description="Packages whose name starts with this 404"
+    )
+    as_of: date = Field(
+        default=date(2025, 2, 1), description="Release date of every latest version"
+    )
+    seed: int = 0
+
+
+class RegistryStats(BaseModel):
+    """What a FakeRegistry served so far."""
+
+    model_config = ConfigDict(frozen=True)
+
+    requests: int
+    connections: int
+    """TCP connections accepted; lower than requests when keep-alive works."""
+    by_route: dict[str, int]
+    by_status: dict[int, int]
+    bytes_sent: int
+
+
+# GitHub repositories whose tags are not plain version numbers
+_TAG_FORMATS = {
+    ("dotnet", "core"): "v{version}",
+    ("actions", "python-versions"): "{version}-{build}",
+}
+
+
+def _seed_of(key: str) -> int:
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "little")
+
+
+class _Timeline:
+    """Deterministic release timeline of one package: oldest first."""
+
+    def __init__(self, key: str, count: int, as_of: date) -> None:
+        seed = _seed_of(key)
+        major = 1 + seed % 5
+        self.versions = [f"{major}.{i // 10}.{i % 10}" for i in range(count)]
+        spacing = 3 + seed % 11
+        self.dates = [
+            as_of - timedelta(days=spacing * (count - 1 - i)) for i in range(count)
+        ]
+        self.builds = [
+            str(10_000_000_000 + (seed + i) % 9_000_000_000) for i in range(count)
+        ]
+
+    @property
+    def latest(self) -> tuple[str, date]:
+        return self.versions[-1], self.dates[-1]
+
+    def items(self) -> list[tuple[str, date]]:
+        return list(zip(self.versions, self.dates))
+
+
+def _iso(day: date) -> str:
+    return (
+        datetime.combine(day, dt_time(12, 0), tzinfo=UTC)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+class FakeRegistry:
+    """A threaded HTTP server impersonating every registry the fetchers use."""
+
+    def __init__(
+        self,
+        config: FakeRegistryConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        :param config: Latency, error and size settings.
+        :param host: Interface to listen on.
+        :param port: Port to listen on; 0 picks a free one.
+        """
+        self.config = config or FakeRegistryConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._routes: Counter[str] = Counter()
+        self._statuses: Counter[int] = Counter()
+        self._connections = 0
+        self._bytes_sent = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    # -------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoints(self) -> RegistryEndpoints:
+        return RegistryEndpoints.from_base_url(self.url)
+
+    def start(self) -> "FakeRegistry":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-registry",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Fake registry listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeRegistry":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Serves in the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            return RegistryStats(
+                requests=sum(self._routes.values()),
+                connections=self._connections,
+                by_route=dict(self._routes),
+                by_status=dict(self._statuses),
+                bytes_sent=self._bytes_sent,
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._statuses.clear()
+            self._connections = 0
+            self._bytes_sent = 0
+
+    # -------------------------------------------------------------
+    # Behaviour
+    # -------------------------------------------------------------
+    def _delay(self) -> float:
+        with self._lock:
+            return sample_latency(
+                self._rng,
+                self.config.latency_ms / 1000,
+                self.config.latency_distribution,
+                self.config.latency_sigma,
+            )
+
+    def _injected_status(self) -> int | None:
+        with self._lock:
+            draw = self._rng.random()
+        if draw < self.config.rate_limit_rate:
+            return 429
+        if draw < self.config.rate_limit_rate + self.config.error_rate:
+            return 500
+        return None
+
+    def _timeline(self, key: str) -> _Timeline:
+        return _Timeline(key, self.config.versions_per_package, self.config.as_of)
+
+    def _exists(self, name: str) -> bool:
+        prefix = self.config.not_found_prefix
+        return not (prefix and name.startswith(prefix))
+
+    def _record(self, route: str, status: int, size: int) -> None:
+        with self._lock:
+            self._routes[route] += 1
+            self._statuses[status] += 1
+            self._bytes_sent += size
+
+    def _count_connection(self) -> None:
+        with self._lock:
+            self._connections += 1
+
+    # -------------------------------------------------------------
+    # Routes: (route name, status, content type, body)
+    # -------------------------------------------------------------
+    def respond(self, raw_path: str) -> tuple[str, int, str, bytes]:
+        split = urlsplit(raw_path)
+        path, query = split.path, parse_qs(split.query)
+        for pattern, handler in self._ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match:
+                return handler(self, query, *match.groups())
+        return "unknown", 404, "application/json", b'{"error": "not found"}'
+
+    def _json(
+        self, route: str, body: Any, status: int = 200
+    ) -> tuple[str, int, str, bytes]:
+        return route, status, "application/json", json.dumps(body).encode()
+
+    def _padding(self) -> str:
+        return "x" * self.config.padding_bytes
+
+    def _npm(
+        self, query: dict[str, list[str]], name: str
+    ) -> tuple[str, int, str, bytes]:
+        if not self._exists(name):
+            return self._json("npm", {"error": "Not found"}, 404)
+        timeline = self._timeline(f"npm:{name}")
+        time_field = {
+            "created": _iso(timeline.dates[0]),
+            "modified": _iso(timeline.dates[-1]),
+        }
+        time_field.update((v, _iso(d)) for v, d in timeline.items())
+        return self._json(
+            "npm",
+            {
+                "_id": name,
+                "name": name,
+                "dist-tags": {"latest": timeline.latest[0]},
+                "versions": {
+                    v: {"name": name, "version": v} for v in timeline.versions
+                },
+                "time": time_field,
+                "readme": self._padding(),
+            },
+        )
+
+    def _pypi_files(self, name: str, version: str, day: date) -> list[dict[str, str]]:
+        return [
+            {
+                "filename": f"{name}-{version}.tar.gz",
+                "packagetype": "sdist",
+                "upload_time_iso_8601": _iso(day),
+            }
+        ]
+
+    def _pypi_project(
+        self, query: dict[str, list[str]], name: str
+    ) -> tuple[str, int, str, bytes]:
+        if not self._exists(name):
+            return self._json("pypi", {"message": "Not Found"}, 404)
+        timeline = self._timeline(f"pypi:{name}")
+        latest, latest_date = timeline.latest
+        return self._json(
+            "pypi",
+            {
+                "info": {
+                    "name": name,
+                    "version": latest,
+                    "description": self._padding(),
+                },
+                "releases": {
+                    v: self._pypi_files(name, v, d) for v, d in timeline.items()
+                },
+                "urls": self._pypi_files(name, latest, latest_date),
+            },
+        )
+
+    def _pypi_version(
+        self, query: dict[str, list[str]], name: str, version: str
+    ) -> tuple[str, int, str, bytes]:
+        timeline = self._timeline(f"pypi:{name}")
+        releases = dict(timeline.items())
+        if not self._exists(name) or version not in releases:
+            return self._json("pypi_version", {"message": "Not Found"}, 404)
+        return self._json(
+            "pypi_version",
+            {
+                "info": {"name": name, "version": version},
+                "urls": self._pypi_files(name, version, releases[version]),
+            },
+        )
+
+    def _maven_metadata(
+        self, query: dict[str, list[str]], group_path: str, artifact: str
+    ) -> tuple[str, int, str, bytes]:
+        group = group_path.replace("/", ".")
+        if not self._exists(artifact):
+            return "maven_metadata", 404, "text/plain", b"Not Found"
+        timeline = self._timeline(f"maven:{group}:{artifact}")
+        latest, latest_date = timeline.latest
+        versions = "".join(f"<version>{v}</version>" for v in timeline.versions)
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f"<metadata><groupId>{group}</groupId><artifactId>{artifact}</artifactId>"
+            f"<versioning><latest>{latest}</latest><release>{latest}</release>"
+            f"<versions>{versions}</versions>"
+            f"<lastUpdated>{latest_date:%Y%m%d}120000</lastUpdated></versioning>"
+            f"<!--{self._padding()}--></metadata>"
+        )
+        return "maven_metadata", 200, "text/xml", xml.encode()
+
+    def _maven_search(self, query: dict[str, list[str]]) -> tuple[str, int, str, bytes]:
+        q = query.get("q", [""])[0]
+        fields = dict(re.findall(r'(\w):"([^"]*)"', q))
+        group, artifact = fields.get("g", ""), fields.get("a", "")
+        rows = int(query.get("rows", ["20"])[0])
+        start = int(query.get("start", ["0"])[0])
+
+        docs: list[dict[str, Any]] = []
+        if self._exists(artifact):
+            timeline = self._timeline(f"maven:{group}:{artifact}")
+            for version, day in reversed(timeline.items()):
+                if "v" in fields and fields["v"] != version:
+                    continue
+                timestamp = datetime.combine(day, dt_time(12, 0), tzinfo=UTC)
+                docs.append(
+                    {
+                        "id": f"{group}:{artifact}:{version}",
+                        "g": group,
+                        "a": artifact,
+                        "v": version,
+                        "timestamp": int(timestamp.timestamp() * 1000),
+                    }
+                )
+        return self._json(
+            "maven_search",
+            {
+                "response": {
+                    "numFound": len(docs),
+                    "start": start,
+                    "docs": docs[start : start + rows],
+                }
+            },
+        )
+
+    def _github_releases_of(self, org: str, repo: str) -> list[dict[str, Any]]:
+        timeline = self._timeline(f"github:{org}/{repo}")
+        tag_format = _TAG_FORMATS.get((org, repo), "{version}")
+        releases = []
+        for version, day, build in zip(
+            timeline.versions, timeline.dates, timeline.builds
+        ):
+            tag = tag_format.format(version=version, build=build)
+            releases.append(
+                {
+                    "tag_name": tag,
+                    "name": version,
+                    "draft": False,
+                    "prerelease": False,
+                    "created_at": _iso(day),
+                    "published_at": _iso(day),
+                    "body": self._padding(),
+                }
+            )
+        return releases[::-1]  # newest first, like the GitHub API
+
+    def _github_releases(
+        self, query: dict[str, list[str]], org: str, repo: str
+    ) -> tuple[str, int, str, bytes]:
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        releases = self._github_releases_of(org, repo)
+        start = (page - 1) * per_page
+        return self._json("github_releases", releases[start : start + per_page])
+
+    def _github_latest(
+        self, query: dict[str, list[str]], org: str, repo: str
+    ) -> tuple[str, int, str, bytes]:
+        return self._json("github_latest", self._github_releases_of(org, repo)[0])
+
+    def _github_tag(
+        self, query: dict[str, list[str]], org: str, repo: str, tag: str
+    ) -> tuple[str, int, str, bytes]:
+        for release in self._github_releases_of(org, repo):
+            if release["tag_name"] == tag:
+                return self._json("github_tag", release)
+        return self._json("github_tag", {"message": "Not Found"}, 404)
+
+    def _python_manifest(
+        self, query: dict[str, list[str]]
+    ) -> tuple[str, int, str, bytes]:
+        manifest = [
+            {
+                "version": release["name"],
+                "stable": True,
+                "release_url": "https://github.com/actions/python-versions/releases/tag/"
+                + release["tag_name"],
+                "files": [],
+            }
+            for release in self._github_releases_of("actions", "python-versions")
+        ]
+        return self._json("python_manifest", manifest)
+
+    def _ruby_releases(
+        self, query: dict[str, list[str]]
+    ) -> tuple[str, int, str, bytes]:
+        timeline = self._timeline("github:ruby/ruby")
+        rows = "".join(
+            f"<tr><td>Ruby {v}</td><td>{d.isoformat()}</td><td></td><td></td></tr>"
+            for v, d in reversed(timeline.items())
+        )
+        html = (
+            '<html><body><table class="release-list"><tbody>'
+            "<tr><th>Release Version</th><th>Release Date</th></tr>"
+            f"{rows}</tbody></table><!--{self._padding()}--></body></html>"
+        )
+        return "ruby_releases", 200, "text/html; charset=utf-8", html.encode()
+
+    _ROUTES: list[tuple[str, Any]] = [
+        (r"/npm/(.+)", _npm),
+        (r"/pypi/([^/]+)/json", _pypi_project),
+        (r"/pypi/([^/]+)/([^/]+)/json", _pypi_version),
+        (r"/maven2/(.+)/([^/]+)/maven-metadata\.xml", _maven_metadata),
+        (r"/solrsearch/select", _maven_search),
+        (r"/github/repos/([^/]+)/([^/]+)/releases", _github_releases),
+        (r"/github/repos/([^/]+)/([^/]+)/releases/latest", _github_latest),
+        (r"/github/repos/([^/]+)/([^/]+)/releases/tags/([^/]+)", _github_tag),
+        (
+            r"/raw/actions/python-versions/main/versions-manifest\.json",
+            _python_manifest,
+        ),
+        (r"/ruby-lang/en/downloads/releases/?", _ruby_releases),
+    ]
+
+    # -------------------------------------------------------------
+    # HTTP plumbing
+    # -------------------------------------------------------------
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so pooling is measurable
+            # Headers and body are separate writes: with Nagle, every
+            # keep-alive response would wait for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                registry._count_connection()
+
+            def do_GET(self) -> None:  # noqa: N802
+                delay = registry._delay()
+                if delay:
+                    time.sleep(delay)
+
+                injected = registry._injected_status()
+                if injected is not None:
+                    body = json.dumps({"error": "injected"}).encode()
+                    self.send_response(injected)
+                    if injected == 429:
+                        self.send_header(
+                            "Retry-After", str(registry.config.retry_after_seconds)
+                        )
+                    route, content_type = "injected", "application/json"
+                    status = injected
+                else:
+                    route, status, content_type, body = registry.respond(self.path)
+                    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                    if status == 200 and self.headers.get("If-None-Match") == etag:
+                        # Conditional request for an unchanged resource
+                        status, body = 304, b""
+                    self.send_response(status)
+                    if status in (200, 304):
+                        self.send_header("ETag", etag)
+
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                # Recorded first, so stats() already counts a received response
+                registry._record(route, status, len(body))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
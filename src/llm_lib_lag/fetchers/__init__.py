@@ -1,3 +1,14 @@
-from .fetchers import fetch_version_date, fetch_latest_version_and_date
+from .fetchers import (
+    fetch_version_date,
+    fetch_latest_version_and_date,
+    fetch_release_history,
+)
+from .snapshot import RegistrySnapshot, use_snapshot
 
-__all__ = ["fetch_version_date", "fetch_latest_version_and_date"]
+__all__ = [
+    "fetch_version_date",
+    "fetch_latest_version_and_date",
+    "fetch_release_history",
+    "RegistrySnapshot",
+    "use_snapshot",
+]
@@ -1,12 +1,60 @@
-from typing import Any
-import os
-import requests
-from functools import lru_cache
-from packaging.version import parse as parse_version
+from collections.abc import Callable
+from typing import Any, Concatenate, ParamSpec, TypeVar
+from functools import lru_cache, wraps
 from datetime import date, datetime, UTC
 from ..models import Language, LibraryIdentifier, PackageManager
-from .ruby_fetchers import get_ruby_release_date
-from .util import fetch_github_latest_tag
+from ..versions import version_sort_key
+from . import http
+from .http import github_headers, registry_endpoints
+from .snapshot import RegistrySnapshot, active_snapshot
+from .ruby_fetchers import (
+    fetch_ruby_release_history,
+    fetch_ruby_releases,
+    get_ruby_release_date,
+)
+from .util import fetch_github_latest_tag, fetch_github_releases
+from ..monitoring import FETCH_CACHE
+from ..tracing import get_tracer
+
+tracer = get_tracer(__name__)
+
+Tech = LibraryIdentifier | Language
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def _traced_fetch(
+    name: str,
+) -> Callable[[Callable[Concatenate[Tech, P], R]], Callable[Concatenate[Tech, P], R]]:
+    """
+    Runs a unified fetcher in a span and counts it in the fetch cache metric.
+    A lookup answered without any HTTP request (snapshot, or a cached page or
+    manifest) is a cache hit.
+    """
+
+    def decorate(
+        func: Callable[Concatenate[Tech, P], R],
+    ) -> Callable[Concatenate[Tech, P], R]:
+        @wraps(func)
+        def wrapper(tech: Tech, *args: P.args, **kwargs: P.kwargs) -> R:
+            with tracer.start_as_current_span(name, {"tech": tech.name}) as span:
+                sent = http.requests_made()
+                result = func(tech, *args, **kwargs)
+                hit = http.requests_made() == sent
+                FETCH_CACHE.inc(fetch=name, result="hit" if hit else "miss")
+                span.set_attributes(
+                    {
+                        "source": "registry"
+                        if active_snapshot() is None
+                        else "snapshot",
+                        "cache.hit": hit,
+                    }
+                )
+                return result
+
+        return wrapper
+
+    return decorate
 
 
 class LanguageVersionNotFoundError(Exception):
@@ -39,8 +87,8 @@ def fetch_npm_version_info(library_name: str) -> tuple[str, date]:
     """
     Fetch the latest version and release date from npm registry for the given library.
     """
-    url = f"https://registry.npmjs.org/{library_name}"
-    response = requests.get(url)
+    url = f"{registry_endpoints().npm}/{library_name}"
+    response = http.get(url)
     if response.status_code == 404:
         raise LibraryVersionNotFoundError(
             library_name, package_manager=PackageManager.NPM
@@ -59,8 +107,8 @@ def fetch_pypi_version_info(library_name: str) -> tuple[str, date]:
     """
     Fetch the latest version and release date from PyPI for the given library.
     """
-    url = f"https://pypi.org/pypi/{library_name}/json"
-    response = requests.get(url)
+    url = f"{registry_endpoints().pypi}/{library_name}/json"
+    response = http.get(url)
     if response.status_code == 404:
         raise LibraryVersionNotFoundError(library_name)
     response.raise_for_status()
@@ -82,8 +130,8 @@ def fetch_npm_release_date(library_name: str, version: str) -> date:
     """
     Fetch the release date of a specific version from the npm registry.
     """
-    url = f"https://registry.npmjs.org/{library_name}"
-    response = requests.get(url)
+    url = f"{registry_endpoints().npm}/{library_name}"
+    response = http.get(url)
     if response.status_code == 404:
         raise LibraryVersionNotFoundError(
             library_name, version=version, package_manager=PackageManager.NPM
@@ -105,8 +153,8 @@ def fetch_pypi_release_date(library_name: str, version: str) -> date:
     """
     Fetch the release date of a specific version from PyPI.
     """
-    url = f"https://pypi.org/pypi/{library_name}/{version}/json"
-    response = requests.get(url)
+    url = f"{registry_endpoints().pypi}/{library_name}/{version}/json"
+    response = http.get(url)
     if response.status_code == 404:
         raise LibraryVersionNotFoundError(
             library_name, version=version, package_manager=PackageManager.PYPI
@@ -127,10 +175,8 @@ def fetch_pypi_release_date(library_name: str, version: str) -> date:
 def fetch_maven_version_info(group_id: str, artifact_id: str) -> tuple[str, date]:
     """Fetch the latest version and release date from Maven Central for the given artifact."""
     group_path = group_id.replace(".", "/")
-    url = (
-        f"https://repo1.maven.org/maven2/{group_path}/{artifact_id}/maven-metadata.xml"
-    )
-    response = requests.get(url)
+    url = f"{registry_endpoints().maven_repo}/{group_path}/{artifact_id}/maven-metadata.xml"
+    response = http.get(url)
     if response.status_code == 404:
         raise LibraryVersionNotFoundError(
             f"{group_id}:{artifact_id}", package_manager=PackageManager.MAVEN
@@ -157,14 +203,14 @@ def fetch_maven_version_info(group_id: str, artifact_id: str) -> tuple[str, date
 def fetch_maven_release_date(group_id: str, artifact_id: str, version: str) -> date:
     """Fetch the release date of a specific version from Maven Central using the search.maven.org API."""
     query = f'g:"{group_id}" AND a:"{artifact_id}" AND v:"{version}"'
-    url = "https://search.maven.org/solrsearch/select"
+    url = registry_endpoints().maven_search
     params = {
         "q": query,
         "core": "gav",
         "rows": 1,
         "wt": "json",
     }
-    resp = requests.get(url, params=params)
+    resp = http.get(url, params=params)
     resp.raise_for_status()
     data = resp.json()
     docs = data.get("response", {}).get("docs", [])
@@ -182,7 +228,7 @@ def fetch_maven_release_date(group_id: str, artifact_id: str, version: str) -> d
 # def fetch_nodejs_latest_stable() -> tuple[str, date]:
 #     """Fetch the latest stable Node.js version"""
 #     url = "https://nodejs.org/dist/index.json"
-#     response = requests.get(url)
+#     response = http.get(url)
 #     response.raise_for_status()
 #     releases = response.json()
 #     lts_releases = [r for r in releases if r["lts"] is not False]
@@ -193,9 +239,9 @@ def fetch_maven_release_date(group_id: str, artifact_id: str, version: str) -> d
 
 
 def get_dotnet_latest_stable() -> tuple[str, date]:
-    url = "https://api.github.com/repos/dotnet/core/releases"
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    response = requests.get(url, headers=headers)
+    url = f"{registry_endpoints().github_api}/repos/dotnet/core/releases"
+    headers = github_headers()
+    response = http.get(url, headers=headers)
     response.raise_for_status()
     releases = response.json()
     for release in releases:
@@ -217,9 +263,9 @@ def get_dotnet_specific_version(version: str) -> tuple[str, date]:
     """
     Fetch the specific version of the dotnet release.
     """
-    url = "https://api.github.com/repos/dotnet/core/releases"
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    response = requests.get(url, headers=headers)
+    url = f"{registry_endpoints().github_api}/repos/dotnet/core/releases"
+    headers = github_headers()
+    response = http.get(url, headers=headers)
     response.raise_for_status()
     releases = response.json()
 
@@ -242,17 +288,17 @@ def get_dotnet_specific_version(version: str) -> tuple[str, date]:
 def _fetch_python_versions_manifest() -> list[dict[str, Any]]:
     """
     Fetch and cache the Python versions manifest from GitHub Actions.
-    The cache is invalidated after the first call and will be refreshed on the next call.
+    The cache lives until `clear_page_caches` is called.
     """
-    manifest_url = "https://raw.githubusercontent.com/actions/python-versions/main/versions-manifest.json"
-    response = requests.get(manifest_url)
+    manifest_url = f"{registry_endpoints().github_raw}/actions/python-versions/main/versions-manifest.json"
+    response = http.get(manifest_url)
     response.raise_for_status()
     versions = response.json()
 
     # Assert versions are in descending order by version number
     for i in range(len(versions) - 1):
-        curr_version = parse_version(versions[i]["version"])
-        next_version = parse_version(versions[i + 1]["version"])
+        curr_version = version_sort_key(versions[i]["version"])
+        next_version = version_sort_key(versions[i + 1]["version"])
         assert curr_version > next_version, (
             f"Versions not in descending order: {versions[i]['version']} <= {versions[i + 1]['version']}"
         )
@@ -260,6 +306,13 @@ def _fetch_python_versions_manifest() -> list[dict[str, Any]]:
     return versions
 
 
+def _github_release_api_url(release_url: str) -> str:
+    # e.g. "https://github.com/actions/python-versions/releases/tag/3.13.2-13149511920"
+    # becomes "https://api.github.com/repos/actions/python-versions/releases/tags/3.13.2-13149511920"
+    path = release_url.removeprefix("https://github.com").replace("/tag/", "/tags/")
+    return f"{registry_endpoints().github_api}/repos{path}"
+
+
 def fetch_python_latest_stable() -> tuple[str, date]:
     """
     Fetch the latest stable Python version and its release date using the
@@ -280,25 +333,18 @@ def fetch_python_latest_stable() -> tuple[str, date]:
 
     # Sort stable versions in descending order by version number
     stable_versions = sorted(
-        stable_versions, key=lambda v: parse_version(v["version"]), reverse=True
+        stable_versions, key=lambda v: version_sort_key(v["version"]), reverse=True
     )
     latest = stable_versions[0]
     latest_version = latest["version"]
     release_url = latest["release_url"]
 
     # Convert the GitHub release URL to the GitHub API URL
-    # e.g. "https://github.com/actions/python-versions/releases/tag/3.13.2-13149511920"
-    # becomes "https://api.github.com/repos/actions/python-versions/releases/tags/3.13.2-13149511920"
-    api_url = release_url.replace("github.com", "api.github.com/repos").replace(
-        "/tag/", "/tags/"
-    )
+    api_url = _github_release_api_url(release_url)
 
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = github_headers()
 
-    api_resp = requests.get(api_url, headers=headers)
+    api_resp = http.get(api_url, headers=headers)
     api_resp.raise_for_status()
     release_data = api_resp.json()
     published_at = release_data.get("published_at")
@@ -335,17 +381,12 @@ def fetch_python_version_date(version: str) -> date:
     release_url = version_info["release_url"]
 
     # Convert GitHub release URL to API URL
-    api_url = release_url.replace("github.com", "api.github.com/repos").replace(
-        "/tag/", "/tags/"
-    )
+    api_url = _github_release_api_url(release_url)
     print(api_url)
 
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    token = os.environ.get("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = github_headers()
 
-    api_resp = requests.get(api_url, headers=headers)
+    api_resp = http.get(api_url, headers=headers)
     api_resp.raise_for_status()
     release_data = api_resp.json()
 
@@ -360,6 +401,16 @@ def fetch_python_version_date(version: str) -> date:
     return datetime.fromisoformat(published_at.replace("Z", "+00:00")).date()
 
 
+def clear_page_caches() -> None:
+    """
+    Forgets the pages cached for the whole process (Python manifest, Ruby
+    releases page), so long-running pollers see new releases.
+    """
+    _fetch_python_versions_manifest.cache_clear()
+    fetch_ruby_releases.cache_clear()
+
+
+@_traced_fetch("fetch.latest")
 def fetch_latest_version_and_date(
     tech: LibraryIdentifier | Language,
 ) -> tuple[str, date]:
@@ -367,6 +418,10 @@ def fetch_latest_version_and_date(
     Unified function to fetch the latest version info for a LibraryIdentifier,
     handling NPM or PYPI (extendable to other PackageManagers).
     """
+    snapshot = active_snapshot()
+    if snapshot is not None:
+        return _snapshot_latest(snapshot, tech)
+
     if isinstance(tech, Language):
         match tech:
             # case Language.NODEJS:
@@ -405,10 +460,15 @@ def fetch_latest_version_and_date(
     )
 
 
+@_traced_fetch("fetch.version_date")
 def fetch_version_date(identifier: LibraryIdentifier | Language, version: str) -> date:
     """
     Fetch the release date of a specific version from the registry.
     """
+    snapshot = active_snapshot()
+    if snapshot is not None:
+        return _snapshot_release_date(snapshot, identifier, version)
+
     if isinstance(identifier, Language):
         match identifier:
             case Language.RUBY:
@@ -431,3 +491,188 @@ def fetch_version_date(identifier: LibraryIdentifier | Language, version: str) -
     raise ValueError(
         f"Unsupported package manager: {identifier.package_manager} to fetch version date"
     )
+
+
+# -------------------------------------------------------------
+# Full release histories
+# -------------------------------------------------------------
+def fetch_npm_releases(library_name: str) -> dict[str, date]:
+    """
+    Fetch every published version of an npm package with its release date.
+    """
+    url = f"{registry_endpoints().npm}/{library_name}"
+    response = http.get(url)
+    if response.status_code == 404:
+        raise LibraryVersionNotFoundError(
+            library_name, package_manager=PackageManager.NPM
+        )
+    response.raise_for_status()
+    data = response.json()
+
+    # 'time' also holds the 'created' and 'modified' timestamps of the package
+    return {
+        version: datetime.fromisoformat(iso_date.replace("Z", "+00:00")).date()
+        for version, iso_date in data["time"].items()
+        if version not in ("created", "modified")
+    }
+
+
+def fetch_pypi_releases(library_name: str) -> dict[str, date]:
+    """
+    Fetch every release of a PyPI project with its release date.
+    Releases without any uploaded file are skipped.
+    """
+    url = f"{registry_endpoints().pypi}/{library_name}/json"
+    response = http.get(url)
+    if response.status_code == 404:
+        raise LibraryVersionNotFoundError(
+            library_name, package_manager=PackageManager.PYPI
+        )
+    response.raise_for_status()
+    data = response.json()
+
+    releases: dict[str, date] = {}
+    for version, files in data["releases"].items():
+        if not files:
+            continue
+        # Same file as fetch_pypi_release_date, so lags stay consistent
+        release_date_str = files[-1]["upload_time_iso_8601"].replace("Z", "+00:00")
+        releases[version] = datetime.fromisoformat(release_date_str).date()
+    return releases
+
+
+def fetch_maven_releases(
+    group_id: str, artifact_id: str, page_size: int = 200
+) -> dict[str, date]:
+    """Fetch every version of a Maven artifact with its release date from search.maven.org."""
+    url = registry_endpoints().maven_search
+    query = f'g:"{group_id}" AND a:"{artifact_id}"'
+    releases: dict[str, date] = {}
+    start = 0
+    while True:
+        params = {
+            "q": query,
+            "core": "gav",
+            "rows": page_size,
+            "start": start,
+            "wt": "json",
+        }
+        resp = http.get(url, params=params)
+        resp.raise_for_status()
+        response = resp.json().get("response", {})
+        docs = response.get("docs", [])
+        for doc in docs:
+            releases[doc["v"]] = datetime.fromtimestamp(
+                doc["timestamp"] / 1000, UTC
+            ).date()
+        start += len(docs)
+        if not docs or start >= response.get("numFound", 0):
+            break
+
+    if not releases:
+        raise LibraryVersionNotFoundError(
+            f"{group_id}:{artifact_id}", package_manager=PackageManager.MAVEN
+        )
+    return releases
+
+
+def fetch_python_releases() -> dict[str, date]:
+    """
+    Fetch every Python release published by actions/python-versions.
+
+    Tags look like "3.13.2-13149511920" (version + build id); the earliest
+    build of each version gives its release date.
+    """
+    releases: dict[str, date] = {}
+    for tag, release_date in fetch_github_releases(
+        "actions", "python-versions"
+    ).items():
+        version = tag.rsplit("-", 1)[0]
+        if version not in releases or release_date < releases[version]:
+            releases[version] = release_date
+    return releases
+
+
+@_traced_fetch("fetch.release_history")
+def fetch_release_history(tech: LibraryIdentifier | Language) -> dict[str, date]:
+    """
+    Fetch the release timeline of a technology: version -> release date.
+
+    Pre-releases are included when the source lists them; callers decide
+    whether to use them.
+    """
+    snapshot = active_snapshot()
+    if snapshot is not None:
+        _require_in_snapshot(snapshot, tech)
+        return dict(snapshot.releases(tech))
+
+    if isinstance(tech, Language):
+        match tech:
+            case Language.RUST:
+                return fetch_github_releases("rust-lang", "rust")
+            case Language.RUBY:
+                return fetch_ruby_release_history()
+            case Language.DOTNET:
+                return {
+                    tag.lstrip("v"): release_date
+                    for tag, release_date in fetch_github_releases(
+                        "dotnet", "core"
+                    ).items()
+                    if tag.startswith("v")
+                }
+            case Language.PYTHON:
+                return fetch_python_releases()
+        raise ValueError(f"Unsupported language: {tech} to fetch release history")
+
+    match tech.package_manager:
+        case PackageManager.NPM:
+            return fetch_npm_releases(tech.name)
+        case PackageManager.MAVEN:
+            group_id, artifact_id = tech.name.split(":", 1)
+            return fetch_maven_releases(group_id, artifact_id)
+        case PackageManager.PYPI:
+            return fetch_pypi_releases(tech.name)
+
+    raise ValueError(
+        f"Unsupported package manager: {tech.package_manager} to fetch release history"
+    )
+
+
+# -------------------------------------------------------------
+# Offline mode: answers from a registry snapshot
+# -------------------------------------------------------------
+def _not_found(
+    tech: LibraryIdentifier | Language, version: str | None = None
+) -> LanguageVersionNotFoundError | LibraryVersionNotFoundError:
+    if isinstance(tech, Language):
+        return LanguageVersionNotFoundError(tech, version=version)
+    return LibraryVersionNotFoundError(
+        tech.name, version=version, package_manager=tech.package_manager
+    )
+
+
+def _require_in_snapshot(
+    snapshot: RegistrySnapshot, tech: LibraryIdentifier | Language
+) -> None:
+    if tech not in snapshot:
+        raise _not_found(tech)
+
+
+def _snapshot_latest(
+    snapshot: RegistrySnapshot, tech: LibraryIdentifier | Language
+) -> tuple[str, date]:
+    _require_in_snapshot(snapshot, tech)
+    latest = snapshot.latest(tech)
+    if latest is None:
+        raise _not_found(tech)
+    return latest
+
+
+def _snapshot_release_date(
+    snapshot: RegistrySnapshot, tech: LibraryIdentifier | Language, version: str
+) -> date:
+    _require_in_snapshot(snapshot, tech)
+    release_date = snapshot.release_date(tech, version)
+    if release_date is None:
+        raise _not_found(tech, version)
+    return release_date
@@ -0,0 +1,300 @@
+"""
+Shared HTTP access for the registry fetchers.
+
+Every fetcher goes through `get`, which uses one pooled requests.Session
+(keep-alive connections, retries with backoff on 429/5xx) and resolves
+registry URLs through `registry_endpoints`, so the whole fetch layer can be
+pointed at a mirror or a local stand-in registry.
+
+Pollers fetching the same URLs again and again install a ResponseCache with
+`use_response_cache`: responses are reused for a TTL, then revalidated with
+conditional requests (If-None-Match / If-Modified-Since), which registries
+answer with an empty 304 when nothing changed. GitHub does not count 304s
+against the API rate limit.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, NamedTuple
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from pydantic import BaseModel, ConfigDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..monitoring import REGISTRY_LATENCY, REGISTRY_REQUESTS
+from ..tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+"""Seconds to wait for a registry to connect or send data."""
+
+POOL_SIZE = 64
+"""Connections kept alive per host; bounds useful fetch concurrency."""
+
+
+class RegistryEndpoints(BaseModel):
+    """Base URLs of the registries the fetchers query."""
+
+    model_config = ConfigDict(frozen=True)
+
+    npm: str = "https://registry.npmjs.org"
+    pypi: str = "https://pypi.org/pypi"
+    maven_repo: str = "https://repo1.maven.org/maven2"
+    maven_search: str = "https://search.maven.org/solrsearch/select"
+    github_api: str = "https://api.github.com"
+    github_raw: str = "https://raw.githubusercontent.com"
+    ruby_lang: str = "https://www.ruby-lang.org"
+
+    @classmethod
+    def from_base_url(cls, base_url: str) -> "RegistryEndpoints":
+        """
+        Serves every registry from one host, e.g. a mirror or a test server:
+        npm under {base_url}/npm, PyPI under {base_url}/pypi, and so on.
+        """
+        base_url = base_url.rstrip("/")
+        return cls(
+            npm=f"{base_url}/npm",
+            pypi=f"{base_url}/pypi",
+            maven_repo=f"{base_url}/maven2",
+            maven_search=f"{base_url}/solrsearch/select",
+            github_api=f"{base_url}/github",
+            github_raw=f"{base_url}/raw",
+            ruby_lang=f"{base_url}/ruby-lang",
+        )
+
+
+_endpoints: RegistryEndpoints | None = None
+_endpoints_lock = threading.Lock()
+
+
+def registry_endpoints() -> RegistryEndpoints:
+    """
+    :return: The endpoints set with `set_registry_endpoints`, else the ones
+        derived from $LLM_LIB_LAG_REGISTRY_URL, else the public registries.
+    """
+    global _endpoints
+    with _endpoints_lock:
+        if _endpoints is None:
+            base_url = os.environ.get("LLM_LIB_LAG_REGISTRY_URL")
+            _endpoints = (
+                RegistryEndpoints.from_base_url(base_url)
+                if base_url
+                else RegistryEndpoints()
+            )
+        return _endpoints
+
+
+def set_registry_endpoints(endpoints: RegistryEndpoints | None) -> None:
+    """
+    Overrides the registry endpoints for the whole process.
+
+    :param endpoints: The new endpoints, or None to go back to the defaults.
+    """
+    global _endpoints
+    with _endpoints_lock:
+        _endpoints = endpoints
+
+
+def adapter_options() -> dict[str, Any]:
+    """Connection pool and retry settings of every adapter mounted on the session."""
+    return {
+        "pool_connections": 16,
+        "pool_maxsize": POOL_SIZE,
+        "max_retries": Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """The process-wide session; connections are reused across fetchers and threads."""
+    session = requests.Session()
+    mount_adapter(HTTPAdapter(**adapter_options()), session)
+    return session
+
+
+def mount_adapter(
+    adapter: HTTPAdapter | None, session: requests.Session | None = None
+) -> None:
+    """
+    Replaces the transport of the session for http:// and https:// URLs, e.g.
+    with a recording or replaying adapter.
+
+    :param adapter: The new adapter, or None for the default pooled one.
+    :param session: The session to change (default: the shared session).
+    """
+    session = session or get_session()
+    adapter = adapter or HTTPAdapter(**adapter_options())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+# -------------------------------------------------------------
+# Response cache
+# -------------------------------------------------------------
+class _CacheEntry(NamedTuple):
+    response: requests.Response
+    stored_at: float
+    validators: dict[str, str]
+
+
+class ResponseCache:
+    """
+    Successful responses by URL, reused for `ttl_seconds`, then revalidated
+    with the ETag / Last-Modified they came with.
+
+    Usage:
+        use_response_cache(ResponseCache(ttl_seconds=60))
+    """
+
+    def __init__(self, ttl_seconds: float = 0.0, max_entries: int = 10_000) -> None:
+        """
+        :param ttl_seconds: Responses younger than this are reused without
+            any request; 0 revalidates every time.
+        :param max_entries: Least recently used entries beyond this are dropped.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        """Answered from the cache without a request."""
+        self.revalidations = 0
+        """Answered from the cache after a 304."""
+        self.misses = 0
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Any = None) -> str:
+        return f"{url}?{urlencode(params, doseq=True)}" if params else url
+
+    def lookup(self, key: str) -> tuple[requests.Response | None, dict[str, str]]:
+        """
+        :return: The cached response if still fresh, and the conditional
+            headers to revalidate it otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, {}
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry.stored_at < self.ttl_seconds:
+                self.hits += 1
+                return entry.response, {}
+            return None, entry.validators
+
+    def revalidated(self, key: str) -> requests.Response | None:
+        """Marks an entry fresh again after a 304, and returns it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = entry._replace(stored_at=time.monotonic())
+            self.revalidations += 1
+            return entry.response
+
+    def store(self, key: str, response: requests.Response) -> None:
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        with self._lock:
+            self.misses += 1
+            if not validators and self.ttl_seconds <= 0:
+                return
+            self._entries[key] = _CacheEntry(response, time.monotonic(), validators)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_response_cache: ResponseCache | None = None
+
+
+def use_response_cache(cache: ResponseCache | None) -> None:
+    """
+    Makes `get` go through `cache`, or stops caching with None.
+
+    :param cache: The cache, shared by every thread.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """
+    requests.get through the shared session, with a default timeout, and
+    through the response cache if one is installed.
+
+    :param url: The URL to fetch.
+    :param kwargs: Passed to requests (params, headers, timeout, ...).
+    """
+    cache = _response_cache
+    key = ResponseCache.key(url, kwargs.get("params"))
+    if cache is not None:
+        cached, validators = cache.lookup(key)
+        if cached is not None:
+            return cached
+        if validators:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **validators}
+
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    _counter.requests = requests_made() + 1
+    host = urlsplit(url).netloc
+    with tracer.start_as_current_span("http.get", {"http.url": url}) as span:
+        start = time.perf_counter()
+        try:
+            response = get_session().get(url, **kwargs)
+        except requests.RequestException:
+            REGISTRY_REQUESTS.inc(host=host, status="error")
+            raise
+        REGISTRY_LATENCY.observe(time.perf_counter() - start, host=host)
+        REGISTRY_REQUESTS.inc(host=host, status=str(response.status_code))
+        span.set_attributes(
+            {
+                "http.status_code": response.status_code,
+                "http.response_bytes": len(response.content),
+            }
+        )
+
+    if cache is not None:
+        if response.status_code == 304:
+            response = cache.revalidated(key) or response
+        elif response.status_code == 200:
+            cache.store(key, response)
+    return response
+
+
+_counter = threading.local()
+
+
+def requests_made() -> int:
+    """Number of requests `get` has sent from the calling thread so far."""
+    return getattr(_counter, "requests", 0)
+
+
+def github_headers() -> dict[str, str]:
+    """Headers for the GitHub API, authenticated if $GITHUB_TOKEN is set."""
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
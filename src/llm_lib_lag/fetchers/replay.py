@@ -0,0 +1,190 @@
+"""
+Record/replay transport for the shared HTTP session.
+
+In record mode, real responses are saved as JSON fixture files ("cassettes"),
+one per request. In replay mode the same requests are answered from those
+files without touching the network, so fetcher tests are fast and
+deterministic. A request without a cassette fails loudly instead of silently
+going online. Registry bodies are trimmed to the fields the fetchers read
+before they are saved, so cassettes stay small.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import re
+from collections.abc import Callable
+from enum import Enum
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from .http import adapter_options, mount_adapter
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping; the rest (cookies, rate-limit counters,
+# request ids) only make fixture files noisy
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+
+def _last_file(files: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # The fetchers date a PyPI release by the upload time of its last file
+    return (
+        [{"upload_time_iso_8601": files[-1]["upload_time_iso_8601"]}] if files else []
+    )
+
+
+def _trim_pypi(data: dict[str, Any]) -> dict[str, Any]:
+    trimmed: dict[str, Any] = {
+        "info": {"name": data["info"]["name"], "version": data["info"]["version"]}
+    }
+    if "releases" in data:
+        trimmed["releases"] = {
+            version: _last_file(files) for version, files in data["releases"].items()
+        }
+    if "urls" in data:
+        trimmed["urls"] = _last_file(data["urls"])
+    return trimmed
+
+
+def _trim_npm(data: dict[str, Any]) -> dict[str, Any]:
+    return {"name": data["name"], "dist-tags": data["dist-tags"], "time": data["time"]}
+
+
+# JSON bodies of these hosts are reduced to what the fetchers read; a full
+# PyPI project or npm packument is hundreds of KB of readmes and file lists
+_BODY_TRIMMERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "pypi.org": _trim_pypi,
+    "registry.npmjs.org": _trim_npm,
+}
+
+
+def trim_body(url: str, status: int, body: bytes) -> bytes:
+    """
+    Reduces a recorded registry response to the fields the fetchers read.
+    Error responses and bodies of other hosts are kept as they are.
+
+    :param url: URL of the request.
+    :param status: HTTP status of the response.
+    :param body: Raw response body.
+    :return: The body to save in the cassette.
+    """
+    trim = _BODY_TRIMMERS.get(urlsplit(url).hostname or "")
+    if trim is None or status != 200:
+        return body
+    return json.dumps(trim(json.loads(body)), separators=(",", ":")).encode("utf-8")
+
+
+class ReplayMode(str, Enum):
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class CassetteNotFoundError(requests.ConnectionError):
+    """A request was made in replay mode but no response was recorded for it."""
+
+
+def cassette_name(method: str, url: str) -> str:
+    """
+    File name of the cassette of a request: a readable slug of the URL plus a
+    hash of the full request line, e.g. "registry.npmjs.org-react-3f2a....json".
+    """
+    digest = hashlib.sha1(f"{method.upper()} {url}".encode()).hexdigest()[:12]
+    slug = re.sub(r"[^A-Za-z0-9.]+", "-", url.split("://", 1)[-1].split("?", 1)[0])
+    return f"{slug.strip('-')[:80]}-{digest}.json"
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """Transport adapter that records responses to, or replays them from, a directory."""
+
+    def __init__(self, cassette_dir: str | Path, mode: ReplayMode) -> None:
+        super().__init__(**adapter_options())
+        self.cassette_dir = Path(cassette_dir)
+        self.mode = mode
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        method = request.method or "GET"
+        url = request.url or ""
+        path = self.cassette_dir / cassette_name(method, url)
+
+        if self.mode == ReplayMode.RECORD:
+            response = super().send(request, **kwargs)
+            self._save(path, method, url, response)
+            return response
+
+        if not path.exists():
+            raise CassetteNotFoundError(
+                f"No recorded response for {method} {url} (expected {path}); "
+                "record it by running the tests with --record",
+                request=request,
+            )
+        return self._load(path, request)
+
+    def _save(
+        self, path: Path, method: str, url: str, response: requests.Response
+    ) -> None:
+        cassette: dict[str, Any] = {
+            "method": method,
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                name: response.headers[name]
+                for name in _KEPT_HEADERS
+                if name in response.headers
+            },
+        }
+        body = trim_body(url, response.status_code, response.content)
+        try:
+            cassette["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            cassette["body_base64"] = base64.b64encode(body).decode()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(cassette, indent=1), encoding="utf-8")
+        logger.info(f"Recorded {method} {url} -> {path.name}")
+
+    def _load(self, path: Path, request: requests.PreparedRequest) -> requests.Response:
+        cassette = json.loads(path.read_text(encoding="utf-8"))
+        if "body_base64" in cassette:
+            body = base64.b64decode(cassette["body_base64"])
+        else:
+            body = cassette.get("body", "").encode("utf-8")
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=cassette.get("headers", {}),
+            status=cassette["status"],
+            reason=cassette.get("reason", ""),
+            preload_content=False,
+            decode_content=False,
+        )
+        # Same path as a live response, so the body streams from `raw`
+        response = self.build_response(request, raw)
+        response.encoding = "utf-8"
+        return response
+
+
+def install_replay(cassette_dir: str | Path, mode: ReplayMode) -> RecordReplayAdapter:
+    """
+    Routes every fetcher request through a record/replay adapter.
+
+    :param cassette_dir: Directory holding the cassette files.
+    :param mode: Record real responses, or replay recorded ones.
+    :return: The mounted adapter; call `uninstall_replay` to go back online.
+    """
+    adapter = RecordReplayAdapter(cassette_dir, mode)
+    mount_adapter(adapter)
+    return adapter
+
+
+def uninstall_replay() -> None:
+    """Restores the default pooled transport of the shared session."""
+    mount_adapter(None)
@@ -1,10 +1,12 @@
 from __future__ import annotations
-import requests
 from bs4 import BeautifulSoup
 from functools import lru_cache
 from datetime import datetime, date
 from bs4.element import Tag
 
+from . import http
+from .http import registry_endpoints
+
 _RUBY_VERSIONS = {
     "3.2.7": date(2025, 2, 4),
     "3.3.7": date(2025, 1, 15),
@@ -196,8 +198,8 @@ def fetch_ruby_releases() -> dict[str, date]:
     Returns:
         Dict of version_string -> release_date
     """
-    url = "https://www.ruby-lang.org/en/downloads/releases/"
-    resp = requests.get(url)
+    url = f"{registry_endpoints().ruby_lang}/en/downloads/releases/"
+    resp = http.get(url)
     resp.raise_for_status()
     return parse_ruby_releases(resp.text)
 
@@ -222,3 +224,14 @@ def get_ruby_release_date(
         releases = fetch_ruby_releases()
 
     return releases[version]  # KeyError if not present
+
+
+# -------------------------------------------------------------
+# 4. Helper: Full release history
+# -------------------------------------------------------------
+def fetch_ruby_release_history() -> dict[str, date]:
+    """
+    All known Ruby releases: the ruby-lang.org releases page (cached),
+    completed by the built-in table for versions it no longer lists.
+    """
+    return {**_RUBY_VERSIONS, **fetch_ruby_releases()}
@@ -0,0 +1,271 @@
+"""
+Registry snapshots: the release timelines of a set of techs bundled into one
+compressed file, so lags can be computed offline and reproducibly.
+
+File layout:
+
+    MAGIC (8 bytes) | index length (uint32, little-endian) | JSON index | blocks
+
+The index lists every tech with its latest version and the offset and length
+of its block. A block is the zlib-compressed JSON mapping of version ->
+release date. The file is memory-mapped and a block is only decompressed the
+first time its tech is looked up, so opening a large snapshot is cheap and
+several worker processes share the same pages.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, UTC
+from pathlib import Path
+
+from pydantic import BaseModel, ConfigDict
+
+from ..io_utils import write_atomic
+from ..models import Language, LibraryIdentifier
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LLSNAP01"
+_INDEX_LENGTH = struct.Struct("<I")
+
+Tech = LibraryIdentifier | Language
+
+
+class SnapshotEntry(BaseModel):
+    """Index entry of one tech in a snapshot file."""
+
+    model_config = ConfigDict(frozen=True)
+
+    tech: Tech
+    latest_version: str | None
+    latest_release_date: date | None
+    offset: int
+    length: int
+    releases: int
+
+
+class SnapshotIndex(BaseModel):
+    """Header of a snapshot file."""
+
+    model_config = ConfigDict(frozen=True)
+
+    created_at: datetime
+    entries: list[SnapshotEntry]
+
+
+class TechTimeline(BaseModel):
+    """Everything a snapshot records about one tech."""
+
+    model_config = ConfigDict(frozen=True)
+
+    tech: Tech
+    releases: dict[str, date]
+    latest: tuple[str, date] | None = None
+    """Latest version as reported by the registry, which may differ from the
+    highest version of the timeline (e.g. npm's "latest" dist-tag)."""
+
+
+def write_snapshot(
+    path: str | Path,
+    timelines: list[TechTimeline],
+    created_at: datetime | None = None,
+) -> None:
+    """
+    Writes timelines to a snapshot file, atomically.
+
+    :param path: The file to write.
+    :param timelines: One timeline per tech.
+    :param created_at: Capture time recorded in the file (default: now).
+    """
+    blocks: list[bytes] = []
+    entries: list[SnapshotEntry] = []
+    offset = 0
+    for timeline in timelines:
+        releases = {v: d.isoformat() for v, d in timeline.releases.items()}
+        block = zlib.compress(json.dumps(releases).encode(), level=9)
+        latest_version, latest_date = timeline.latest or (None, None)
+        entries.append(
+            SnapshotEntry(
+                tech=timeline.tech,
+                latest_version=latest_version,
+                latest_release_date=latest_date,
+                offset=offset,
+                length=len(block),
+                releases=len(releases),
+            )
+        )
+        blocks.append(block)
+        offset += len(block)
+
+    index = SnapshotIndex(
+        created_at=created_at or datetime.now(UTC), entries=entries
+    ).model_dump_json()
+    write_atomic(
+        path,
+        MAGIC
+        + _INDEX_LENGTH.pack(len(index.encode()))
+        + index.encode()
+        + b"".join(blocks),
+    )
+
+
+class RegistrySnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        :param path: A file written by write_snapshot.
+        :raises ValueError: If the file is not a snapshot.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a registry snapshot")
+        start = len(MAGIC) + _INDEX_LENGTH.size
+        (index_length,) = _INDEX_LENGTH.unpack(self._mmap[len(MAGIC) : start])
+        self.index = SnapshotIndex.model_validate_json(
+            self._mmap[start : start + index_length]
+        )
+        self._data_start = start + index_length
+        self._entries = {entry.tech: entry for entry in self.index.entries}
+        self._releases: dict[Tech, dict[str, date]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def created_at(self) -> datetime:
+        return self.index.created_at
+
+    @property
+    def techs(self) -> list[Tech]:
+        return list(self._entries)
+
+    def __contains__(self, tech: object) -> bool:
+        return tech in self._entries
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _entry(self, tech: Tech) -> SnapshotEntry:
+        entry = self._entries.get(tech)
+        if entry is None:
+            raise KeyError(f"{tech.name} is not in snapshot {self.path}")
+        return entry
+
+    def releases(self, tech: Tech) -> dict[str, date]:
+        """
+        :return: The release timeline of `tech`: version -> release date.
+        :raises KeyError: If the snapshot does not contain `tech`.
+        """
+        cached = self._releases.get(tech)
+        if cached is not None:
+            return cached
+        entry = self._entry(tech)
+        start = self._data_start + entry.offset
+        raw: dict[str, str] = json.loads(
+            zlib.decompress(self._mmap[start : start + entry.length])
+        )
+        releases = {v: date.fromisoformat(d) for v, d in raw.items()}
+        with self._lock:
+            self._releases[tech] = releases
+        return releases
+
+    def latest(self, tech: Tech) -> tuple[str, date] | None:
+        """
+        :return: (version, release_date) of the latest version of `tech` when
+            the snapshot was taken, or None if it was not recorded.
+        :raises KeyError: If the snapshot does not contain `tech`.
+        """
+        entry = self._entry(tech)
+        if entry.latest_version is None or entry.latest_release_date is None:
+            return None
+        return entry.latest_version, entry.latest_release_date
+
+    def release_date(self, tech: Tech, version: str) -> date | None:
+        """
+        :return: The release date of `version` (exact spelling), or None if
+            the snapshot has no such release.
+        :raises KeyError: If the snapshot does not contain `tech`.
+        """
+        return self.releases(tech).get(version)
+
+
+# -------------------------------------------------------------
+# Offline mode
+# -------------------------------------------------------------
+_active: RegistrySnapshot | None = None
+_configured = False
+_active_lock = threading.Lock()
+
+
+def active_snapshot() -> RegistrySnapshot | None:
+    """
+    :return: The snapshot the fetchers answer from (offline mode), set with
+        `use_snapshot` or $LLM_LIB_LAG_SNAPSHOT; None when fetching online.
+    """
+    global _active, _configured
+    with _active_lock:
+        if not _configured:
+            path = os.environ.get("LLM_LIB_LAG_SNAPSHOT")
+            if path:
+                _active = RegistrySnapshot(path)
+                logger.info(f"Offline mode: answering from snapshot {path}")
+            _configured = True
+        return _active
+
+
+def use_snapshot(snapshot: str | Path | RegistrySnapshot | None) -> None:
+    """
+    Switches every fetcher to offline mode, answering only from `snapshot`.
+
+    :param snapshot: A snapshot (or its path), or None to fetch online again.
+    """
+    global _active, _configured
+    if isinstance(snapshot, str | Path):
+        snapshot = RegistrySnapshot(snapshot)
+    with _active_lock:
+        _active = snapshot
+        _configured = True
+
+
+def capture_timelines(
+    techs: list[Tech], max_workers: int = 8
+) -> tuple[list[TechTimeline], dict[Tech, str]]:
+    """
+    Fetches the release timeline and latest version of every tech online.
+
+    :param techs: The techs to capture.
+    :param max_workers: Number of techs fetched concurrently.
+    :return: The timelines (in input order) and the error of each tech that
+        could not be captured.
+    """
+    # Imported here: the fetchers themselves depend on this module
+    from .fetchers import fetch_latest_version_and_date, fetch_release_history
+
+    def capture(tech: Tech) -> TechTimeline | str:
+        try:
+            releases = fetch_release_history(tech)
+            latest = fetch_latest_version_and_date(tech)
+        except Exception as e:
+            logger.warning(f"Could not capture {tech.name}: {e}")
+            return f"{type(e).__name__}: {e}"
+        # The latest version must resolve offline even if the history lacks it
+        releases.setdefault(latest[0], latest[1])
+        return TechTimeline(tech=tech, releases=releases, latest=latest)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        outcomes = list(pool.map(capture, dict.fromkeys(techs)))
+
+    timelines = [o for o in outcomes if isinstance(o, TechTimeline)]
+    errors = {
+        tech: o for tech, o in zip(dict.fromkeys(techs), outcomes) if isinstance(o, str)
+    }
+    return timelines, errors
@@ -1,8 +1,8 @@
 from datetime import date, datetime
-import os
 from typing import Literal
 
-import requests
+from . import http
+from .http import github_headers, registry_endpoints
 
 
 def fetch_github_latest_tag(
@@ -27,13 +27,10 @@ def fetch_github_latest_tag(
       fetch_github_latest_tag("rust-lang", "rust")
         -> ("1.84.1", date(2025, 1, 31))
     """
-    token = os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = github_headers()
 
-    api_url = f"https://api.github.com/repos/{org}/{repo}/releases/latest"
-    resp = requests.get(api_url, headers=headers)
+    api_url = f"{registry_endpoints().github_api}/repos/{org}/{repo}/releases/latest"
+    resp = http.get(api_url, headers=headers)
     resp.raise_for_status()
 
     data = resp.json()
@@ -52,14 +49,48 @@ def fetch_github_release_date(
     tag: str,
     date_key: Literal["published_at", "created_at"] = "published_at",
 ) -> date:
-    token = os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
+    headers = github_headers()
 
-    url = f"https://api.github.com/repos/{org}/{repo}/releases/tags/{tag}"
-    resp = requests.get(url, headers=headers)
+    url = f"{registry_endpoints().github_api}/repos/{org}/{repo}/releases/tags/{tag}"
+    resp = http.get(url, headers=headers)
     resp.raise_for_status()
     data = resp.json()
     published_at = data[date_key].replace("Z", "+00:00")
     return datetime.fromisoformat(published_at).date()
+
+
+def fetch_github_releases(
+    org: str,
+    repo: str,
+    version_key: Literal["tag_name", "name"] = "tag_name",
+    date_key: Literal["published_at", "created_at"] = "published_at",
+    max_pages: int = 20,
+) -> dict[str, date]:
+    """
+    Fetches every non-draft, non-prerelease release of a GitHub repository
+    by paging through:
+        https://api.github.com/repos/{org}/{repo}/releases
+
+    Returns a dict of version_tag -> release_date. When a tag appears more
+    than once, the earliest date is kept.
+    """
+    headers = github_headers()
+
+    url = f"{registry_endpoints().github_api}/repos/{org}/{repo}/releases"
+    releases: dict[str, date] = {}
+    for page in range(1, max_pages + 1):
+        resp = http.get(url, headers=headers, params={"per_page": 100, "page": page})
+        resp.raise_for_status()
+        data = resp.json()
+        if not data:
+            break
+        for release in data:
+            if release["draft"] or release["prerelease"] or not release[date_key]:
+                continue
+            tag = release[version_key]
+            release_date = datetime.fromisoformat(
+                release[date_key].replace("Z", "+00:00")
+            ).date()
+            if tag not in releases or release_date < releases[tag]:
+                releases[tag] = release_date
+    return releases
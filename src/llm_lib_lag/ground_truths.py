@@ -1,90 +1,119 @@
-from datetime import date
 import logging
-from .models import Language, TechVersionGroundTruth, LibraryIdentifier, PackageManager
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from pydantic import BaseModel, Field
+
+from .fetchers import fetch_latest_version_and_date
+from .io_utils import write_atomic
+from .models import TechVersionGroundTruth
 
 logger = logging.getLogger(__name__)
 
+GROUND_TRUTHS_FILE = Path(__file__).parent / "data" / "ground_truths.json"
+"""Ground truths shipped with the package. Override with $LLM_LIB_LAG_GROUND_TRUTHS."""
+
+SCHEMA_VERSION = 1
+
+
+class GroundTruthFile(BaseModel):
+    """On-disk format of a ground truths file."""
+
+    schema_version: int = Field(
+        default=SCHEMA_VERSION, description="Version of the file format"
+    )
+    ground_truths: list[TechVersionGroundTruth]
+
+
+def default_ground_truths_path() -> Path:
+    return Path(os.environ.get("LLM_LIB_LAG_GROUND_TRUTHS", GROUND_TRUTHS_FILE))
+
+
+def load_ground_truths(path: str | Path | None = None) -> list[TechVersionGroundTruth]:
+    """
+    Loads ground truths from a JSON data file.
+
+    :param path: The file to read (default: $LLM_LIB_LAG_GROUND_TRUTHS, or the
+        file shipped with the package).
+    :return: The ground truths, in file order.
+    """
+    path = Path(path) if path is not None else default_ground_truths_path()
+    data = GroundTruthFile.model_validate_json(path.read_bytes())
+    if data.schema_version > SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} uses schema version {data.schema_version}, "
+            f"this version of llm-lib-lag only reads up to {SCHEMA_VERSION}"
+        )
+    return data.ground_truths
+
+
+def save_ground_truths(
+    ground_truths: list[TechVersionGroundTruth], path: str | Path | None = None
+) -> None:
+    """
+    Atomically replaces a ground truths file: readers never see a partial file.
+
+    :param ground_truths: The entries to write.
+    :param path: The file to write (default: see load_ground_truths).
+    """
+    path = Path(path) if path is not None else default_ground_truths_path()
+    content = GroundTruthFile(ground_truths=ground_truths).model_dump_json(indent=2)
+    write_atomic(path, content + "\n")
+
+    _default_ground_truths.cache_clear()
+    logger.info(f"Wrote {len(ground_truths)} ground truths to {path}")
+
+
+class GroundTruthUpdate(NamedTuple):
+    """Result of refreshing one ground truth against its registry."""
+
+    old: TechVersionGroundTruth
+    new: TechVersionGroundTruth | None
+    """The fetched latest version, or None if fetching failed."""
+    error: str | None = None
+
+    @property
+    def changed(self) -> bool:
+        return self.new is not None and self.new != self.old
+
+
+def _fetch_update(ground_truth: TechVersionGroundTruth) -> GroundTruthUpdate:
+    try:
+        version, release_date = fetch_latest_version_and_date(ground_truth.tech)
+    except Exception as e:
+        logger.warning(f"Could not refresh {ground_truth.tech.name}: {e}")
+        return GroundTruthUpdate(ground_truth, None, str(e))
+    new = TechVersionGroundTruth(
+        tech=ground_truth.tech, version=version, release_date=release_date
+    )
+    return GroundTruthUpdate(ground_truth, new)
+
+
+def refresh_ground_truths(
+    ground_truths: list[TechVersionGroundTruth], max_workers: int = 8
+) -> list[GroundTruthUpdate]:
+    """
+    Fetches the latest version of every ground truth concurrently.
+
+    :param ground_truths: The current entries.
+    :param max_workers: Number of registry requests in flight.
+    :return: One update per entry, in the same order. Failures are reported
+        in the update instead of being raised.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_fetch_update, ground_truths))
+
+
+@lru_cache(maxsize=1)
+def _default_ground_truths() -> list[TechVersionGroundTruth]:
+    return load_ground_truths()
+
 
-GROUND_TRUTHS = [
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi"),
-        version="0.115.8",
-        release_date=date(2025, 1, 30),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="django"),
-        version="5.1.6",
-        release_date=date(2025, 2, 5),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="sqlalchemy"),
-        version="2.0.38",
-        release_date=date(2025, 2, 6),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="pydantic"),
-        version="2.10.6",
-        release_date=date(2025, 1, 24),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="langchain"),
-        version="0.3.19",
-        release_date=date(2025, 2, 17),
-    ),
-    ### Javascript ###
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.NPM, name="axios"),
-        version="1.7.9",
-        release_date=date(2024, 12, 4),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.NPM, name="react"),
-        version="19.0.0",
-        release_date=date(2024, 12, 5),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.NPM, name="typescript"),
-        version="5.7.3",
-        release_date=date(2025, 1, 8),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(package_manager=PackageManager.NPM, name="vue"),
-        version="3.5.13",
-        release_date=date(2024, 11, 15),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(
-            package_manager=PackageManager.NPM, name="@angular/core"
-        ),
-        version="19.1.7",
-        release_date=date(2025, 2, 19),
-    ),
-    TechVersionGroundTruth(
-        tech=LibraryIdentifier(
-            package_manager=PackageManager.MAVEN,
-            name="org.springframework.boot:spring-boot-starter-parent",
-        ),
-        version="3.4.3",
-        release_date=date(2025, 2, 20),
-    ),
-    TechVersionGroundTruth(
-        tech=Language.RUST,
-        version="1.85.0",
-        release_date=date(2025, 2, 20),
-    ),
-    TechVersionGroundTruth(
-        tech=Language.PYTHON,
-        version="3.13.2",
-        release_date=date(2025, 2, 5),
-    ),
-    TechVersionGroundTruth(
-        tech=Language.RUBY,
-        version="3.4.2",
-        release_date=date(2025, 2, 14),
-    ),
-    TechVersionGroundTruth(
-        tech=Language.DOTNET,
-        version="9.0.2",
-        release_date=date(2025, 2, 11),
-    ),
-]
+def __getattr__(name: str) -> list[TechVersionGroundTruth]:
+    # GROUND_TRUTHS is loaded on first access, so importing this module stays cheap
+    if name == "GROUND_TRUTHS":
+        return _default_ground_truths()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
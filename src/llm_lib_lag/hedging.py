@@ -0,0 +1,246 @@
+"""
+Hedged LLM calls, cutting the latency tail of slow providers.
+
+When a call has not answered after the hedge delay of its LLM (a latency
+percentile learned from stored runs), a duplicate call is fired and the first
+one to answer wins. The loser cannot be interrupted: it runs to completion in
+a daemon thread and its answer is discarded.
+
+Duplicates cost money, so a global budget caps them to a fraction of the
+calls made, e.g. 0.05 for at most one hedge per 20 calls. Given the AIMD
+limiters of the providers, a hedge also takes a slot of its provider's
+limiter, and is skipped when none is free.
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Generic, Mapping, NamedTuple, Sequence, TypeVar
+
+import numpy as np
+
+from .concurrency import AIMDLimiter, rate_limit_signal
+from .deadlines import Deadline, DeadlineExceededError
+from .models import EvaluationRun, LLMConfig, RunStatus
+from .monitoring import HEDGED_CALLS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PRIMARY = 0
+HEDGE = 1
+
+
+class HedgedResult(NamedTuple, Generic[T]):
+    value: T
+    seconds: float
+    """
+    Latency from the primary call's start. When the hedge wins, the primary's
+    own latency is only known to be longer: this is that latency censored at
+    the answer, never the hedge's shorter duration, which would bias the
+    delays learned from stored runs downwards.
+    """
+    winner: int
+    """PRIMARY or HEDGE."""
+    hedged: bool
+    """Whether a duplicate call was fired."""
+
+
+def hedge_delays(
+    runs: Sequence[EvaluationRun], percentile: float = 95.0, min_runs: int = 20
+) -> dict[str, float]:
+    """
+    Learns hedge delays from the execution times of completed runs.
+
+    :param runs: Stored runs.
+    :param percentile: Latency percentile after which a call is hedged.
+    :param min_runs: LLMs and providers with fewer runs get no delay, their
+        percentile would be noise.
+    :return: Delays keyed by "provider/model", plus by "provider" as a
+        fallback for models of that provider without enough runs.
+    """
+    samples: dict[str, list[float]] = defaultdict(list)
+    for run in runs:
+        if run.status != RunStatus.COMPLETED:
+            continue
+        config = run.llm_config
+        samples[f"{config.provider}/{config.model}"].append(run.execution_time_seconds)
+        samples[config.provider].append(run.execution_time_seconds)
+    return {
+        key: float(np.percentile(seconds, percentile))
+        for key, seconds in samples.items()
+        if len(seconds) >= min_runs
+    }
+
+
+def _report_error(limiter: AIMDLimiter, started: float, error: BaseException) -> None:
+    """Reports the failure of a hedge to its provider's limiter."""
+    signal = rate_limit_signal(error)
+    if signal is None:
+        limiter.on_error(started)
+    else:
+        limiter.on_rate_limit(started, signal.retry_after)
+
+
+class Hedger:
+    """
+    Fires duplicate calls after a per-LLM delay, within a global budget.
+
+    Usage:
+        hedger = Hedger.from_runs(load_runs_from_jsonl("runs.jsonl"), budget=0.05)
+        result = hedger.call(lambda: chain.invoke(query), llm_config, deadline)
+    """
+
+    def __init__(
+        self,
+        delays: Mapping[str, float],
+        budget: float = 0.05,
+        limiter: Callable[[str], AIMDLimiter] | None = None,
+    ) -> None:
+        """
+        :param delays: Hedge delays in seconds, see hedge_delays.
+        :param budget: Maximum ratio of hedges to calls, in [0, 1].
+        :param limiter: The AIMD limiter of a provider, e.g.
+            AdaptiveExecutor.limiter. Hedges then count against the provider's
+            concurrency limit and report their rate limits to it.
+        """
+        if not 0 <= budget <= 1:
+            raise ValueError(f"Hedge budget must be within [0, 1], got {budget}")
+        self.delays = dict(delays)
+        self.budget = budget
+        self.limiter = limiter
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runs(
+        cls,
+        runs: Sequence[EvaluationRun],
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_runs: int = 20,
+        limiter: Callable[[str], AIMDLimiter] | None = None,
+    ) -> "Hedger":
+        return cls(hedge_delays(runs, percentile, min_runs), budget, limiter)
+
+    def delay(self, llm_config: LLMConfig) -> float | None:
+        """:return: Seconds after which calls to this LLM are hedged, if known."""
+        return self.delays.get(
+            f"{llm_config.provider}/{llm_config.model}",
+            self.delays.get(llm_config.provider),
+        )
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def call(
+        self,
+        func: Callable[[], T],
+        llm_config: LLMConfig,
+        deadline: Deadline,
+        stage: str = "llm.invoke",
+    ) -> HedgedResult[T]:
+        """
+        Calls `func`, hedging it if it is slower than the LLM's hedge delay.
+
+        A call failing before the delay is not hedged: its error is raised.
+        Once hedged, the first answer wins, and an error is only raised if
+        both calls fail.
+
+        :param func: The call, run in the caller's context.
+        :param llm_config: The LLM called, selecting the hedge delay.
+        :param deadline: Deadline of the run; both calls share it.
+        :param stage: Name of the step, reported by DeadlineExceededError.
+        :raise DeadlineExceededError: If no call answered in time.
+        """
+        with self._lock:
+            self.calls += 1
+        deadline.check(stage)
+
+        results: queue.Queue[tuple[int, float, T | None, BaseException | None]] = (
+            queue.Queue()
+        )
+
+        def start(attempt: int, slot: tuple[AIMDLimiter, float] | None = None) -> None:
+            # A context can only be entered by one thread at a time
+            context = contextvars.copy_context()
+
+            def target() -> None:
+                started = time.perf_counter()
+                try:
+                    value = context.run(func)
+                except BaseException as e:
+                    if slot is not None:
+                        _report_error(*slot, e)
+                    results.put((attempt, time.perf_counter() - started, None, e))
+                else:
+                    if slot is not None:
+                        slot[0].on_success(slot[1])
+                    results.put((attempt, time.perf_counter() - started, value, None))
+
+            threading.Thread(
+                target=target, name=f"hedge-{stage}-{attempt}", daemon=True
+            ).start()
+
+        delay = self.delay(llm_config)
+        hedge_at = None if delay is None else time.monotonic() + delay
+        limiter = None if self.limiter is None else self.limiter(llm_config.provider)
+        primary_started = time.perf_counter()
+        start(PRIMARY)
+        running = 1
+        hedged = False
+        while True:
+            timeout = deadline.remaining()
+            if hedge_at is not None:
+                until_hedge = max(0.0, hedge_at - time.monotonic())
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+            try:
+                attempt, seconds, value, error = results.get(timeout=timeout)
+            except queue.Empty:
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    slot = None
+                    if limiter is not None:
+                        acquired = limiter.try_acquire()
+                        if acquired is None:
+                            # The provider is at its limit: a hedge would add load
+                            continue
+                        slot = (limiter, acquired)
+                    if self._spend():
+                        logger.debug(
+                            f"{llm_config.provider}/{llm_config.model}: hedging "
+                            f"after {delay:.2f}s"
+                        )
+                        start(HEDGE, slot)
+                        running += 1
+                        hedged = True
+                    elif slot is not None:
+                        slot[0].on_error(slot[1])
+                    continue
+                assert deadline.seconds is not None
+                raise DeadlineExceededError(stage, deadline.seconds)
+
+            if error is None:
+                if attempt == HEDGE:
+                    seconds = time.perf_counter() - primary_started
+                if hedged:
+                    HEDGED_CALLS.inc(
+                        provider=llm_config.provider,
+                        model=llm_config.model,
+                        winner="hedge" if attempt == HEDGE else "primary",
+                    )
+                return HedgedResult(value, seconds, attempt, hedged)  # type: ignore[arg-type]
+            running -= 1
+            # Errors are not hedged: only wait for a duplicate already running
+            hedge_at = None
+            if not running:
+                raise error
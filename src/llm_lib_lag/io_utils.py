@@ -1,5 +1,10 @@
 import json
-from .models import EvaluationRun, LLMConfig, TechVersionGroundTruth
+import os
+import stat
+import uuid
+from pathlib import Path
+
+from .models import EvaluationRun, LLMConfig, RunStatus, TechVersionGroundTruth
 
 
 def load_runs_from_jsonl(filepath: str) -> list[EvaluationRun]:
@@ -34,16 +39,55 @@ def get_missing_runs(
 ) -> list[tuple[LLMConfig, TechVersionGroundTruth]]:
     """
     Returns a list of (LLMConfig, TechVersionGroundTruth) pairs
-    for which no run exists yet in 'runs'.
+    for which no completed run exists yet in 'runs'. Pairs that only timed
+    out are returned again, to be retried.
 
     :param pairs: Candidate list of (LLMConfig, TechVersionGroundTruth).
     :param runs: Existing runs that have already been executed.
     :return: Subset of 'pairs' that have not been run yet.
     """
-    existing_keys = {(run.llm_config, run.ground_truth) for run in runs}
+    existing_keys = {
+        (run.llm_config, run.ground_truth)
+        for run in runs
+        if run.status == RunStatus.COMPLETED
+    }
     missing: list[tuple[LLMConfig, TechVersionGroundTruth]] = []
 
     for llm, gt in pairs:
         if (llm, gt) not in existing_keys:
             missing.append((llm, gt))
     return missing
+
+
+def write_atomic(path: str | Path, content: str | bytes) -> None:
+    """
+    Replaces a file's content atomically.
+
+    The content is written to a temporary file in the same directory, synced,
+    then renamed over the target, so readers never see a partial file. The
+    file keeps the target's permissions, or gets the usual permissions of a
+    new file (mkstemp would leave it readable by its owner only).
+
+    :param path: The file to write.
+    :param content: The new content; str is encoded as UTF-8.
+    """
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        mode: int | None = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        # A new file: os.open below lets the umask narrow 0o666, as open() does
+        mode = None
+    tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex[:12]}"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
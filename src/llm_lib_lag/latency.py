@@ -0,0 +1,212 @@
+"""
+Latency analytics: tail latency per provider/model per sweep, a persisted
+history of it, and detection of regressions across sweeps.
+
+Runs carry no sweep id, so sweeps are recovered from timestamps: a pause of
+more than `sweep_gap` between two consecutive runs starts a new sweep. Every
+run of a sweep counts, including re-runs, since latency (unlike accuracy)
+is a property of each call.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+from .io_utils import write_atomic
+from .metrics import llm_key
+from .models import EvaluationRun
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_SWEEP_GAP = timedelta(hours=6)
+
+
+class LatencyStats(BaseModel):
+    """Distribution of execution_time_seconds over a group of runs."""
+
+    model_config = ConfigDict(frozen=True)
+
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class SweepLatency(BaseModel):
+    """Latency of one LLM during one sweep."""
+
+    model_config = ConfigDict(frozen=True)
+
+    sweep_started_at: datetime
+    sweep_ended_at: datetime
+    llm: str = Field(..., examples=["openai/gpt-4o-mini"])
+    stats: LatencyStats
+
+
+class LatencyHistory(BaseModel):
+    """On-disk format of a latency history file."""
+
+    schema_version: int = SCHEMA_VERSION
+    sweeps: list[SweepLatency] = Field(default_factory=list)
+
+
+class LatencyRegression(BaseModel):
+    """A sweep whose tail latency exceeds its LLM's baseline."""
+
+    model_config = ConfigDict(frozen=True)
+
+    llm: str
+    sweep_started_at: datetime
+    percentile: str
+    baseline: float = Field(..., description="Median of the previous sweeps")
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative increase over the baseline, e.g. 0.5 for 50% slower."""
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+
+def latency_stats(seconds: Sequence[float]) -> LatencyStats:
+    values = np.asarray(seconds, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return LatencyStats(
+        count=len(values),
+        mean=float(values.mean()),
+        p50=float(p50),
+        p95=float(p95),
+        p99=float(p99),
+        max=float(values.max()),
+    )
+
+
+def split_sweeps(
+    runs: Sequence[EvaluationRun], sweep_gap: timedelta = DEFAULT_SWEEP_GAP
+) -> list[list[EvaluationRun]]:
+    """
+    Groups runs into sweeps: runs closer than `sweep_gap` to the previous
+    run belong to the same sweep.
+
+    :return: Sweeps in chronological order, each sorted by timestamp.
+    """
+    sweeps: list[list[EvaluationRun]] = []
+    for run in sorted(runs, key=lambda r: r.timestamp):
+        if not sweeps or run.timestamp - sweeps[-1][-1].timestamp > sweep_gap:
+            sweeps.append([])
+        sweeps[-1].append(run)
+    return sweeps
+
+
+def sweep_latencies(
+    runs: Sequence[EvaluationRun], sweep_gap: timedelta = DEFAULT_SWEEP_GAP
+) -> list[SweepLatency]:
+    """
+    :return: Latency statistics per sweep and LLM, chronological, LLMs sorted.
+    """
+    results: list[SweepLatency] = []
+    for sweep in split_sweeps(runs, sweep_gap):
+        by_llm: dict[str, list[float]] = defaultdict(list)
+        for run in sweep:
+            by_llm[llm_key(run)].append(run.execution_time_seconds)
+        for llm in sorted(by_llm):
+            results.append(
+                SweepLatency(
+                    sweep_started_at=sweep[0].timestamp,
+                    sweep_ended_at=sweep[-1].timestamp,
+                    llm=llm,
+                    stats=latency_stats(by_llm[llm]),
+                )
+            )
+    return results
+
+
+# -------------------------------------------------------------
+# History
+# -------------------------------------------------------------
+def load_latency_history(path: str | Path) -> list[SweepLatency]:
+    """:return: The sweeps recorded in `path`; empty if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    history = LatencyHistory.model_validate_json(path.read_bytes())
+    if history.schema_version > SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} uses schema version {history.schema_version}, "
+            f"this version of llm-lib-lag only reads up to {SCHEMA_VERSION}"
+        )
+    return history.sweeps
+
+
+def merge_latency_history(
+    history: list[SweepLatency], new: list[SweepLatency]
+) -> list[SweepLatency]:
+    """
+    Adds new sweep entries to a history. An entry for the same LLM and sweep
+    start replaces the old one, so recomputing a sweep that grew is safe.
+    """
+    merged = {(s.llm, s.sweep_started_at): s for s in history}
+    merged.update({(s.llm, s.sweep_started_at): s for s in new})
+    return sorted(merged.values(), key=lambda s: (s.sweep_started_at, s.llm))
+
+
+def save_latency_history(path: str | Path, sweeps: list[SweepLatency]) -> None:
+    write_atomic(path, LatencyHistory(sweeps=sweeps).model_dump_json(indent=2) + "\n")
+    logger.info(f"Wrote {len(sweeps)} sweep latencies to {path}")
+
+
+def detect_regressions(
+    history: list[SweepLatency],
+    threshold: float = 0.25,
+    percentile: str = "p95",
+    baseline_sweeps: int = 3,
+    min_runs: int = 10,
+) -> list[LatencyRegression]:
+    """
+    Compares the latest sweep of every LLM to its previous sweeps.
+
+    :param history: Sweep latencies, in any order.
+    :param threshold: Allowed relative increase, e.g. 0.25 for 25%.
+    :param percentile: Statistic compared: "p50", "p95" or "p99".
+    :param baseline_sweeps: Number of previous sweeps whose median is the baseline.
+    :param min_runs: Sweeps with fewer runs are too noisy and are ignored.
+    :return: The LLMs whose latest sweep regressed, slowest change first.
+    """
+    if percentile not in ("p50", "p95", "p99"):
+        raise ValueError(f"Unknown percentile {percentile!r}")
+    if baseline_sweeps < 1:
+        raise ValueError("baseline_sweeps must be at least 1")
+
+    by_llm: dict[str, list[SweepLatency]] = defaultdict(list)
+    for sweep in sorted(history, key=lambda s: s.sweep_started_at):
+        if sweep.stats.count >= min_runs:
+            by_llm[sweep.llm].append(sweep)
+
+    regressions: list[LatencyRegression] = []
+    for llm, sweeps in by_llm.items():
+        if len(sweeps) < 2:
+            continue
+        latest = sweeps[-1]
+        previous = [
+            getattr(s.stats, percentile) for s in sweeps[-1 - baseline_sweeps : -1]
+        ]
+        baseline = float(np.median(previous))
+        current = getattr(latest.stats, percentile)
+        if current > baseline * (1 + threshold):
+            regressions.append(
+                LatencyRegression(
+                    llm=llm,
+                    sweep_started_at=latest.sweep_started_at,
+                    percentile=percentile,
+                    baseline=baseline,
+                    current=current,
+                )
+            )
+    return sorted(regressions, key=lambda r: -r.change)
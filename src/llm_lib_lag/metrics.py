@@ -0,0 +1,299 @@
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, ConfigDict
+
+from .models import EvaluationRun, RunStatus
+from .versions import parse_version
+
+logger = logging.getLogger(__name__)
+
+RunKey = tuple[str, str, str]
+
+
+def llm_key(run: EvaluationRun) -> str:
+    """Label used to group runs by LLM, e.g. "openai/gpt-4o-mini"."""
+    return f"{run.llm_config.provider}/{run.llm_config.model}"
+
+
+def run_key(run: EvaluationRun) -> RunKey:
+    """Identifies the (technology, provider, model) combination of a run."""
+    return (
+        run.ground_truth.tech.name,
+        run.llm_config.provider,
+        run.llm_config.model,
+    )
+
+
+def latest_runs(runs: Sequence[EvaluationRun]) -> list[EvaluationRun]:
+    """
+    Keeps only the most recent completed run for each (technology, provider,
+    model). Timed out runs have no answer to score and are skipped.
+
+    :param runs: Runs in any order, possibly containing re-runs.
+    :return: One run per key, in first-seen key order.
+    """
+    latest: dict[RunKey, EvaluationRun] = {}
+    for run in runs:
+        if run.status != RunStatus.COMPLETED:
+            continue
+        key = run_key(run)
+        current = latest.get(key)
+        if current is None or run.timestamp > current.timestamp:
+            latest[key] = run
+    return list(latest.values())
+
+
+# ------------------------------------------------------
+# Result objects
+# ------------------------------------------------------
+class LagStats(BaseModel):
+    """Distribution of lag_days over a group of runs."""
+
+    model_config = ConfigDict(frozen=True)
+
+    count: int
+    mean: float
+    median: float
+    p90: float
+    p95: float
+    max: float
+
+
+class GroupMetrics(BaseModel):
+    """Match counts, timing and lag for one group of runs (overall, a tech or an LLM)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    total_runs: int
+    exact_matches: int
+    major_matches: int
+    minor_matches: int
+    avg_execution_time: float
+    lag: LagStats | None = None
+
+    @property
+    def exact_match_rate(self) -> float:
+        return self.exact_matches / self.total_runs
+
+    @property
+    def major_match_rate(self) -> float:
+        return self.major_matches / self.total_runs
+
+    @property
+    def minor_match_rate(self) -> float:
+        return self.minor_matches / self.total_runs
+
+
+class MetricsReport(BaseModel):
+    """Structured result of an evaluation over a set of runs."""
+
+    model_config = ConfigDict(frozen=True)
+
+    input_runs: int
+    """Number of runs given, before keeping only the latest run per key."""
+
+    overall: GroupMetrics
+    by_tech: dict[str, GroupMetrics]
+    by_llm: dict[str, GroupMetrics]
+
+
+# ------------------------------------------------------
+# Columnar representation
+# ------------------------------------------------------
+@dataclass(frozen=True)
+class RunFrame:
+    """
+    Column-oriented view of deduplicated runs.
+
+    Row i of every array describes the same run. Techs and LLMs are stored as
+    integer codes into `tech_names` / `llm_names`, and `lag_days` is NaN where
+    no lag is available.
+    """
+
+    tech_names: list[str]
+    llm_names: list[str]
+    tech: npt.NDArray[np.intp]
+    llm: npt.NDArray[np.intp]
+    execution_time: npt.NDArray[np.float64]
+    exact: npt.NDArray[np.bool_]
+    major: npt.NDArray[np.bool_]
+    minor: npt.NDArray[np.bool_]
+    lag_days: npt.NDArray[np.float64]
+
+    def __len__(self) -> int:
+        return len(self.tech)
+
+
+class _VersionTable:
+    """Assigns an index to each distinct version string, looked up once."""
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.identity: list[int] = []  # equal versions share the same identity
+        self.major: list[int] = []
+        self.minor: list[int] = []
+        self.valid: list[bool] = []
+        self._identities: dict[str, int] = {}
+
+    def lookup(self, version_str: str) -> int:
+        idx = self.index.get(version_str)
+        if idx is not None:
+            return idx
+
+        idx = len(self.identity)
+        self.index[version_str] = idx
+        parsed = parse_version(version_str)
+        if not parsed.is_valid:
+            logger.error(f"Error parsing version {version_str!r}")
+            self.identity.append(-1)
+        else:
+            self.identity.append(
+                self._identities.setdefault(parsed.canonical, len(self._identities))
+            )
+        self.major.append(parsed.major)
+        self.minor.append(parsed.minor)
+        self.valid.append(parsed.is_valid)
+        return idx
+
+
+def build_run_frame(runs: Sequence[EvaluationRun]) -> RunFrame:
+    """
+    Converts runs into columns in a single pass, keeping only the latest run
+    per (technology, provider, model).
+
+    Match flags are only set when both the ground truth and the parsed version
+    can be parsed; lag is only kept for those runs as well.
+
+    :param runs: EvaluationRun objects, possibly with duplicates.
+    :return: A RunFrame with one row per latest run.
+    """
+    filtered = latest_runs(runs)
+    n = len(filtered)
+
+    tech_codes: dict[str, int] = {}
+    llm_codes: dict[str, int] = {}
+    versions = _VersionTable()
+
+    tech = np.empty(n, dtype=np.intp)
+    llm = np.empty(n, dtype=np.intp)
+    execution_time = np.empty(n, dtype=np.float64)
+    gt_idx = np.empty(n, dtype=np.intp)
+    parsed_idx = np.full(n, -1, dtype=np.intp)
+    lag_days = np.full(n, np.nan, dtype=np.float64)
+
+    for i, run in enumerate(filtered):
+        tech[i] = tech_codes.setdefault(run.ground_truth.tech.name, len(tech_codes))
+        llm[i] = llm_codes.setdefault(llm_key(run), len(llm_codes))
+        execution_time[i] = run.execution_time_seconds
+        gt_idx[i] = versions.lookup(run.ground_truth.version)
+        if run.parsed_version:
+            parsed_idx[i] = versions.lookup(run.parsed_version)
+            if run.lag_days is not None:
+                lag_days[i] = run.lag_days
+
+    # Vectorized comparisons on the parsed version components
+    identity = np.asarray(versions.identity + [-1], dtype=np.intp)
+    major = np.asarray(versions.major + [-1], dtype=np.int64)
+    minor = np.asarray(versions.minor + [-1], dtype=np.int64)
+    valid = np.asarray(versions.valid + [False], dtype=np.bool_)
+
+    # parsed_idx == -1 points at the trailing "missing" entry added above
+    comparable = valid[gt_idx] & valid[parsed_idx]
+    exact = comparable & (identity[gt_idx] == identity[parsed_idx])
+    major_match = comparable & (major[gt_idx] == major[parsed_idx])
+    minor_match = major_match & (minor[gt_idx] == minor[parsed_idx])
+    lag_days[~comparable] = np.nan
+
+    return RunFrame(
+        tech_names=list(tech_codes),
+        llm_names=list(llm_codes),
+        tech=tech,
+        llm=llm,
+        execution_time=execution_time,
+        exact=exact,
+        major=major_match,
+        minor=minor_match,
+        lag_days=lag_days,
+    )
+
+
+# ------------------------------------------------------
+# Aggregation
+# ------------------------------------------------------
+def _lag_stats(lags: npt.NDArray[np.float64]) -> LagStats | None:
+    if len(lags) == 0:
+        return None
+    median, p90, p95 = np.percentile(lags, [50, 90, 95])
+    return LagStats(
+        count=len(lags),
+        mean=float(lags.mean()),
+        median=float(median),
+        p90=float(p90),
+        p95=float(p95),
+        max=float(lags.max()),
+    )
+
+
+def group_metrics(
+    frame: RunFrame, codes: npt.NDArray[np.intp], n_groups: int
+) -> list[GroupMetrics]:
+    """
+    Aggregates a RunFrame by integer group codes.
+
+    :param frame: The columns to aggregate.
+    :param codes: Group code of each row, in [0, n_groups).
+    :param n_groups: Number of groups.
+    :return: One GroupMetrics per group code.
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    exact = np.bincount(codes, weights=frame.exact, minlength=n_groups)
+    major = np.bincount(codes, weights=frame.major, minlength=n_groups)
+    minor = np.bincount(codes, weights=frame.minor, minlength=n_groups)
+    time_sum = np.bincount(codes, weights=frame.execution_time, minlength=n_groups)
+
+    # Sort the available lags by (group, lag) once, then slice per group
+    has_lag = ~np.isnan(frame.lag_days)
+    lag_codes = codes[has_lag]
+    lag_values = frame.lag_days[has_lag]
+    order = np.lexsort((lag_values, lag_codes))
+    lag_values = lag_values[order]
+    bounds = np.searchsorted(lag_codes[order], np.arange(n_groups + 1))
+
+    return [
+        GroupMetrics(
+            total_runs=int(counts[g]),
+            exact_matches=int(exact[g]),
+            major_matches=int(major[g]),
+            minor_matches=int(minor[g]),
+            avg_execution_time=float(time_sum[g] / counts[g]) if counts[g] else 0.0,
+            lag=_lag_stats(lag_values[bounds[g] : bounds[g + 1]]),
+        )
+        for g in range(n_groups)
+    ]
+
+
+def compute_metrics(runs: Sequence[EvaluationRun]) -> MetricsReport:
+    """
+    Computes overall, per-tech and per-LLM metrics for a set of runs.
+
+    :param runs: A non-empty list of EvaluationRun objects.
+    :return: A MetricsReport with the aggregated results.
+    """
+    if not runs:
+        raise ValueError("Cannot compute metrics without runs")
+
+    frame = build_run_frame(runs)
+    (overall,) = group_metrics(frame, np.zeros(len(frame), dtype=np.intp), 1)
+    by_tech = group_metrics(frame, frame.tech, len(frame.tech_names))
+    by_llm = group_metrics(frame, frame.llm, len(frame.llm_names))
+
+    return MetricsReport(
+        input_runs=len(runs),
+        overall=overall,
+        by_tech=dict(zip(frame.tech_names, by_tech)),
+        by_llm=dict(zip(frame.llm_names, by_llm)),
+    )
@@ -1,36 +1,22 @@
 from enum import Enum
-from typing import Literal
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Literal
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 from datetime import date, datetime, UTC
 
+from .distributions import LatencyDistribution
+from .technologies import Language, PackageManager
+
 
 def utc_factory() -> datetime:
     return datetime.now(UTC)
 
 
-class PackageManager(str, Enum):
-    NPM = "npm"
-    MAVEN = "maven"
-    RUBYGEMS = "rubygems"
-    PYPI = "pypi"
-    CARGO = "cargo"
-
-
-class Language(str, Enum):
-    PYTHON = "python"
-    NODEJS = "nodejs"
-    RUBY = "ruby"
-    JAVA = "java"
-    C_SHARP = "csharp"
-    GO = "go"
-    RUST = "rust"
-    DOTNET = "dotnet"
-
-    @property
-    def name(self) -> str:
-        return self.value
-
-
 class LibraryIdentifier(BaseModel):
     model_config = ConfigDict(frozen=True)
 
@@ -54,6 +40,49 @@ class TechVersionGroundTruth(BaseModel):
     )
 
 
+class SimulationConfig(BaseModel):
+    """
+    Behaviour of the "simulated" provider: a fake chat model that answers
+    without network, for benchmarking the evaluation loop.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    latency_ms: float = Field(
+        default=500.0, ge=0, description="Mean time to first token"
+    )
+    latency_distribution: LatencyDistribution = "lognormal"
+    latency_sigma: float = Field(
+        default=0.5, ge=0, description="Shape of the lognormal latency"
+    )
+    tokens_per_second: float = Field(
+        default=0.0, ge=0, description="Generation speed; 0 for instant output"
+    )
+    thinking_tokens: int = Field(
+        default=40, ge=0, description="Length of the <thinking> section"
+    )
+    exact_rate: float = Field(
+        default=0.3, ge=0, le=1, description="Share of answers giving the ground truth"
+    )
+    hallucination_rate: float = Field(
+        default=0.05, ge=0, le=1, description="Share of answers inventing a version"
+    )
+    error_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Share of calls failing with an error"
+    )
+    rate_limit_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Share of calls rejected as rate limited"
+    )
+    retry_after_seconds: float = Field(default=1.0, ge=0)
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Calls beyond this many in flight are rate limited, like "
+        "an account's concurrency limit",
+    )
+    seed: int | None = None
+
+
 class LLMConfig(BaseModel):
     model_config = ConfigDict(
         frozen=True,
@@ -68,6 +97,7 @@ class LLMConfig(BaseModel):
         "fireworks",
         "perplexity",
         "groq",
+        "simulated",
     ] = Field(
         ...,
         description="LLM provider (e.g., 'anthropic', 'openai')",
@@ -84,10 +114,39 @@ class LLMConfig(BaseModel):
         ],
     )
 
+    simulation: SimulationConfig | None = Field(
+        default=None,
+        description="Settings of the 'simulated' provider",
+    )
+
+    timeout_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Deadline of one evaluation run (LLM call and registry "
+        "lookup); None for the runner's default",
+    )
+
+    @model_serializer(mode="wrap")
+    def _omit_unset_options(
+        self, handler: SerializerFunctionWrapHandler
+    ) -> dict[str, Any]:
+        # Optional settings are left out when unset, so that configs and run
+        # files written before they existed keep the same form (and task keys)
+        data = handler(self)
+        for field in ("simulation", "timeout_seconds"):
+            if field in data and data[field] is None:
+                del data[field]
+        return data
+
     def __hash__(self) -> int:
         return hash((self.provider, self.model))
 
 
+class RunStatus(str, Enum):
+    COMPLETED = "completed"
+    TIMEOUT = "timeout"
+
+
 class EvaluationRun(BaseModel):
     """Represents a single evaluation run of an LLM model on a specific library/framework."""
 
@@ -99,6 +158,12 @@ class EvaluationRun(BaseModel):
 
     timestamp: datetime = Field(default_factory=utc_factory)
 
+    status: RunStatus = Field(
+        default=RunStatus.COMPLETED,
+        description="Timed out runs stop at the deadline; their results are "
+        "partial and they are not scored",
+    )
+
     # Results
     execution_time_seconds: float = Field(
         ..., description="Time taken for the evaluation in seconds"
@@ -0,0 +1,483 @@
+"""
+Live metrics of a sweep, in the Prometheus text exposition format.
+
+Counters, gauges and histograms are collected in-process (a dict update under
+a lock, cheap enough to be always on) and exposed either as a text file
+rewritten periodically, for node_exporter's textfile collector, or on a
+local HTTP endpoint that Prometheus scrapes.
+
+Exporters start with `start_exporters`, or from $LLM_LIB_LAG_METRICS_FILE and
+$LLM_LIB_LAG_METRICS_PORT with `start_exporters_from_env`.
+
+Typical alerts: rate(llm_lib_lag_runs_total[5m]) == 0 while the sweep job
+runs, or llm_lib_lag_runs_per_second dropping below its usual level.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .io_utils import write_atomic
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+"""Histogram buckets (seconds) fitting both registry calls and LLM calls."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        registry: "MetricsRegistry | None" = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """The exposition lines of the metric, one per labelled series."""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type_name}\n"
+        return header + "".join(line + "\n" for line in self._samples())
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every recorded value."""
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. runs completed."""
+
+    type_name = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        registry: "MetricsRegistry | None" = None,
+    ) -> None:
+        self._values: dict[LabelValues, float] = {}
+        super().__init__(name, documentation, labels, registry)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, set directly or read from a function."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        registry: "MetricsRegistry | None" = None,
+    ) -> None:
+        self._values: dict[LabelValues, float | Callable[[], float]] = {}
+        super().__init__(name, documentation, labels, registry)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        """Reads the value from `fn` at every export, e.g. a queue's size."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = fn
+
+    def remove(self, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            value = self._values.get(self._key(labels), 0.0)
+        return value() if callable(value) else value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: item[0])
+        return [
+            f"{self.name}{_format_labels(self.label_names, k)} "
+            f"{_format_value(v() if callable(v) else v)}"
+            for k, v in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies) in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        registry: "MetricsRegistry | None" = None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, [count, sum])
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+        super().__init__(name, documentation, labels, registry)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, totals = self._values.setdefault(
+                key, ([0] * len(self.buckets), [0.0, 0.0])
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += 1
+            totals[1] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return int(entry[1][0]) if entry else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (k, (list(counts), list(totals)))
+                for k, (counts, totals) in self._values.items()
+            )
+        lines: list[str] = []
+        for key, (counts, (count, total)) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    (*self.label_names, "le"), (*key, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels((*self.label_names, "le"), (*key, "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {int(count)}")
+            base = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{base} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base} {int(count)}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+    def clear(self) -> None:
+        """Resets every value, keeping the metric definitions."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+# -------------------------------------------------------------
+# Pipeline metrics
+# -------------------------------------------------------------
+RUNS = Counter(
+    "llm_lib_lag_runs_total", "Evaluation runs completed", ("provider", "model")
+)
+PARSE_FAILURES = Counter(
+    "llm_lib_lag_parse_failures_total",
+    "Runs whose answer contained no version",
+    ("provider", "model"),
+)
+NONEXISTENT_VERSIONS = Counter(
+    "llm_lib_lag_nonexistent_versions_total",
+    "Runs answering a version the registry does not know (parsed_version_exists=False)",
+    ("provider", "model"),
+)
+LLM_LATENCY = Histogram(
+    "llm_lib_lag_llm_latency_seconds",
+    "Time of one LLM call",
+    ("provider", "model"),
+)
+RUN_TIMEOUTS = Counter(
+    "llm_lib_lag_run_timeouts_total",
+    "Runs stopped at their deadline, by the step that was running",
+    ("provider", "model", "stage"),
+)
+HEDGED_CALLS = Counter(
+    "llm_lib_lag_hedged_calls_total",
+    "LLM calls duplicated after their hedge delay, by which call answered first",
+    ("provider", "model", "winner"),
+)
+RATE_LIMITED = Counter(
+    "llm_lib_lag_rate_limited_total",
+    "LLM calls rejected with a rate limit or overload error",
+    ("provider",),
+)
+CONCURRENCY_LIMIT = Gauge(
+    "llm_lib_lag_concurrency_limit",
+    "Current adaptive concurrency limit of a provider",
+    ("provider",),
+)
+REGISTRY_LATENCY = Histogram(
+    "llm_lib_lag_registry_request_seconds",
+    "Time of one registry HTTP request",
+    ("host",),
+)
+REGISTRY_REQUESTS = Counter(
+    "llm_lib_lag_registry_requests_total",
+    "Registry HTTP requests by response status",
+    ("host", "status"),
+)
+FETCH_CACHE = Counter(
+    "llm_lib_lag_fetch_cache_total",
+    "Registry lookups answered without (hit) or with (miss) an HTTP request",
+    ("fetch", "result"),
+)
+NEW_RELEASES = Counter(
+    "llm_lib_lag_new_releases_total",
+    "New latest versions detected by watch mode",
+    ("tech",),
+)
+QUEUE_DEPTH = Gauge(
+    "llm_lib_lag_run_writer_queue_depth",
+    "Runs waiting to be written to disk",
+    ("file",),
+)
+
+THROUGHPUT_WINDOW = 60.0
+"""Seconds over which llm_lib_lag_runs_per_second is averaged."""
+
+_completions: deque[float] = deque()
+_completions_lock = threading.Lock()
+
+
+def _runs_per_second() -> float:
+    now = time.monotonic()
+    with _completions_lock:
+        while _completions and _completions[0] < now - THROUGHPUT_WINDOW:
+            _completions.popleft()
+        return len(_completions) / THROUGHPUT_WINDOW
+
+
+THROUGHPUT = Gauge(
+    "llm_lib_lag_runs_per_second",
+    f"Runs completed per second over the last {THROUGHPUT_WINDOW:g}s",
+)
+THROUGHPUT.set_function(_runs_per_second)
+
+
+def record_run(
+    provider: str,
+    model: str,
+    llm_seconds: float,
+    parsed: bool,
+    version_exists: bool | None,
+) -> None:
+    """Updates the run metrics after one evaluation run."""
+    RUNS.inc(provider=provider, model=model)
+    LLM_LATENCY.observe(llm_seconds, provider=provider, model=model)
+    if not parsed:
+        PARSE_FAILURES.inc(provider=provider, model=model)
+    if version_exists is False:
+        NONEXISTENT_VERSIONS.inc(provider=provider, model=model)
+    with _completions_lock:
+        _completions.append(time.monotonic())
+
+
+def record_timeout(provider: str, model: str, stage: str) -> None:
+    """Counts a run stopped at its deadline during `stage`."""
+    RUN_TIMEOUTS.inc(provider=provider, model=model, stage=stage)
+
+
+# -------------------------------------------------------------
+# Exporters
+# -------------------------------------------------------------
+def write_textfile(path: str | Path, registry: MetricsRegistry | None = None) -> None:
+    """Writes the metrics atomically, for node_exporter's textfile collector."""
+    write_atomic(path, (registry or REGISTRY).render())
+
+
+class TextfileExporter:
+    """Rewrites a metrics file every `interval` seconds from a daemon thread."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float = 15.0,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-textfile", daemon=True
+        )
+
+    def start(self) -> "TextfileExporter":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_textfile(self.path, self.registry)
+            except OSError as e:
+                logger.warning(f"Could not write metrics to {self.path}: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        """Stops the thread after a final write."""
+        self._stop_event.set()
+        self._thread.join()
+        write_textfile(self.path, self.registry)
+
+
+def serve_metrics(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry | None = None
+) -> ThreadingHTTPServer:
+    """
+    Serves the metrics on http://host:port/metrics from a daemon thread.
+
+    :param port: Port to listen on; 0 picks a free one.
+    :return: The running server; call `shutdown()` to stop it.
+    """
+    source = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = source.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    ).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_exporters(
+    textfile: str | Path | None = None,
+    port: int | None = None,
+    interval: float = 15.0,
+) -> tuple[TextfileExporter | None, ThreadingHTTPServer | None]:
+    """Starts the requested exporters; both are optional."""
+    exporter = TextfileExporter(textfile, interval).start() if textfile else None
+    server = serve_metrics(port) if port is not None else None
+    return exporter, server
+
+
+def start_exporters_from_env() -> tuple[
+    TextfileExporter | None, ThreadingHTTPServer | None
+]:
+    """Starts the exporters set by $LLM_LIB_LAG_METRICS_FILE / $LLM_LIB_LAG_METRICS_PORT."""
+    port = os.environ.get("LLM_LIB_LAG_METRICS_PORT")
+    return start_exporters(
+        textfile=os.environ.get("LLM_LIB_LAG_METRICS_FILE") or None,
+        port=int(port) if port else None,
+    )
@@ -0,0 +1,343 @@
+"""
+Built-in profiling of the entry points, split by phase.
+
+A ProfileSession profiles the program from `start` to `close`. Entry points
+mark their phases (startup/imports, run loading, missing-pair computation,
+evaluation loop, metric aggregation, ...) with `profile_phase`, which does
+nothing when no session is active, so instrumented code costs nothing in
+normal runs.
+
+Two modes:
+    - "deterministic": cProfile, one profile per phase, written as
+      <phase>.prof files readable with pstats or snakeviz. Only the thread
+      that started the session is profiled.
+    - "sampling": a background thread samples the stacks of every thread
+      every few milliseconds. Low overhead, so timings stay realistic;
+      writes <phase>.collapsed files (flamegraph.pl / speedscope format).
+
+Both write summary.txt: wall time per phase and its hottest functions.
+
+`measure_startup` times the startup of an entry point in fresh interpreters,
+and attributes its import time to the packages imported.
+
+Only the standard library is imported here, so entry points can start a
+session before their own heavy imports.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from types import FrameType
+from typing import NamedTuple, Sequence
+
+logger = logging.getLogger(__name__)
+
+HOT_FUNCTIONS = 15
+"""Functions listed per phase in the summary."""
+
+OTHER_PHASE = "other"
+"""Phase of the time not covered by any named phase."""
+
+IMPORTED_AT = time.perf_counter()
+"""When this module was first imported; entry points importing it first can
+time their startup from here even before a session exists."""
+
+
+class ProfileMode(str, Enum):
+    DETERMINISTIC = "deterministic"
+    SAMPLING = "sampling"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Samples every thread's stack, attributing samples to the current phase."""
+
+    def __init__(self, session: "ProfileSession", interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.session = session
+        self.interval = interval
+        self.stacks: dict[str, Counter[str]] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            phase_stacks = self.stacks.setdefault(self.session.current_phase, Counter())
+            # Private-looking but documented: the only stdlib way to read the
+            # stacks of other threads (CPython-specific, hence the underscore)
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels: list[str] = []
+                current: FrameType | None = frame
+                while current is not None:
+                    labels.append(_frame_label(current))
+                    current = current.f_back
+                phase_stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileSession:
+    """
+    Profiles a run phase by phase and writes the artifacts to a directory.
+
+    Usage:
+        with ProfileSession("profiles/run1"):
+            with profile_phase("run_loading"):
+                runs = load_runs_from_jsonl(path)
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        mode: ProfileMode = ProfileMode.DETERMINISTIC,
+        sample_interval: float = 0.005,
+    ) -> None:
+        """
+        :param output_dir: Directory receiving the profiles and summary.txt.
+        :param mode: Deterministic (cProfile) or sampling profiler.
+        :param sample_interval: Seconds between two samples (sampling mode).
+        """
+        self.output_dir = Path(output_dir)
+        self.mode = ProfileMode(mode)
+        self.sample_interval = sample_interval
+        self.wall_seconds: defaultdict[str, float] = defaultdict(float)
+        self._phases: list[str] = []
+        self._phase_started = 0.0
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._sampler: _Sampler | None = None
+
+    @property
+    def current_phase(self) -> str:
+        return self._phases[-1] if self._phases else OTHER_PHASE
+
+    # -------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------
+    def start(self) -> "ProfileSession":
+        global _active
+        if _active is not None:
+            raise RuntimeError("A profile session is already running")
+        _active = self
+        self._phase_started = time.perf_counter()
+        if self.mode == ProfileMode.SAMPLING:
+            self._sampler = _Sampler(self, self.sample_interval)
+            self._sampler.start()
+        else:
+            self._profile(OTHER_PHASE).enable()
+        logger.info(f"Profiling ({self.mode.value}) into {self.output_dir}")
+        return self
+
+    def close(self) -> None:
+        """Stops profiling and writes the artifacts."""
+        global _active
+        if _active is not self:
+            return
+        self._switch(None)
+        if self._sampler is not None:
+            self._sampler.stop()
+        _active = None
+        self._write()
+
+    def __enter__(self) -> "ProfileSession":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -------------------------------------------------------------
+    # Phases
+    # -------------------------------------------------------------
+    def _profile(self, phase: str) -> cProfile.Profile:
+        if phase not in self._profiles:
+            self._profiles[phase] = cProfile.Profile()
+        return self._profiles[phase]
+
+    def _switch(self, phase: str | None) -> None:
+        """Charges the time so far to the current phase, then moves to `phase`."""
+        now = time.perf_counter()
+        previous = self.current_phase
+        self.wall_seconds[previous] += now - self._phase_started
+        self._phase_started = now
+        if self.mode == ProfileMode.DETERMINISTIC:
+            # One cProfile can be active at a time: phases do not nest
+            self._profile(previous).disable()
+            if phase is not None:
+                self._profile(phase).enable()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        outer = self.current_phase
+        self._switch(name)
+        self._phases.append(name)
+        try:
+            yield
+        finally:
+            self._switch(outer)
+            self._phases.pop()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Adds a phase timed outside the session, e.g. startup before `start`."""
+        self.wall_seconds[name] += seconds
+
+    # -------------------------------------------------------------
+    # Artifacts
+    # -------------------------------------------------------------
+    def _write(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        phases = [p for p, seconds in self.wall_seconds.items() if seconds > 0]
+        lines = [
+            f"Profile ({self.mode.value}), {sum(self.wall_seconds.values()):.3f}s total",
+            "",
+        ]
+        for phase in sorted(phases, key=lambda p: -self.wall_seconds[p]):
+            lines.append(f"== {phase}: {self.wall_seconds[phase]:.3f}s ==")
+            if self.mode == ProfileMode.DETERMINISTIC:
+                lines.append(self._write_cprofile(phase))
+            else:
+                lines.append(self._write_samples(phase))
+
+        (self.output_dir / "phases.json").write_text(
+            json.dumps({p: round(self.wall_seconds[p], 6) for p in phases}, indent=2)
+        )
+        summary = "\n".join(lines)
+        (self.output_dir / "summary.txt").write_text(summary)
+        logger.info(f"Profile written to {self.output_dir}\n{summary}")
+
+    def _write_cprofile(self, phase: str) -> str:
+        profile = self._profiles.get(phase)
+        if profile is None:
+            return "(timed only, not profiled)\n"
+        profile.dump_stats(self.output_dir / f"{phase}.prof")
+        out = io.StringIO()
+        try:
+            stats = pstats.Stats(profile, stream=out)
+        except TypeError:  # no function call was recorded
+            return "(no calls)\n"
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(HOT_FUNCTIONS)
+        # Drop the pstats preamble, keep the table
+        table = out.getvalue()
+        return table[table.find("   ncalls") :] if "   ncalls" in table else table
+
+    def _write_samples(self, phase: str) -> str:
+        assert self._sampler is not None
+        stacks = self._sampler.stacks.get(phase, Counter())
+        (self.output_dir / f"{phase}.collapsed").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        )
+        total = sum(stacks.values())
+        if not total:
+            return "(no samples)\n"
+        leaves: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        rows = [f"{'samples':>8} {'share':>6}  function"]
+        rows += [
+            f"{count:>8} {count / total:>6.1%}  {label}"
+            for label, count in leaves.most_common(HOT_FUNCTIONS)
+        ]
+        return "\n".join(rows) + "\n"
+
+
+_active: ProfileSession | None = None
+
+
+def active_session() -> ProfileSession | None:
+    return _active
+
+
+@contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """Attributes the enclosed block to phase `name` of the active session, if any."""
+    if _active is None:
+        yield
+        return
+    with _active.phase(name):
+        yield
+
+
+# -------------------------------------------------------------
+# Startup time
+# -------------------------------------------------------------
+class StartupProfile(NamedTuple):
+    seconds: float
+    """Best wall time over the repeats, interpreter startup included."""
+    interpreter_seconds: float
+    """Best wall time of a bare interpreter, for reference."""
+    imports: list[tuple[str, float]]
+    """Import time by top-level package, slowest first."""
+
+    @property
+    def modules(self) -> set[str]:
+        """Top-level packages imported."""
+        return {package for package, _ in self.imports}
+
+
+def _startup_code(module: str, args: Sequence[str] | None) -> list[str]:
+    if args is None:
+        return ["-c", f"import {module}"]
+    # The entry point sees `args` as its command line
+    return ["-c", f"from {module} import main; main()", *args]
+
+
+def _best_wall_time(command: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_startup(
+    module: str = "llm_lib_lag.cli",
+    args: Sequence[str] | None = ("--help",),
+    repeat: int = 5,
+) -> StartupProfile:
+    """
+    Times the startup of an entry point, each repeat in a fresh interpreter.
+
+    :param module: The module to start.
+    :param args: Command line passed to the module's `main()`; None only
+        imports the module.
+    :param repeat: Timed starts; the best one is kept.
+    :raise subprocess.CalledProcessError: If the entry point fails.
+    """
+    command = [sys.executable, *_startup_code(module, args)]
+    seconds = _best_wall_time(command, repeat)
+    interpreter_seconds = _best_wall_time([sys.executable, "-c", "pass"], repeat)
+
+    # One more start reporting the time of every import (in microseconds)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *command[1:]],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    by_package: Counter[str] = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            by_package[name.strip().split(".")[0]] += int(self_us)
+    imports = [(package, us / 1e6) for package, us in by_package.most_common()]
+    return StartupProfile(seconds, interpreter_seconds, imports)
@@ -0,0 +1,191 @@
+import bisect
+import logging
+from datetime import date
+from functools import lru_cache
+from typing import Mapping, Sequence
+
+from packaging.version import Version
+
+from .fetchers import fetch_release_history
+from .models import (
+    EvaluationRun,
+    Language,
+    LibraryIdentifier,
+    LLMConfig,
+    TechVersionGroundTruth,
+)
+from .versions import parse_version
+
+logger = logging.getLogger(__name__)
+
+
+class ReleaseHistory:
+    """
+    Release timeline of one technology, answering "latest stable version as
+    of a date" with a binary search.
+
+    Releases are sorted by date once, and for every prefix of that order the
+    highest version seen so far is precomputed: a maintenance release of an
+    older branch (e.g. Ruby 3.2.7 after 3.4.1) never becomes "the latest".
+    """
+
+    def __init__(self, releases: Mapping[str, date]) -> None:
+        """
+        :param releases: version string -> release date. Pre-releases and
+            invalid version strings are kept for date lookups but are never
+            returned as the latest stable version.
+        """
+        self._by_version = dict(releases)
+        self._by_canonical = {
+            parse_version(version).canonical: version for version in releases
+        }
+
+        stable: list[tuple[date, Version, str]] = []
+        for version_str, release_date in releases.items():
+            version = parse_version(version_str).version
+            if version is not None and not version.is_prerelease:
+                stable.append((release_date, version, version_str))
+        stable.sort()
+
+        self._dates: list[date] = []
+        self._latest: list[str] = []
+        best: tuple[Version, str] | None = None
+        for release_date, version, version_str in stable:
+            if best is None or version > best[0]:
+                best = (version, version_str)
+            self._dates.append(release_date)
+            self._latest.append(best[1])
+
+    def __len__(self) -> int:
+        return len(self._by_version)
+
+    def latest_as_of(self, when: date) -> tuple[str, date] | None:
+        """
+        :param when: The reference date (inclusive).
+        :return: (version, release_date) of the highest stable version released
+            on or before `when`, or None if nothing was released yet.
+        """
+        i = bisect.bisect_right(self._dates, when)
+        if i == 0:
+            return None
+        version = self._latest[i - 1]
+        return version, self._by_version[version]
+
+    def release_date(self, version: str) -> date | None:
+        """
+        :param version: A version string, in any equivalent spelling.
+        :return: Its release date, or None if it is not in the history.
+        """
+        release_date = self._by_version.get(version)
+        if release_date is not None:
+            return release_date
+        known = self._by_canonical.get(parse_version(version).canonical)
+        return self._by_version[known] if known is not None else None
+
+
+@lru_cache(maxsize=256)
+def get_release_history(tech: LibraryIdentifier | Language) -> ReleaseHistory:
+    """
+    Fetches the release timeline of a technology once per process.
+
+    :param tech: The library or language.
+    :return: Its ReleaseHistory.
+    """
+    return ReleaseHistory(fetch_release_history(tech))
+
+
+def ground_truth_as_of(
+    tech: LibraryIdentifier | Language,
+    when: date,
+    history: ReleaseHistory | None = None,
+) -> TechVersionGroundTruth:
+    """
+    Builds the ground truth a model should have answered on a given date.
+
+    :param tech: The library or language.
+    :param when: The reference date, e.g. a model's training cutoff.
+    :param history: Release timeline to use; fetched (and cached) if None.
+    :raises ValueError: If nothing was released on or before `when`.
+    """
+    if history is None:
+        history = get_release_history(tech)
+    latest = history.latest_as_of(when)
+    if latest is None:
+        raise ValueError(f"No stable release of {tech.name} on or before {when}")
+    version, release_date = latest
+    return TechVersionGroundTruth(tech=tech, version=version, release_date=release_date)
+
+
+def rescore_run(
+    run: EvaluationRun, when: date, history: ReleaseHistory | None = None
+) -> EvaluationRun:
+    """
+    Scores a stored answer against the latest version as of `when`, without
+    calling the LLM again.
+
+    :param run: A stored run.
+    :param when: The reference date.
+    :param history: Release timeline of the run's tech; fetched if None.
+    :return: A copy of the run with the as-of ground truth, lag and
+        parsed_version_exists recomputed from the release history.
+    """
+    tech = run.ground_truth.tech
+    if history is None:
+        history = get_release_history(tech)
+    ground_truth = ground_truth_as_of(tech, when, history)
+
+    lag_days = None
+    parsed_version_exists = None
+    if run.parsed_version:
+        parsed_date = history.release_date(run.parsed_version)
+        parsed_version_exists = parsed_date is not None
+        if parsed_date is not None and ground_truth.release_date is not None:
+            lag_days = (ground_truth.release_date - parsed_date).days
+
+    return run.model_copy(
+        update={
+            "ground_truth": ground_truth,
+            "lag_days": lag_days,
+            "parsed_version_exists": parsed_version_exists,
+        }
+    )
+
+
+def rescore_runs(
+    runs: Sequence[EvaluationRun], as_of: date | Mapping[LLMConfig, date]
+) -> list[EvaluationRun]:
+    """
+    Rescores runs against a reference date, or against one date per LLM
+    (e.g. each model's training cutoff).
+
+    Runs of an LLM missing from the mapping, or of a tech whose history
+    cannot be fetched, are dropped with a warning.
+
+    :param runs: Stored runs.
+    :param as_of: A single reference date, or a date per LLMConfig.
+    :return: The rescored runs.
+    """
+    rescored: list[EvaluationRun] = []
+    # Fetched once per tech; a failed fetch is remembered too (None), so that
+    # it is not retried for every run of the tech
+    histories: dict[LibraryIdentifier | Language, ReleaseHistory | None] = {}
+    for run in runs:
+        when = as_of if isinstance(as_of, date) else as_of.get(run.llm_config)
+        if when is None:
+            logger.warning(f"No reference date for {run.llm_config.model}, skipping")
+            continue
+        tech = run.ground_truth.tech
+        if tech not in histories:
+            try:
+                histories[tech] = get_release_history(tech)
+            except Exception as e:
+                logger.warning(f"Cannot fetch the release history of {tech.name}: {e}")
+                histories[tech] = None
+        history = histories[tech]
+        if history is None:
+            continue
+        try:
+            rescored.append(rescore_run(run, when, history))
+        except ValueError as e:
+            logger.warning(f"Cannot rescore {tech.name} as of {when}: {e}")
+    return rescored
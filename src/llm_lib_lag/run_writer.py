@@ -0,0 +1,292 @@
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Literal, TextIO, get_args
+
+from pydantic import ValidationError
+
+from .models import EvaluationRun
+from .monitoring import QUEUE_DEPTH
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+FsyncPolicy = Literal["never", "batch", "interval"]
+
+# Sentinel pushed on the queue to stop the writer thread.
+_STOP = object()
+
+
+def repair_torn_tail(filepath: str | Path) -> int:
+    """
+    Makes sure a JSON Lines file ends on a complete record.
+
+    A process killed mid-write can leave a partial last line behind. That
+    trailing fragment is truncated so that the next append starts on a fresh
+    line instead of gluing a new record onto the torn one. A last record that
+    is complete but lacks its newline (e.g. a file edited by hand) is kept,
+    and the newline added.
+
+    :param filepath: Path to the .jsonl file. A missing file is left alone.
+    :return: Number of bytes removed from the end of the file.
+    """
+    path = Path(filepath)
+    if not path.exists():
+        return 0
+
+    with open(path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+
+        # Walk backwards in blocks until we find the end of the last full record
+        block_size = 64 * 1024
+        end = size
+        keep = 0
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            end = start
+
+        f.seek(keep)
+        try:
+            EvaluationRun.model_validate_json(f.read())
+        except ValidationError:
+            f.truncate(keep)
+        else:
+            f.write(b"\n")
+            logger.info(f"Added the missing newline at the end of {path}")
+            return 0
+
+    removed = size - keep
+    logger.warning(f"Truncated {removed} bytes of torn record at the end of {path}")
+    return removed
+
+
+class RunWriter:
+    """
+    Appends EvaluationRuns to a JSON Lines file from a single background thread.
+
+    Callers only serialize the run and push it on a bounded queue; the writer
+    thread drains the queue in batches, so the number of file syscalls depends
+    on the number of batches rather than on the number of runs. A full queue
+    blocks producers, which keeps memory bounded if the disk falls behind.
+
+    Usage:
+        with RunWriter("runs.jsonl") as writer:
+            writer.write(run)
+    """
+
+    def __init__(
+        self,
+        filepath: str | Path,
+        *,
+        max_queue_size: int = 10_000,
+        batch_size: int = 256,
+        poll_interval: float = 0.5,
+        fsync: FsyncPolicy = "batch",
+        fsync_interval: float = 5.0,
+    ) -> None:
+        """
+        :param filepath: Path of the .jsonl file to append to.
+        :param max_queue_size: Maximum number of pending runs before `write` blocks.
+        :param batch_size: Maximum number of runs written with a single syscall.
+        :param poll_interval: How often (seconds) an idle writer thread wakes up
+            to fsync data left unsynced by the "interval" policy.
+        :param fsync: "never" leaves durability to the OS, "batch" fsyncs after
+            every batch, "interval" fsyncs at most every `fsync_interval` seconds.
+        :param fsync_interval: Period used by the "interval" fsync policy.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if fsync not in get_args(FsyncPolicy):
+            raise ValueError(f"Unknown fsync policy {fsync!r}")
+
+        self.filepath = Path(filepath)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+        self._last_fsync = 0.0
+        self._unsynced = False
+
+    # ------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------
+    def open(self) -> None:
+        """Repairs a torn last record, if any, and starts the writer thread."""
+        if self._thread is not None:
+            raise RuntimeError("RunWriter is already open")
+
+        repair_torn_tail(self.filepath)
+        file = open(self.filepath, "a", encoding="utf-8")
+        self._thread = threading.Thread(
+            target=self._run, args=(file,), name="run-writer", daemon=True
+        )
+        self._thread.start()
+        QUEUE_DEPTH.set_function(self._queue.qsize, file=str(self.filepath))
+
+    def close(self) -> None:
+        """Writes every pending run, then stops the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        QUEUE_DEPTH.remove(file=str(self.filepath))
+        self._raise_if_failed()
+
+    def __enter__(self) -> "RunWriter":
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    # ------------------------------------------------------
+    # Producer API
+    # ------------------------------------------------------
+    def write(self, run: EvaluationRun) -> None:
+        """
+        Queues a run to be appended. Blocks while the queue is full.
+
+        :param run: The run to persist.
+        """
+        if self._thread is None:
+            raise RuntimeError("RunWriter is not open")
+        self._raise_if_failed()
+        # The span shows time spent blocked on a full queue (disk falling behind)
+        with tracer.start_as_current_span("run_writer.write") as span:
+            self._queue.put(run.model_dump_json() + "\n")
+            span.set_attribute("queue.pending", self._queue.qsize())
+
+    def flush(self) -> None:
+        """
+        Blocks until every run queued so far has been written to the file.
+
+        :raise RuntimeError: If the writer thread failed, even after runs were
+            queued that it will never take.
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                self._raise_if_failed()
+                self._queue.all_tasks_done.wait(self.poll_interval)
+        self._raise_if_failed()
+
+    @property
+    def pending(self) -> int:
+        """Number of runs waiting to be written."""
+        return self._queue.qsize()
+
+    # ------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"RunWriter failed writing to {self.filepath}"
+            ) from self._error
+
+    def _run(self, file: TextIO) -> None:
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    if self._unsynced:
+                        self._fsync(file)
+                    continue
+
+                # Every item taken from the queue gets exactly one task_done,
+                # even if the write fails, so `flush` can never hang.
+                taken = 1
+                batch: list[str] = []
+                try:
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)  # type: ignore[arg-type]
+                        while len(batch) < self.batch_size:
+                            try:
+                                item = self._queue.get_nowait()
+                            except queue.Empty:
+                                break
+                            taken += 1
+                            if item is _STOP:
+                                stopping = True
+                                break
+                            batch.append(item)  # type: ignore[arg-type]
+
+                    if batch:
+                        self._write_batch(file, batch)
+                    if stopping and self._unsynced:
+                        self._fsync(file)
+                finally:
+                    for _ in range(taken):
+                        self._queue.task_done()
+        except Exception as e:
+            logger.error(f"RunWriter stopped after an error: {e}", exc_info=True)
+            self._error = e
+            self._drain()
+        finally:
+            file.close()
+
+    def _write_batch(self, file: TextIO, batch: list[str]) -> None:
+        with tracer.start_as_current_span(
+            "run_writer.write_batch", {"batch.size": len(batch), "fsync": self.fsync}
+        ):
+            # A batch is a single write, so concurrent producers never interleave
+            file.write("".join(batch))
+            file.flush()
+            self._unsynced = True
+
+            match self.fsync:
+                case "never":
+                    self._unsynced = False
+                case "batch":
+                    self._fsync(file)
+                case "interval":
+                    if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                        self._fsync(file)
+                case _:
+                    raise ValueError(f"Unknown fsync policy {self.fsync!r}")
+
+        logger.debug(f"Wrote {len(batch)} runs to {self.filepath}")
+
+    def _fsync(self, file: TextIO) -> None:
+        os.fsync(file.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+
+    def _drain(self) -> None:
+        """Releases producers blocked on `flush` after the writer failed."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._queue.task_done()
@@ -1,22 +1,49 @@
 import logging
-import re
+import threading
 import time
+from datetime import date
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from langchain_community.chat_models import ChatPerplexity
-from langchain.chat_models import init_chat_model
-from langchain.prompts import ChatPromptTemplate
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 
+from .deadlines import Deadline, DeadlineExceededError, call_with_deadline
 from .fetchers import fetch_version_date
+from .ground_truths import load_ground_truths
+from .hedging import Hedger
 from .models import (
     EvaluationRun,
     LLMConfig,
+    RunStatus,
+    SimulationConfig,
     TechVersionGroundTruth,
 )
+from .monitoring import record_run, record_timeout
+from .simulated import SimulatedChatModel
+from .tracing import get_tracer
+from .versions import extract_versions, version_spellings
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
 
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 120.0
+"""Deadline of one run when its LLMConfig sets no timeout_seconds."""
+
+
+def run_timeout(llm_config: LLMConfig) -> float:
+    return llm_config.timeout_seconds or DEFAULT_TIMEOUT_SECONDS
+
+
+_created = threading.local()
+
+
+def llms_created() -> int:
+    """Number of chat models `_initialize_llm` created in the calling thread."""
+    return getattr(_created, "llms", 0)
 
 
 @lru_cache(maxsize=1000)
@@ -25,27 +52,87 @@ def _initialize_llm(llm_config: LLMConfig) -> BaseChatModel:
     Returns an instance of a LangChain-compatible chat model
     given an LLMConfig.
 
+    The client's own request timeout is the run deadline, so a request
+    abandoned at the deadline is also aborted at the HTTP level.
+
+    Provider integrations are imported here, on the first use of their
+    provider: importing LangChain and the provider SDKs takes seconds.
+
     :param llm_config: The config specifying LLM provider and model name.
     :return: A BaseChatModel instance for inference.
     """
+    _created.llms = llms_created() + 1
+    timeout = run_timeout(llm_config)
     match llm_config.provider:
         case "perplexity":
+            from langchain_community.chat_models import ChatPerplexity
+
             return ChatPerplexity(
                 model=llm_config.model,
                 temperature=0,
-                timeout=None,
+                timeout=timeout,
+            )
+        case "simulated":
+            return SimulatedChatModel(
+                simulation=llm_config.simulation or SimulationConfig(),
+                ground_truths={gt.tech.name: gt.version for gt in load_ground_truths()},
             )
         case _:
+            from langchain.chat_models import init_chat_model
+
             return init_chat_model(
-                model=llm_config.model, model_provider=llm_config.provider
+                model=llm_config.model,
+                model_provider=llm_config.provider,
+                timeout=timeout,
             )
 
 
+def _fetch_version_date_any_spelling(
+    ground_truth: TechVersionGroundTruth, version: str
+) -> date | None:
+    """
+    Looks up the release date of `version`, trying its equivalent spellings
+    ("1.85" -> "1.85.0", "v3.4.1" -> "3.4.1") until the registry knows one.
+
+    :return: The release date, or None if no spelling exists in the registry.
+    """
+    for candidate in version_spellings(version):
+        try:
+            return fetch_version_date(ground_truth.tech, candidate)
+        except Exception as e:
+            logger.warning(f"Error fetching version date for {candidate}: {e}")
+    return None
+
+
+def _timed_out_run(
+    llm_config: LLMConfig,
+    ground_truth: TechVersionGroundTruth,
+    error: DeadlineExceededError,
+    elapsed: float,
+    output: str = "",
+    parsed_version: str | None = None,
+) -> EvaluationRun:
+    logger.warning(
+        f"{llm_config.provider}/{llm_config.model}: {ground_truth.tech.name} "
+        f"timed out, {error}"
+    )
+    record_timeout(llm_config.provider, llm_config.model, error.stage)
+    return EvaluationRun(
+        ground_truth=ground_truth,
+        llm_config=llm_config,
+        status=RunStatus.TIMEOUT,
+        output=output,
+        parsed_version=parsed_version,
+        execution_time_seconds=elapsed,
+    )
+
+
 def run_single_evaluation(
     llm_config: LLMConfig,
     ground_truth: TechVersionGroundTruth,
-    prompt: ChatPromptTemplate,
+    prompt: "ChatPromptTemplate",
     version_regex: str,
+    hedger: Hedger | None = None,
 ) -> EvaluationRun:
     """
     Executes a single evaluation run:
@@ -55,53 +142,125 @@ def run_single_evaluation(
     3. Parses the LLM output to extract a version string, if any.
     4. Returns an EvaluationRun object.
 
+    The LLM call and the registry lookup share one deadline, the LLMConfig's
+    timeout_seconds (DEFAULT_TIMEOUT_SECONDS if unset). A run reaching it is
+    returned with status "timeout" instead of raising.
+
     :param llm_config: Which LLM provider and model to use.
     :param ground_truth: The ground truth version info (tech + version).
     :param prompt: A ChatPromptTemplate for "What is the latest stable version of X?"
     :param version_regex: Regex to extract a semantic version from the LLM output.
+    :param hedger: If set, a slow LLM call is duplicated and the first answer
+        wins; the run records the winning output and its latency from the
+        first call's start.
     :return: An EvaluationRun capturing the LLM's response and performance.
     """
     print(f"Ground truth: {ground_truth.tech} - {ground_truth.version}")
 
-    llm = _initialize_llm(llm_config)
-    chain = prompt | llm | StrOutputParser()  # type: ignore
+    deadline = Deadline(run_timeout(llm_config))
+    with tracer.start_as_current_span(
+        "evaluation.run",
+        {
+            "llm.provider": llm_config.provider,
+            "llm.model": llm_config.model,
+            "tech": ground_truth.tech.name,
+            "deadline_seconds": deadline.seconds,
+        },
+    ) as run_span:
+        with tracer.start_as_current_span("llm.init") as span:
+            # A miss runs _initialize_llm in this thread; other threads' calls
+            # do not count, unlike with the lru_cache statistics
+            created = llms_created()
+            llm = _initialize_llm(llm_config)
+            span.set_attribute("cache.hit", llms_created() == created)
+        chain = prompt | llm | StrOutputParser()  # type: ignore
+
+        query_input = ground_truth.tech.name
+        start_time = time.time()
+        try:
+            with tracer.start_as_current_span("llm.invoke") as span:
 
-    start_time = time.time()
-    query_input = ground_truth.tech.name
-    result_str = chain.invoke({"software_name": query_input})  # type: ignore
-    elapsed = time.time() - start_time
+                def invoke() -> str:
+                    return chain.invoke({"software_name": query_input})  # type: ignore
 
-    matches = re.finditer(version_regex, result_str)
-    versions = list(set(match.group(1) for match in matches))
+                if hedger is None:
+                    result_str = call_with_deadline(invoke, deadline, "llm.invoke")
+                    elapsed = time.time() - start_time
+                else:
+                    hedged = hedger.call(invoke, llm_config, deadline)
+                    result_str, elapsed = hedged.value, hedged.seconds
+                    span.set_attributes(
+                        {"hedged": hedged.hedged, "hedge.winner": hedged.winner}
+                    )
+                span.set_attribute("output.chars", len(result_str))
+        except DeadlineExceededError as e:
+            run_span.set_status("ERROR", str(e))
+            return _timed_out_run(
+                llm_config, ground_truth, e, elapsed=time.time() - start_time
+            )
 
-    if len(versions) > 1:
-        raise ValueError(
-            f"Multiple versions found in LLM response for {query_input}: {versions}"
-        )
+        with tracer.start_as_current_span("parse") as span:
+            # Equivalent spellings of one version ("1.85" / "1.85.0") count once
+            versions = extract_versions(result_str, version_regex)
+            span.set_attribute("versions.found", len(versions))
 
-    parsed_version = versions[0] if versions else None
-    assert parsed_version is None or isinstance(parsed_version, str)
+        if len(versions) > 1:
+            raise ValueError(
+                f"Multiple versions found in LLM response for {query_input}: {versions}"
+            )
 
-    if parsed_version is None:
-        logger.warning(
-            f"{llm_config.provider}/{llm_config.model}: Error parsing result : {result_str}"
-        )
-    else:
-        logger.info(f"{llm_config.provider}/{llm_config.model}: {parsed_version}")
+        parsed_version = versions[0] if versions else None
+        assert parsed_version is None or isinstance(parsed_version, str)
 
-    if parsed_version and ground_truth.release_date:
-        try:
-            parsed_version_date = fetch_version_date(ground_truth.tech, parsed_version)
-            lag_days = (ground_truth.release_date - parsed_version_date).days
-            parsed_version_exists = True
-        except Exception as e:
-            logger.warning(f"Error fetching version date: {e}")
+        if parsed_version is None:
+            logger.warning(
+                f"{llm_config.provider}/{llm_config.model}: Error parsing result : {result_str}"
+            )
+        else:
+            logger.info(f"{llm_config.provider}/{llm_config.model}: {parsed_version}")
+
+        if parsed_version and ground_truth.release_date:
+            version = parsed_version
+            try:
+                with tracer.start_as_current_span("registry.lookup") as span:
+                    parsed_version_date = call_with_deadline(
+                        lambda: _fetch_version_date_any_spelling(ground_truth, version),
+                        deadline,
+                        "registry.lookup",
+                    )
+                    span.set_attribute(
+                        "version.exists", parsed_version_date is not None
+                    )
+            except DeadlineExceededError as e:
+                run_span.set_status("ERROR", str(e))
+                return _timed_out_run(
+                    llm_config,
+                    ground_truth,
+                    e,
+                    elapsed=time.time() - start_time,
+                    output=result_str,
+                    parsed_version=parsed_version,
+                )
+            if parsed_version_date is not None:
+                lag_days = (ground_truth.release_date - parsed_version_date).days
+                parsed_version_exists = True
+            else:
+                lag_days = None
+                parsed_version_exists = False
+            logger.info(f"Lag days: {lag_days}")
+        else:
             lag_days = None
-            parsed_version_exists = False
-        logger.info(f"Lag days: {lag_days}")
-    else:
-        lag_days = None
-        parsed_version_exists = None
+            parsed_version_exists = None
+        record_run(
+            llm_config.provider,
+            llm_config.model,
+            llm_seconds=elapsed,
+            parsed=parsed_version is not None,
+            version_exists=parsed_version_exists,
+        )
+        run_span.set_attributes(
+            {"parsed_version": parsed_version, "lag_days": lag_days}
+        )
 
     run = EvaluationRun(
         ground_truth=ground_truth,
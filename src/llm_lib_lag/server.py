@@ -0,0 +1,394 @@
+"""
+Local HTTP service answering JSON queries on the runs of a sweep.
+
+The run files are read once into a RunIndex, which keeps the metrics
+aggregated (MetricsAggregator) overall and per day of run. New runs are
+picked up by tailing the files from the last offset read: queries never
+re-read the whole store. A date range query merges the daily aggregates of
+the range, applying the latest-run-per-key rule across days.
+
+Encoded responses are cached until new runs land, and carry an ETag so that
+polling dashboards get an empty 304 while nothing changed.
+
+Endpoints (`since` and `until` are optional inclusive dates, YYYY-MM-DD):
+    /summary                        run counts and overall metrics
+    /lag/llm?since=&until=          metrics by LLM
+    /lag/tech?since=&until=         metrics by technology
+    /lag/top?n=10&statistic=median  the LLMs with the largest lag
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from .aggregator import MetricsAggregator
+from .metrics import GroupMetrics, MetricsReport
+from .models import EvaluationRun
+from .work_queue import sweep_run_files
+
+logger = logging.getLogger(__name__)
+
+LAG_STATISTICS = ("mean", "median", "p90", "p95", "max")
+
+
+class QueryError(ValueError):
+    """A query parameter is invalid; answered with a 400."""
+
+
+# -------------------------------------------------------------
+# Index
+# -------------------------------------------------------------
+class _Tail:
+    """Reads the complete lines appended to a file since the last read."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.offset = 0
+
+    def read(self) -> list[bytes] | None:
+        """
+        :return: The new complete lines, or None if the file was truncated
+            or replaced by a shorter one, and must be read again.
+        """
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return []
+        if size < self.offset:
+            return None
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        # A line still being written is left for the next read
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return data[:end].splitlines()
+
+
+class RunIndex:
+    """
+    In-memory aggregates of a sweep's runs, refreshed incrementally.
+
+    Usage:
+        index = RunIndex("runs.jsonl")
+        index.refresh()
+        report = index.report(since=date(2025, 1, 1))
+    """
+
+    def __init__(self, runs_file: str | Path, relative_accuracy: float = 0.01) -> None:
+        """
+        :param runs_file: Run file of the sweep; its worker files are read too.
+        :param relative_accuracy: Relative error bound of the lag quantiles.
+        """
+        self.runs_file = Path(runs_file)
+        self.relative_accuracy = relative_accuracy
+        self.generation = 0
+        """Incremented whenever new runs are ingested."""
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._tails: dict[Path, _Tail] = {}
+        self._overall = MetricsAggregator(self.relative_accuracy)
+        self._days: dict[date, MetricsAggregator] = {}
+
+    def __len__(self) -> int:
+        """Number of (tech, provider, model) keys with a run."""
+        with self._lock:
+            return len(self._overall)
+
+    @property
+    def input_runs(self) -> int:
+        with self._lock:
+            return self._overall.input_runs
+
+    def add(self, run: EvaluationRun) -> None:
+        with self._lock:
+            self._overall.add(run)
+            day = run.timestamp.date()
+            if day not in self._days:
+                self._days[day] = MetricsAggregator(self.relative_accuracy)
+            self._days[day].add(run)
+
+    def refresh(self) -> int:
+        """
+        Ingests the runs appended to the run files since the last refresh.
+        A file that shrank was rewritten: the index is rebuilt.
+
+        :return: Number of new runs.
+        """
+        with self._lock:
+            lines: list[bytes] = []
+            for path in sweep_run_files(self.runs_file):
+                tail = self._tails.setdefault(path, _Tail(path))
+                new_lines = tail.read()
+                if new_lines is None:
+                    logger.info(f"{path} was rewritten, rebuilding the index")
+                    self._reset()
+                    self.generation += 1
+                    return self.refresh()
+                lines.extend(new_lines)
+
+            added = 0
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    run = EvaluationRun.model_validate_json(line)
+                except ValueError as e:
+                    logger.warning(f"Skipping invalid run line: {e}")
+                    continue
+                self.add(run)
+                added += 1
+            if added:
+                self.generation += 1
+            return added
+
+    def report(
+        self, since: date | None = None, until: date | None = None
+    ) -> MetricsReport | None:
+        """
+        :param since: First day of runs included.
+        :param until: Last day of runs included.
+        :return: Metrics of the latest run per key among the runs of the
+            range, or None if there is none.
+        """
+        with self._lock:
+            if since is None and until is None:
+                aggregator = self._overall
+            else:
+                aggregator = MetricsAggregator(self.relative_accuracy)
+                for day, daily in self._days.items():
+                    if (since is None or day >= since) and (
+                        until is None or day <= until
+                    ):
+                        aggregator.merge(daily)
+            return aggregator.snapshot() if len(aggregator) else None
+
+    def top_lagging(
+        self,
+        n: int = 10,
+        statistic: str = "median",
+        since: date | None = None,
+        until: date | None = None,
+    ) -> list[tuple[str, GroupMetrics]]:
+        """
+        :return: The `n` LLMs with the largest lag `statistic`, largest
+            first. LLMs without any lag measured are left out.
+        """
+        if statistic not in LAG_STATISTICS:
+            raise QueryError(f"statistic must be one of {', '.join(LAG_STATISTICS)}")
+        report = self.report(since, until)
+        if report is None:
+            return []
+        ranked = [(llm, m) for llm, m in report.by_llm.items() if m.lag is not None]
+        ranked.sort(key=lambda item: getattr(item[1].lag, statistic), reverse=True)
+        return ranked[:n]
+
+
+# -------------------------------------------------------------
+# HTTP service
+# -------------------------------------------------------------
+def _group_json(metrics: GroupMetrics) -> dict[str, Any]:
+    return {
+        **metrics.model_dump(mode="json"),
+        "exact_match_rate": metrics.exact_match_rate,
+        "major_match_rate": metrics.major_match_rate,
+        "minor_match_rate": metrics.minor_match_rate,
+    }
+
+
+def _date_param(params: dict[str, list[str]], name: str) -> date | None:
+    if name not in params:
+        return None
+    try:
+        return date.fromisoformat(params[name][0])
+    except ValueError:
+        raise QueryError(f"{name} must be a date (YYYY-MM-DD)") from None
+
+
+def _int_param(params: dict[str, list[str]], name: str, default: int) -> int:
+    if name not in params:
+        return default
+    try:
+        value = int(params[name][0])
+    except ValueError:
+        raise QueryError(f"{name} must be an integer") from None
+    if value < 1:
+        raise QueryError(f"{name} must be positive")
+    return value
+
+
+def _summary(index: RunIndex, params: dict[str, list[str]]) -> dict[str, Any]:
+    report = index.report()
+    return {
+        "runs_file": str(index.runs_file),
+        "input_runs": index.input_runs,
+        "latest_runs": len(index),
+        "overall": _group_json(report.overall) if report else None,
+    }
+
+
+def _lag_by(field: str) -> Callable[[RunIndex, dict[str, list[str]]], Any]:
+    def query(index: RunIndex, params: dict[str, list[str]]) -> Any:
+        report = index.report(
+            _date_param(params, "since"), _date_param(params, "until")
+        )
+        groups: dict[str, GroupMetrics] = getattr(report, field) if report else {}
+        return {name: _group_json(m) for name, m in sorted(groups.items())}
+
+    return query
+
+
+def _top(index: RunIndex, params: dict[str, list[str]]) -> Any:
+    ranked = index.top_lagging(
+        n=_int_param(params, "n", 10),
+        statistic=params.get("statistic", ["median"])[0],
+        since=_date_param(params, "since"),
+        until=_date_param(params, "until"),
+    )
+    return [{"llm": llm, **_group_json(m)} for llm, m in ranked]
+
+
+ROUTES: dict[str, Callable[[RunIndex, dict[str, list[str]]], Any]] = {
+    "/summary": _summary,
+    "/lag/llm": _lag_by("by_llm"),
+    "/lag/tech": _lag_by("by_tech"),
+    "/lag/top": _top,
+}
+
+
+class _Response:
+    def __init__(self, status: int, body: bytes) -> None:
+        self.status = status
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+class RunQueryService:
+    """
+    Answers queries from a RunIndex, refreshing it at most every
+    `refresh_interval` seconds and caching encoded responses in between.
+
+    Usage:
+        service = RunQueryService(RunIndex("runs.jsonl"))
+        status, body = service.query("/lag/top?n=5")
+    """
+
+    def __init__(
+        self,
+        index: RunIndex,
+        refresh_interval: float = 1.0,
+        max_cached: int = 1024,
+    ) -> None:
+        """
+        :param index: The runs to query.
+        :param refresh_interval: Minimum seconds between two reads of the
+            run files; they are only read when a query arrives.
+        :param max_cached: Responses kept, least recently used dropped first.
+        """
+        self.index = index
+        self.refresh_interval = refresh_interval
+        self.max_cached = max_cached
+        self.hits = 0
+        self.misses = 0
+        self._last_refresh = float("-inf")
+        self._generation = index.generation
+        self._cache: OrderedDict[str, _Response] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+        self.index.refresh()
+        if self.index.generation != self._generation:
+            self._generation = self.index.generation
+            self._cache.clear()
+
+    def response(self, target: str) -> _Response:
+        """
+        :param target: The request path and query string.
+        """
+        with self._lock:
+            self._refresh()
+            cached = self._cache.get(target)
+            if cached is not None:
+                self._cache.move_to_end(target)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            generation = self._generation
+
+        url = urlsplit(target)
+        route = ROUTES.get(url.path.rstrip("/") or "/summary")
+        if route is None:
+            return _Response(404, json.dumps({"error": "Not found"}).encode())
+        try:
+            payload = route(self.index, parse_qs(url.query))
+        except QueryError as e:
+            return _Response(400, json.dumps({"error": str(e)}).encode())
+        response = _Response(200, json.dumps(payload).encode())
+
+        with self._lock:
+            if generation != self._generation:
+                # New runs landed meanwhile: the response may predate them
+                return response
+            self._cache[target] = response
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return response
+
+    def query(self, target: str) -> tuple[int, Any]:
+        """:return: The status and decoded JSON body of a query."""
+        response = self.response(target)
+        return response.status, json.loads(response.body)
+
+
+def serve_runs(
+    service: RunQueryService, port: int, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """
+    Serves the queries on http://host:port from a daemon thread.
+
+    :param port: Port to listen on; 0 picks a free one.
+    :return: The running server; call `shutdown()` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            response = service.response(self.path)
+            if response.status == 200 and self.headers.get("If-None-Match") == (
+                response.etag
+            ):
+                self.send_response(304)
+                self.send_header("ETag", response.etag)
+                self.end_headers()
+                return
+            self.send_response(response.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response.body)))
+            if response.status == 200:
+                self.send_header("ETag", response.etag)
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="runs-http", daemon=True).start()
+    logger.info(f"Serving run queries on http://{host}:{server.server_address[1]}")
+    return server
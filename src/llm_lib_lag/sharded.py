@@ -0,0 +1,118 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+from pydantic import ValidationError
+
+from .aggregator import MetricsAggregator
+from .metrics import MetricsReport
+from .models import EvaluationRun
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class Shard(NamedTuple):
+    """A byte range [start, end) of a runs .jsonl file."""
+
+    path: str
+    start: int
+    end: int
+
+
+def plan_shards(
+    paths: Sequence[str | Path], chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> list[Shard]:
+    """
+    Splits run files into byte ranges of at most `chunk_bytes`.
+
+    Ranges do not need to be aligned on line boundaries: a record belongs to
+    the shard in which its first byte lies.
+
+    :param paths: The .jsonl files to evaluate.
+    :param chunk_bytes: Target size of a shard.
+    :return: Shards covering every byte of every file.
+    """
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be at least 1")
+
+    shards: list[Shard] = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, size, chunk_bytes):
+            shards.append(Shard(str(path), start, min(start + chunk_bytes, size)))
+    return shards
+
+
+def aggregate_shard(shard: Shard, relative_accuracy: float = 0.01) -> MetricsAggregator:
+    """
+    Map step: loads the records starting inside `shard` into a partial aggregate.
+
+    :param shard: The byte range to read.
+    :param relative_accuracy: Accuracy of the lag sketches, see MetricsAggregator.
+    :return: A MetricsAggregator over the runs of this shard only.
+    """
+    aggregator = MetricsAggregator(relative_accuracy)
+    with open(shard.path, "rb") as f:
+        if shard.start > 0:
+            # Skip the tail of a record owned by the previous shard
+            f.seek(shard.start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+
+        while f.tell() < shard.end:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                aggregator.add(EvaluationRun.model_validate_json(line))
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid run in {shard.path}: {e}")
+    return aggregator
+
+
+def evaluate_run_files(
+    paths: Sequence[str | Path],
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    relative_accuracy: float = 0.01,
+) -> MetricsReport | None:
+    """
+    Evaluates runs spread over many .jsonl files using every core.
+
+    Each worker process aggregates one shard; the partial aggregates are then
+    merged, which keeps only the latest run per (technology, provider, model)
+    across all shards. Lag quantiles are approximate, see MetricsAggregator.
+
+    :param paths: Run files, e.g. every runs*.jsonl of an archive.
+    :param workers: Number of worker processes (default: CPU count).
+        With 1 worker, shards are aggregated in the current process.
+    :param chunk_bytes: Maximum size of a shard.
+    :param relative_accuracy: Accuracy of the lag quantiles.
+    :return: The merged MetricsReport, or None if the files hold no
+        completed run (empty files, or only timed out runs).
+    """
+    shards = plan_shards(paths, chunk_bytes)
+    logger.info(f"Evaluating {len(paths)} run files as {len(shards)} shards")
+
+    result = MetricsAggregator(relative_accuracy)
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            result.merge(aggregate_shard(shard, relative_accuracy))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = pool.map(
+                aggregate_shard, shards, [relative_accuracy] * len(shards)
+            )
+            for partial in partials:
+                result.merge(partial)
+
+    if not len(result):
+        logger.warning(f"No completed run among {result.input_runs} runs read")
+        return None
+    return result.snapshot()
@@ -0,0 +1,160 @@
+"""
+Fake chat model behind the "simulated" provider.
+
+It answers the version prompt like a real model would, in
+<thinking>...</thinking><answer>X.Y.Z</answer> form, after a random delay and
+at a configurable token rate, and can fail with errors or rate limits. The
+answer is the ground truth, an older version, or an invented one, so the
+metrics of a simulated run look like those of a real model.
+"""
+
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from .distributions import sample_latency
+from .models import SimulationConfig
+from .versions import parse_version
+
+
+class SimulatedProviderError(RuntimeError):
+    """A simulated server error (HTTP 500)."""
+
+    status_code = 500
+
+
+class SimulatedRateLimitError(RuntimeError):
+    """A simulated rate limit rejection (HTTP 429)."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(f"Rate limited, retry after {retry_after:g}s")
+
+
+def _tokens(text: str) -> int:
+    # Rough English estimate, good enough to pace generation
+    return max(1, len(text) // 4)
+
+
+class SimulatedChatModel(BaseChatModel):
+    """LangChain chat model producing synthetic version answers."""
+
+    simulation: SimulationConfig = SimulationConfig()
+    ground_truths: dict[str, str] = {}
+    """Tech name -> latest version, used to produce realistic answers."""
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _in_flight: int = PrivateAttr(default=0)
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._rng = random.Random(self.simulation.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+
+    def _find_tech(self, text: str) -> str | None:
+        """The longest known tech name mentioned in the prompt."""
+        lowered = text.lower()
+        found = [
+            name
+            for name in self.ground_truths
+            if re.search(rf"(?<![\w-]){re.escape(name.lower())}(?![\w-])", lowered)
+        ]
+        return max(found, key=len) if found else None
+
+    def _answer(self, rng: random.Random, truth: str | None) -> str:
+        parsed = parse_version(truth) if truth else None
+        if parsed is None or not parsed.is_valid:
+            return f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.{rng.randint(0, 9)}"
+
+        major, minor, patch = parsed.release
+        draw = rng.random()
+        if draw < self.simulation.hallucination_rate:
+            # A version from the future: it cannot exist in the registry
+            return (
+                f"{major + rng.randint(1, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+            )
+        if draw < self.simulation.hallucination_rate + self.simulation.exact_rate:
+            return truth or ""
+
+        # A stale answer, a few releases behind (most mistakes are recent ones)
+        steps = min(int(rng.expovariate(0.5)) + 1, 40)
+        if patch >= steps:
+            return f"{major}.{minor}.{patch - steps}"
+        if minor >= steps:
+            return f"{major}.{minor - steps}.{rng.randint(0, 9)}"
+        return f"{max(major - 1, 0)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        limit = self.simulation.max_concurrency
+        with self._lock:
+            if limit is not None and self._in_flight >= limit:
+                raise SimulatedRateLimitError(self.simulation.retry_after_seconds)
+            self._in_flight += 1
+        try:
+            return self._generate_answer(messages)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _generate_answer(self, messages: list[BaseMessage]) -> ChatResult:
+        sim = self.simulation
+        # Draws happen under the lock; the waiting does not
+        with self._lock:
+            draw = self._rng.random()
+            delay = sample_latency(
+                self._rng,
+                sim.latency_ms / 1000,
+                sim.latency_distribution,
+                sim.latency_sigma,
+            )
+            rng = random.Random(self._rng.getrandbits(64))
+
+        if draw < sim.rate_limit_rate:
+            raise SimulatedRateLimitError(sim.retry_after_seconds)
+        time.sleep(delay)
+        if draw < sim.rate_limit_rate + sim.error_rate:
+            raise SimulatedProviderError("Simulated provider error")
+
+        prompt = str(messages[-1].content) if messages else ""
+        tech = self._find_tech(prompt)
+        version = self._answer(rng, self.ground_truths.get(tech) if tech else None)
+        thinking = " ".join(
+            ["Considering", "the", "release", "history", "of", tech or "this software"]
+            + ["..."] * max(sim.thinking_tokens - 5, 0)
+        )
+        content = f"<thinking>{thinking}</thinking>\n<answer>{version}</answer>"
+
+        output_tokens = _tokens(content)
+        if sim.tokens_per_second > 0:
+            time.sleep(output_tokens / sim.tokens_per_second)
+
+        input_tokens = sum(_tokens(str(m.content)) for m in messages)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,31 @@
+"""
+The registries and languages covered, as plain enums.
+
+They are kept apart from the pydantic models (which re-export them) so the
+CLI can build its options from them without importing pydantic at startup.
+"""
+
+from enum import Enum
+
+
+class PackageManager(str, Enum):
+    NPM = "npm"
+    MAVEN = "maven"
+    RUBYGEMS = "rubygems"
+    PYPI = "pypi"
+    CARGO = "cargo"
+
+
+class Language(str, Enum):
+    PYTHON = "python"
+    NODEJS = "nodejs"
+    RUBY = "ruby"
+    JAVA = "java"
+    C_SHARP = "csharp"
+    GO = "go"
+    RUST = "rust"
+    DOTNET = "dotnet"
+
+    @property
+    def name(self) -> str:
+        return self.value
@@ -0,0 +1,302 @@
+"""
+Lightweight tracing of the evaluation pipeline.
+
+The API mirrors the OpenTelemetry tracing API (`get_tracer`,
+`start_as_current_span`, `set_attribute`, `record_exception`, ...), so call
+sites read the same and could be switched to the real SDK, but it has no
+dependency. Spans are exported as JSON Lines to a local file, one finished
+span per line.
+
+Tracing is off unless `configure_tracing` is called or $LLM_LIB_LAG_TRACE_FILE
+is set; when off, every span is a shared no-op object and costs one check.
+
+Usage:
+    tracer = get_tracer(__name__)
+    with tracer.start_as_current_span("llm.invoke", {"llm.model": model}) as span:
+        ...
+        span.set_attribute("output.chars", len(output))
+"""
+
+import atexit
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, ParamSpec, TextIO, TypeVar
+
+logger = logging.getLogger(__name__)
+
+AttributeValue = str | bool | int | float | None
+Attributes = dict[str, AttributeValue]
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class Span:
+    """A timed operation, possibly nested in a parent span of the same trace."""
+
+    def __init__(
+        self,
+        name: str,
+        parent: "Span | None",
+        attributes: Attributes | None,
+        exporter: "JsonlSpanExporter",
+    ) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Attributes = dict(attributes or {})
+        self.events: list[dict[str, Any]] = []
+        self.status = "UNSET"
+        self.status_description: str | None = None
+        self.child_count = 0
+        """Number of spans started directly under this one."""
+        self.start_time_ns = time.time_ns()
+        self._start_perf_ns = time.perf_counter_ns()
+        self.end_time_ns: int | None = None
+        self._duration_ns = 0
+        self._exporter = exporter
+        if parent is not None:
+            parent.child_count += 1
+
+    def is_recording(self) -> bool:
+        return self.end_time_ns is None
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Attributes | None = None) -> None:
+        self.events.append(
+            {
+                "name": name,
+                "time_unix_nano": time.time_ns(),
+                "attributes": attributes or {},
+            }
+        )
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {
+                "exception.type": type(exception).__name__,
+                "exception.message": str(exception),
+            },
+        )
+
+    def set_status(self, status: str, description: str | None = None) -> None:
+        """:param status: "OK", "ERROR" or "UNSET", as in OpenTelemetry."""
+        self.status = status
+        self.status_description = description
+
+    @property
+    def duration_ms(self) -> float:
+        return self._duration_ns / 1e6
+
+    def end(self) -> None:
+        if self.end_time_ns is not None:
+            return
+        self._duration_ns = time.perf_counter_ns() - self._start_perf_ns
+        self.end_time_ns = self.start_time_ns + self._duration_ns
+        self._exporter.export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_time_ns,
+            "end_time_unix_nano": self.end_time_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": {"code": self.status, "description": self.status_description},
+            "attributes": self.attributes,
+            "events": self.events,
+            "thread": threading.current_thread().name,
+        }
+
+
+class _NoOpSpan:
+    """Stands in for a Span while tracing is off; every method does nothing."""
+
+    name = ""
+    child_count = 0
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        pass
+
+    def set_attributes(self, attributes: Attributes) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Attributes | None = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def set_status(self, status: str, description: str | None = None) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoOpSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | _NoOpSpan:
+    """The innermost active span of this thread/task, or the no-op span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSON Lines file, one span per line."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: TextIO = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def force_flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def start_span(
+        self, name: str, attributes: Attributes | None = None
+    ) -> Span | _NoOpSpan:
+        """
+        Starts a span under the current one without making it current; the
+        caller must `end()` it.
+        """
+        exporter = _exporter()
+        if exporter is None:
+            return NOOP_SPAN
+        return Span(name, _current_span.get(), attributes, exporter)
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: Attributes | None = None
+    ) -> Iterator[Span | _NoOpSpan]:
+        """
+        Times the enclosed block as a span, nested under the current span.
+        An exception escaping the block is recorded and sets the ERROR status.
+        """
+        exporter = _exporter()
+        if exporter is None:
+            yield NOOP_SPAN
+            return
+
+        span = Span(name, _current_span.get(), attributes, exporter)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status("ERROR", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced(
+        self, name: str | None = None
+    ) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """Decorator running every call of the function in a span."""
+
+        def decorate(func: Callable[P, R]) -> Callable[P, R]:
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.start_as_current_span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+
+def get_tracer(name: str) -> Tracer:
+    return Tracer(name)
+
+
+# -------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------
+_active_exporter: JsonlSpanExporter | None = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+def _exporter() -> JsonlSpanExporter | None:
+    if _configured:
+        return _active_exporter
+    path = os.environ.get("LLM_LIB_LAG_TRACE_FILE")
+    configure_tracing(path or None)
+    return _active_exporter
+
+
+def configure_tracing(path: str | Path | None) -> None:
+    """
+    Turns tracing on, exporting spans to `path`, or off with None.
+
+    :param path: The JSON Lines file spans are appended to.
+    """
+    global _active_exporter, _configured
+    with _config_lock:
+        if _active_exporter is not None:
+            _active_exporter.shutdown()
+        _active_exporter = JsonlSpanExporter(path) if path is not None else None
+        _configured = True
+    if path is not None:
+        logger.info(f"Tracing to {path}")
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _active_exporter is not None:
+        _active_exporter.shutdown()
+
+
+def tracing_enabled() -> bool:
+    return _exporter() is not None
+
+
+def flush_tracing() -> None:
+    """Writes buffered spans to the trace file."""
+    exporter = _exporter()
+    if exporter is not None:
+        exporter.force_flush()
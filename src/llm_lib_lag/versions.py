@@ -0,0 +1,169 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from packaging.version import InvalidVersion, Version
+
+# Extracts the version inside the <answer> tags of an LLM response
+VERSION_REGEX = r"(?s)<answer>.*?(\d+\.\d+(?:\.\d+)?(?:[-.][A-Za-z0-9]+)*).*?</answer>"
+
+_CACHE_SIZE = 16_384
+
+_PLAIN_RELEASE = re.compile(r"^\d+(?:\.\d+)+$")
+
+
+class ParsedVersion(NamedTuple):
+    """A version string parsed once, with everything comparisons need."""
+
+    raw: str
+    """The string as it was given."""
+
+    canonical: str
+    """Normalized spelling: equivalent versions share the same canonical form."""
+
+    version: Version | None
+    """The packaging Version, or None if the string is not a valid version."""
+
+    release: tuple[int, int, int]
+    """(major, minor, patch), missing components being 0. (-1, -1, -1) if invalid."""
+
+    @property
+    def is_valid(self) -> bool:
+        return self.version is not None
+
+    @property
+    def major(self) -> int:
+        return self.release[0]
+
+    @property
+    def minor(self) -> int:
+        return self.release[1]
+
+
+def _strip(raw: str) -> str:
+    """Removes whitespace and a leading 'v' ("v1.85" -> "1.85")."""
+    version_str = raw.strip()
+    if version_str[:1] in ("v", "V") and version_str[1:2].isdigit():
+        version_str = version_str[1:]
+    return version_str
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_version(raw: str) -> ParsedVersion:
+    """
+    Parses and canonicalizes a version string. Results are cached.
+
+    "v1.85", "1.85", "1.85.0" and "1.85.0.0" all share the canonical form
+    "1.85.0", and Ruby's "3.4.0-preview2" is understood as a pre-release of 3.4.0.
+
+    :param raw: A version string from a registry or an LLM answer.
+    :return: The ParsedVersion; invalid strings give is_valid == False.
+    """
+    stripped = _strip(raw)
+    try:
+        version = Version(stripped)
+    except InvalidVersion:
+        return ParsedVersion(raw, stripped, None, (-1, -1, -1))
+
+    # Pad or trim the release to three components, dropping only trailing
+    # zeros ("1.85.0.0"), like Version equality; keep the normalized suffix
+    normalized = str(version).split("!", 1)[-1]
+    suffix = normalized[len(".".join(map(str, version.release))) :]
+    components = version.release + (0,) * (3 - len(version.release))
+    while len(components) > 3 and components[-1] == 0:
+        components = components[:-1]
+    canonical = ".".join(map(str, components)) + suffix
+    if version.epoch:
+        canonical = f"{version.epoch}!{canonical}"
+    release = (components[0], components[1], components[2])
+
+    return ParsedVersion(raw, canonical, version, release)
+
+
+def version_sort_key(raw: str) -> Version:
+    """
+    Sort key ordering version strings by version precedence (cached parse).
+
+    :raises InvalidVersion: If the string is not a valid version.
+    """
+    version = parse_version(raw).version
+    if version is None:
+        raise InvalidVersion(f"Invalid version: {raw!r}")
+    return version
+
+
+def compare_versions(
+    ground_truth_version: str, parsed_version: str | None
+) -> tuple[bool, bool, bool] | None:
+    """
+    Compares a parsed LLM answer with the ground truth version.
+
+    :param ground_truth_version: The expected version, e.g. "3.13.2".
+    :param parsed_version: The version extracted from the LLM output, if any.
+    :return: (exact, major, minor) match flags, or None when either version
+        is missing or cannot be parsed.
+    """
+    if not parsed_version:
+        return None
+    expected = parse_version(ground_truth_version)
+    actual = parse_version(parsed_version)
+    if not expected.is_valid or not actual.is_valid:
+        return None
+    major = expected.major == actual.major
+    return (
+        expected.canonical == actual.canonical,
+        major,
+        major and expected.minor == actual.minor,
+    )
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def version_spellings(raw: str) -> tuple[str, ...]:
+    """
+    Equivalent spellings of a version, most likely registry spelling first.
+
+    Registries are exact-match lookups, so an LLM answering "1.85" for a
+    release published as "1.85.0" (or "v3.4.1" for "3.4.1") would otherwise
+    be reported as a non-existent version.
+
+    :param raw: A version string, typically parsed from an LLM answer.
+    :return: Distinct candidate spellings, starting with the stripped input.
+    """
+    stripped = _strip(raw)
+    candidates = [stripped]
+
+    # Only plain releases are re-spelled; pre-release suffixes are kept verbatim
+    if _PLAIN_RELEASE.match(stripped):
+        parts = stripped.split(".")
+        # "1.85" -> "1.85.0"
+        if len(parts) < 3:
+            candidates.append(".".join(parts + ["0"] * (3 - len(parts))))
+        # "1.85.0" -> "1.85"
+        while len(parts) > 2 and parts[-1] == "0":
+            parts = parts[:-1]
+            candidates.append(".".join(parts))
+
+    return tuple(dict.fromkeys(candidates))
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
+
+
+def extract_versions(text: str, pattern: str = VERSION_REGEX) -> list[str]:
+    """
+    Extracts the distinct versions found in an LLM response.
+
+    Spellings of the same version ("1.85" and "1.85.0") count once; the first
+    spelling found is kept.
+
+    :param text: The LLM output.
+    :param pattern: Regex whose first group captures a version.
+    :return: Distinct versions, in order of appearance.
+    """
+    found: dict[str, str] = {}
+    for match in _compile(pattern).finditer(text):
+        version_str = match.group(1)
+        found.setdefault(parse_version(version_str).canonical, version_str)
+    return list(found.values())
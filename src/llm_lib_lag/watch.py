@@ -0,0 +1,193 @@
+"""
+Watch mode: polls the registries for new releases of the tracked techs and
+re-evaluates only the techs whose latest version changed.
+
+A poll asks every registry for the latest version of every ground truth,
+through a ResponseCache: unchanged registry documents cost an empty 304, or
+no request at all within the TTL. When a version changed, the ground truths
+file is updated and, for the changed techs only:
+    - the stored answers are rescored against the new ground truth, with no
+      LLM or registry call (the lag simply grows by the time between the old
+      and the new release);
+    - the (LLM, new ground truth) pairs are enqueued for re-querying in a
+      shared work queue, if one is given. Without a queue, they are the pairs
+      the next `main.py` run sees missing.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Sequence
+
+from .fetchers.fetchers import clear_page_caches
+from .fetchers.http import ResponseCache, use_response_cache
+from .fetchers.snapshot import active_snapshot
+from .ground_truths import (
+    GroundTruthUpdate,
+    default_ground_truths_path,
+    load_ground_truths,
+    refresh_ground_truths,
+    save_ground_truths,
+)
+from .io_utils import load_runs_from_jsonl
+from .metrics import latest_runs
+from .models import EvaluationRun, LLMConfig, TechVersionGroundTruth
+from .monitoring import NEW_RELEASES
+from .work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300.0
+
+
+class WatchEvent(NamedTuple):
+    """Outcome of one poll."""
+
+    changes: list[GroundTruthUpdate]
+    failures: list[GroundTruthUpdate]
+    rescored: list[EvaluationRun]
+    """Latest stored answers of the changed techs, scored against the new versions."""
+    scheduled: int
+    """Pairs added to the work queue for re-querying."""
+
+
+def rescore_for_new_release(
+    run: EvaluationRun, new: TechVersionGroundTruth
+) -> EvaluationRun:
+    """
+    Scores a stored answer against a newer ground truth of the same tech.
+
+    The answered version and its existence do not change, only the reference
+    does: the lag grows by the days between the two releases, so no registry
+    lookup is needed.
+    """
+    old = run.ground_truth
+    lag_days = run.lag_days
+    if lag_days is not None:
+        if old.release_date is None or new.release_date is None:
+            lag_days = None
+        else:
+            lag_days += (new.release_date - old.release_date).days
+    return run.model_copy(update={"ground_truth": new, "lag_days": lag_days})
+
+
+def affected_runs(
+    changes: Sequence[GroundTruthUpdate], runs: Sequence[EvaluationRun]
+) -> list[EvaluationRun]:
+    """The latest stored runs of the changed techs, rescored."""
+    new_by_tech = {c.old.tech: c.new for c in changes if c.new is not None}
+    return [
+        rescore_for_new_release(run, new_by_tech[run.ground_truth.tech])
+        for run in latest_runs(runs)
+        if run.ground_truth.tech in new_by_tech
+    ]
+
+
+def affected_pairs(
+    changes: Sequence[GroundTruthUpdate], runs: Sequence[EvaluationRun]
+) -> list[tuple[LLMConfig, TechVersionGroundTruth]]:
+    """
+    :return: The pairs to re-query: every LLM that answered a changed tech
+        before, with its new ground truth.
+    """
+    new_by_tech = {c.old.tech: c.new for c in changes if c.new is not None}
+    pairs: dict[tuple[LLMConfig, TechVersionGroundTruth], None] = {}
+    for run in runs:
+        new = new_by_tech.get(run.ground_truth.tech)
+        if new is not None:
+            pairs[(run.llm_config, new)] = None
+    return list(pairs)
+
+
+def poll(
+    ground_truths_path: str | Path | None = None,
+    run_files: Sequence[str | Path] = (),
+    queue: WorkQueue | None = None,
+    max_workers: int = 8,
+) -> WatchEvent:
+    """
+    Checks every ground truth once, and updates the changed ones.
+
+    :param ground_truths_path: The ground truths file (default: see
+        load_ground_truths).
+    :param run_files: Stored runs to rescore and to take the LLMs from.
+    :param queue: If set, the affected pairs are enqueued there.
+    :param max_workers: Registry requests in flight.
+    """
+    path = (
+        Path(ground_truths_path)
+        if ground_truths_path is not None
+        else default_ground_truths_path()
+    )
+    ground_truths = load_ground_truths(path)
+    # Page caches live for the process; the response cache revalidates them
+    clear_page_caches()
+    updates = refresh_ground_truths(ground_truths, max_workers=max_workers)
+
+    changes = [u for u in updates if u.changed]
+    failures = [u for u in updates if u.new is None]
+    if not changes:
+        return WatchEvent([], failures, [], 0)
+
+    save_ground_truths([u.new or u.old for u in updates], path)
+    for change in changes:
+        assert change.new is not None
+        NEW_RELEASES.inc(tech=change.old.tech.name)
+        logger.info(
+            f"New release of {change.old.tech.name}: "
+            f"{change.old.version} -> {change.new.version}"
+        )
+
+    runs = [run for f in run_files for run in load_runs_from_jsonl(str(f))]
+    rescored = affected_runs(changes, runs)
+    scheduled = queue.enqueue(affected_pairs(changes, runs)) if queue else 0
+    return WatchEvent(changes, failures, rescored, scheduled)
+
+
+def watch(
+    ground_truths_path: str | Path | None = None,
+    run_files: Sequence[str | Path] = (),
+    queue: WorkQueue | None = None,
+    interval: float = DEFAULT_INTERVAL,
+    ttl_seconds: float = 0.0,
+    max_workers: int = 8,
+    on_event: Callable[[WatchEvent], None] | None = None,
+    iterations: int | None = None,
+    stop: threading.Event | None = None,
+) -> None:
+    """
+    Polls every `interval` seconds until stopped.
+
+    :param interval: Seconds between the starts of two polls.
+    :param ttl_seconds: Registry responses younger than this are reused
+        without revalidation; keep it below `interval` to see every poll's
+        changes.
+    :param on_event: Called with the outcome of every poll.
+    :param iterations: Number of polls (default: forever).
+    :param stop: Set it to end the loop.
+    :raise RuntimeError: If a registry snapshot is active: it never changes.
+    """
+    if active_snapshot() is not None:
+        raise RuntimeError("watch polls the live registries, unset the snapshot")
+    stop = stop or threading.Event()
+    cache = ResponseCache(ttl_seconds=ttl_seconds)
+    use_response_cache(cache)
+    try:
+        done = 0
+        while not stop.is_set():
+            started = time.monotonic()
+            event = poll(ground_truths_path, run_files, queue, max_workers)
+            logger.info(
+                f"Poll: {len(event.changes)} new releases, {len(event.failures)} "
+                f"failures; registry responses so far: {cache.misses} fetched, "
+                f"{cache.revalidations} revalidated, {cache.hits} reused"
+            )
+            if on_event is not None:
+                on_event(event)
+            done += 1
+            if iterations is not None and done >= iterations:
+                break
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    finally:
+        use_response_cache(None)
@@ -0,0 +1,444 @@
+"""
+Shared work queue of (LLM, ground truth) tasks, for sweeps split across
+worker processes or hosts.
+
+The queue is a SQLite database. Workers lease tasks for a limited time and
+renew the lease with heartbeats while they work. A crashed worker stops
+renewing, its leases expire, and the tasks go back to the other workers.
+Claims run in an IMMEDIATE transaction, so two workers never lease the same
+task at the same time.
+
+Delivery is at-least-once: a worker dying between writing a run and marking
+the task done, or outliving its lease, leaves a duplicate run behind. That
+is harmless, since metrics keep only the latest run per key.
+
+Workers on several hosts need the database on a shared filesystem with
+working POSIX locks (NFSv4, not every SMB mount), and clocks synchronized to
+well within the lease duration. The rollback journal is kept, since WAL mode
+does not work over network filesystems.
+
+Each worker appends to its own run file (see `worker_runs_file`), so no two
+processes write to the same file.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from .concurrency import AdaptiveExecutor, Outcome
+from .models import LLMConfig, RunStatus, TechVersionGroundTruth
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    llm_config TEXT NOT NULL,
+    ground_truth TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires_at);
+"""
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class Lease(NamedTuple):
+    task_id: int
+    llm_config: LLMConfig
+    ground_truth: TechVersionGroundTruth
+    attempts: int
+    """Leases of this task so far, including this one."""
+
+
+def default_worker_id() -> str:
+    """Unique across hosts sharing a filesystem: host name and process id."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def worker_runs_file(runs_file: str | Path, worker_id: str) -> Path:
+    """The run file of one worker, next to the sweep's run file."""
+    path = Path(runs_file)
+    return path.with_name(f"{path.stem}.worker-{worker_id}{path.suffix}")
+
+
+def sweep_run_files(runs_file: str | Path) -> list[Path]:
+    """The sweep's run file followed by the run files of its workers."""
+    path = Path(runs_file)
+    workers = sorted(path.parent.glob(f"{path.stem}.worker-*{path.suffix}"))
+    return [path, *workers]
+
+
+def _task_key(llm_config: LLMConfig, ground_truth: TechVersionGroundTruth) -> str:
+    return json.dumps(
+        [llm_config.model_dump(mode="json"), ground_truth.model_dump(mode="json")],
+        sort_keys=True,
+    )
+
+
+class WorkQueue:
+    """
+    A SQLite-backed queue of evaluation tasks with leases.
+
+    Usage:
+        queue = WorkQueue("sweep.db")
+        queue.enqueue(missing)  # every worker may do it, duplicates are merged
+        while leases := queue.claim(worker_id, 10):
+            for lease in leases:
+                ...
+                queue.complete(lease, worker_id)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        busy_timeout: float = 30.0,
+    ) -> None:
+        """
+        :param path: The database file, created if needed.
+        :param lease_seconds: How long a claimed task stays with its worker
+            without heartbeat.
+        :param max_attempts: Leases of one task before it is marked failed,
+            so a task crashing every worker does not loop forever.
+        :param busy_timeout: Seconds to wait for another worker's lock.
+        """
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode: transactions are explicit, see _transaction
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Takes the database write lock up front, so claims cannot race."""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    # -------------------------------------------------------------
+    # Producers
+    # -------------------------------------------------------------
+    def enqueue(
+        self,
+        pairs: Iterable[tuple[LLMConfig, TechVersionGroundTruth]],
+        requeue_finished: bool = False,
+    ) -> int:
+        """
+        Adds tasks. All workers of a sweep can enqueue the pairs they see
+        missing: a task already in the queue is left as is, so a task that
+        one worker just finished is not run again because another worker
+        listed it as missing before that.
+
+        :param pairs: The (LLM, ground truth) pairs to evaluate.
+        :param requeue_finished: Also make tasks already done or failed
+            pending again, with their attempts reset, e.g. to re-run a sweep
+            whose run files were lost. Only do it with no worker running.
+        :return: Number of tasks added or re-queued.
+        """
+        now = time.time()
+        rows = [
+            (
+                _task_key(llm, gt),
+                llm.model_dump_json(),
+                gt.model_dump_json(),
+                now,
+            )
+            for llm, gt in pairs
+        ]
+        if requeue_finished:
+            statement = (
+                "INSERT INTO tasks (key, llm_config, ground_truth, updated_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "status = ?, worker = NULL, lease_expires_at = NULL, attempts = 0, "
+                "error = NULL, updated_at = excluded.updated_at "
+                "WHERE status IN (?, ?)"
+            )
+            params = [(*row, PENDING, DONE, FAILED) for row in rows]
+        else:
+            statement = (
+                "INSERT INTO tasks (key, llm_config, ground_truth, updated_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO NOTHING"
+            )
+            params = rows
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(statement, params)
+            added = connection.total_changes - before
+        logger.info(f"Enqueued {added} of {len(rows)} tasks in {self.path}")
+        return added
+
+    # -------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------
+    def claim(self, worker_id: str, limit: int = 1) -> list[Lease]:
+        """
+        Leases up to `limit` tasks: pending ones first, then tasks whose
+        lease expired (their worker is presumed dead).
+
+        :return: The leases; empty if no task is available right now.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, llm_config, ground_truth, attempts FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY status = ? DESC, id LIMIT ?",
+                (PENDING, LEASED, now, PENDING, limit),
+            ).fetchall()
+            expired = [row[0] for row in rows if row[3] >= self.max_attempts]
+            leases = [
+                Lease(
+                    task_id=task_id,
+                    llm_config=LLMConfig.model_validate_json(llm_config),
+                    ground_truth=TechVersionGroundTruth.model_validate_json(
+                        ground_truth
+                    ),
+                    attempts=attempts + 1,
+                )
+                for task_id, llm_config, ground_truth, attempts in rows
+                if attempts < self.max_attempts
+            ]
+            connection.executemany(
+                "UPDATE tasks SET status = ?, worker = NULL, "
+                "error = 'lease expired too many times', updated_at = ? WHERE id = ?",
+                [(FAILED, now, task_id) for task_id in expired],
+            )
+            connection.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [
+                    (LEASED, worker_id, now + self.lease_seconds, now, lease.task_id)
+                    for lease in leases
+                ],
+            )
+        for task_id in expired:
+            logger.error(f"Task {task_id} failed: its lease expired too many times")
+        return leases
+
+    def heartbeat(self, worker_id: str, task_ids: Iterable[int]) -> set[int]:
+        """
+        Extends the leases of tasks the worker still holds.
+
+        :return: The ids of the tasks the worker no longer holds (its lease
+            expired and another worker took them).
+        """
+        ids = list(task_ids)
+        now = time.time()
+        with self._transaction() as connection:
+            held = {
+                task_id
+                for task_id in ids
+                if connection.execute(
+                    "UPDATE tasks SET lease_expires_at = ?, updated_at = ? "
+                    "WHERE id = ? AND worker = ? AND status = ?",
+                    (now + self.lease_seconds, now, task_id, worker_id, LEASED),
+                ).rowcount
+            }
+        return set(ids) - held
+
+    def complete(self, lease: Lease, worker_id: str) -> bool:
+        """
+        Marks a task done.
+
+        :return: False if the worker had lost the lease; the task is then
+            left to its new holder.
+        """
+        return self._finish(lease, worker_id, DONE, None)
+
+    def fail(self, lease: Lease, worker_id: str, error: str) -> bool:
+        """
+        Gives a task back after an error, to be retried by any worker, or
+        marks it failed once it was leased `max_attempts` times.
+
+        :return: False if the worker had lost the lease.
+        """
+        status = FAILED if lease.attempts >= self.max_attempts else PENDING
+        return self._finish(lease, worker_id, status, error)
+
+    def _finish(
+        self, lease: Lease, worker_id: str, status: str, error: str | None
+    ) -> bool:
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_expires_at = NULL, "
+                "error = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (status, error, time.time(), lease.task_id, worker_id, LEASED),
+            ).rowcount
+        if not updated:
+            logger.warning(f"Task {lease.task_id}: lease lost before it finished")
+        return bool(updated)
+
+    # -------------------------------------------------------------
+    # Monitoring
+    # -------------------------------------------------------------
+    def counts(self) -> dict[str, int]:
+        """:return: Number of tasks per status."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        return {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def is_drained(self) -> bool:
+        """True once no task is pending or leased, by anyone."""
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+
+class Heartbeat:
+    """
+    Renews the leases held by a worker from a background thread.
+
+    Usage:
+        with Heartbeat(queue, worker_id) as heartbeat:
+            heartbeat.hold(leases)
+            ...
+            heartbeat.release(lease)
+    """
+
+    def __init__(
+        self, queue: WorkQueue, worker_id: str, interval: float | None = None
+    ) -> None:
+        """
+        :param interval: Seconds between renewals (default: a third of the
+            lease, so one missed beat does not lose the lease).
+        """
+        self.queue = queue
+        self.worker_id = worker_id
+        self.interval = interval if interval is not None else queue.lease_seconds / 3
+        self.lost: set[int] = set()
+        self._held: set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="work-queue-heartbeat", daemon=True
+        )
+
+    def hold(self, leases: Iterable[Lease]) -> None:
+        with self._lock:
+            self._held.update(lease.task_id for lease in leases)
+
+    def release(self, lease: Lease) -> None:
+        with self._lock:
+            self._held.discard(lease.task_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                held = set(self._held)
+            if not held:
+                continue
+            try:
+                lost = self.queue.heartbeat(self.worker_id, held)
+            except sqlite3.Error as e:
+                # Retried at the next beat; the lease outlives a few misses
+                logger.warning(f"Heartbeat failed: {e}")
+                continue
+            if lost:
+                logger.warning(f"Lost the leases of tasks {sorted(lost)}")
+                with self._lock:
+                    self._held -= lost
+                    self.lost |= lost
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def drain(
+    queue: WorkQueue,
+    executor: AdaptiveExecutor,
+    worker_id: str,
+    batch_size: int = 32,
+    poll_interval: float = 5.0,
+    flush: Callable[[], None] | None = None,
+) -> Iterator[Outcome]:
+    """
+    Works through the queue until no task is pending or leased by anyone.
+
+    Tasks are claimed in batches and evaluated by `executor`. Outcomes are
+    yielded as they come, for the caller to persist their runs; the tasks of
+    a batch are settled once the whole batch was yielded and `flush` returned,
+    so a task is never marked done before its run is on disk. Errors and
+    timed out runs give their task back for a retry. While other workers hold
+    the last leases, this worker polls, taking their tasks over if they die.
+
+    :param batch_size: Tasks leased per claim.
+    :param poll_interval: Seconds between claims when no task is available.
+    :param flush: Blocks until the runs yielded so far are persisted, e.g.
+        `RunWriter.flush`.
+    """
+    with Heartbeat(queue, worker_id) as heartbeat:
+        while True:
+            leases = queue.claim(worker_id, batch_size)
+            if not leases:
+                if queue.is_drained():
+                    return
+                time.sleep(poll_interval)
+                continue
+            heartbeat.hold(leases)
+            by_pair = {
+                (lease.llm_config, lease.ground_truth): lease for lease in leases
+            }
+            settled: list[tuple[Lease, Outcome]] = []
+            for outcome in executor.run(by_pair):
+                yield outcome
+                lease = by_pair[(outcome.llm_config, outcome.ground_truth)]
+                settled.append((lease, outcome))
+            if flush is not None:
+                flush()
+            for lease, outcome in settled:
+                heartbeat.release(lease)
+                if outcome.run is None:
+                    queue.fail(lease, worker_id, repr(outcome.error))
+                elif outcome.run.status == RunStatus.TIMEOUT:
+                    queue.fail(lease, worker_id, "timed out")
+                else:
+                    queue.complete(lease, worker_id)
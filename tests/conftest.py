@@ -0,0 +1,18 @@
+import pytest
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--record",
+        action="store_true",
+        default=False,
+        help="Query the real registries and re-record the fetcher cassettes",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "network: needs a live registry whose responses are not recorded yet; "
+        "runs (and records them) only with --record",
+    )
@@ -0,0 +1,35 @@
+"""Builders of test objects shared by the test modules."""
+
+from datetime import datetime, UTC
+
+from llm_lib_lag.models import (
+    EvaluationRun,
+    LLMConfig,
+    RunStatus,
+    TechVersionGroundTruth,
+)
+
+
+def make_run(
+    ground_truth: TechVersionGroundTruth,
+    llm_config: LLMConfig,
+    parsed_version: str | None,
+    lag_days: int | None = None,
+    timestamp: datetime = datetime(2025, 2, 1, tzinfo=UTC),
+    execution_time_seconds: float = 1.0,
+    *,
+    status: RunStatus = RunStatus.COMPLETED,
+    parsed_version_exists: bool | None = None,
+) -> EvaluationRun:
+    """An evaluation run answering `parsed_version`, for the tests of every module."""
+    return EvaluationRun(
+        ground_truth=ground_truth,
+        llm_config=llm_config,
+        timestamp=timestamp,
+        status=status,
+        execution_time_seconds=execution_time_seconds,
+        output=f"<answer>{parsed_version}</answer>" if parsed_version else "",
+        parsed_version=parsed_version,
+        parsed_version_exists=parsed_version_exists,
+        lag_days=lag_days,
+    )
@@ -0,0 +1,36 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from llm_lib_lag.fetchers.http import (
+    RegistryEndpoints,
+    registry_endpoints,
+    set_registry_endpoints,
+)
+from llm_lib_lag.fetchers.replay import ReplayMode, install_replay, uninstall_replay
+
+CASSETTES = Path(__file__).parent / "cassettes"
+
+
+@pytest.fixture(autouse=True)
+def recorded_http(request: pytest.FixtureRequest) -> Iterator[None]:
+    """
+    Answers every registry request of the fetcher tests from cassettes.
+    Tests marked `network` have no cassette yet: they are skipped, unless
+    --record is given to run them live.
+    """
+    mode = (
+        ReplayMode.RECORD if request.config.getoption("--record") else ReplayMode.REPLAY
+    )
+    if mode == ReplayMode.REPLAY and request.node.get_closest_marker("network"):
+        pytest.skip("no recorded registry response; run with --record")
+    # Cassettes are keyed by URL, so always target the public registries
+    previous = registry_endpoints()
+    set_registry_endpoints(RegistryEndpoints())
+    install_replay(CASSETTES, mode)
+    try:
+        yield
+    finally:
+        uninstall_replay()
+        set_registry_endpoints(previous)
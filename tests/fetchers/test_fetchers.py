@@ -1,5 +1,7 @@
 from datetime import date
 
+import pytest
+
 from llm_lib_lag.fetchers.fetchers import (
     fetch_npm_release_date,
     fetch_npm_version_info,
@@ -12,6 +14,7 @@ from llm_lib_lag.fetchers.fetchers import (
 from llm_lib_lag.models import Language, LibraryIdentifier, PackageManager
 
 
+@pytest.mark.network
 def test_npm_latest_react() -> None:
     """Test fetching latest React version from npm"""
     version, release_date = fetch_npm_version_info("react")
@@ -28,18 +31,21 @@ def test_pypi_latest_fastapi() -> None:
     assert isinstance(release_date, date)
 
 
+@pytest.mark.network
 def test_npm_specific_react_version() -> None:
     """Test fetching specific React version from npm"""
     release_date = fetch_npm_release_date("react", "18.3.1")
     assert release_date == date(2024, 4, 26)
 
 
+@pytest.mark.network
 def test_pypi_specific_fastapi_version() -> None:
     """Test fetching specific FastAPI version from PyPI"""
     release_date = fetch_pypi_release_date("fastapi", "0.100.0")
     assert release_date == date(2023, 7, 7)
 
 
+@pytest.mark.network
 def test_maven_latest_spring_boot() -> None:
     """Test fetching latest Spring Boot version from Maven"""
     maven_identifier = LibraryIdentifier(
@@ -52,6 +58,7 @@ def test_maven_latest_spring_boot() -> None:
     assert isinstance(release_date, date)
 
 
+@pytest.mark.network
 def test_maven_specific_spring_boot_version() -> None:
     """Test fetching specific Spring Boot version from Maven"""
     maven_identifier = LibraryIdentifier(
@@ -62,6 +69,7 @@ def test_maven_specific_spring_boot_version() -> None:
     assert release_date == date(2023, 12, 21)
 
 
+@pytest.mark.network
 def test_ruby_versions() -> None:
     """Test fetching various Ruby version release dates"""
     assert fetch_version_date(Language.RUBY, "3.2.0") == date(2022, 12, 25)
@@ -69,6 +77,7 @@ def test_ruby_versions() -> None:
     assert fetch_version_date(Language.RUBY, "1.8.0") == date(2003, 8, 4)
 
 
+@pytest.mark.network
 def test_python_latest_stable() -> None:
     """Test fetching latest stable Python version"""
     version, release_date = fetch_latest_version_and_date(Language.PYTHON)
@@ -80,6 +89,7 @@ def test_python_latest_stable() -> None:
     assert major > 3 or (major == 3 and minor >= 13)
 
 
+@pytest.mark.network
 def test_python_specific_version() -> None:
     """Test fetching specific Python version"""
     release_date = fetch_version_date(Language.PYTHON, "3.10.16")
@@ -88,6 +98,7 @@ def test_python_specific_version() -> None:
     )  # Note : it doesn't match python.org/downloads, but github releases
 
 
+@pytest.mark.network
 def test_dotnet_latest_stable() -> None:
     """Test fetching latest stable .NET version"""
     version, release_date = get_dotnet_latest_stable()
@@ -97,5 +108,3 @@ def test_dotnet_latest_stable() -> None:
     major, _, _ = map(int, version.split(".", 2))
     assert major >= 9
     assert release_date >= date(2025, 2, 11)
-
-
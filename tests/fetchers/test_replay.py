@@ -0,0 +1,89 @@
+"""Tests for the record/replay HTTP transport."""
+
+import functools
+import json
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from llm_lib_lag.fetchers import http
+from llm_lib_lag.fetchers.replay import (
+    CassetteNotFoundError,
+    ReplayMode,
+    install_replay,
+    trim_body,
+)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def test_record_then_replay_offline(tmp_path: Path) -> None:
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "pkg.json").write_text('{"version": "1.2.3"}')
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(site))
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/pkg.json"
+
+    install_replay(tmp_path / "cassettes", ReplayMode.RECORD)
+    try:
+        assert http.get(url).json() == {"version": "1.2.3"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    install_replay(tmp_path / "cassettes", ReplayMode.REPLAY)
+    response = http.get(url)
+    assert response.status_code == 200
+    assert response.json() == {"version": "1.2.3"}
+    assert response.headers["Content-Type"] == "application/json"
+
+
+def test_missing_cassette_fails_loudly(tmp_path: Path) -> None:
+    install_replay(tmp_path, ReplayMode.REPLAY)
+    with pytest.raises(CassetteNotFoundError, match="--record"):
+        http.get("https://registry.npmjs.org/left-pad")
+
+
+def test_recorded_registry_bodies_are_trimmed() -> None:
+    project = {
+        "info": {"name": "pkg", "version": "1.1", "description": "x" * 10_000},
+        "releases": {
+            "1.0": [
+                {
+                    "filename": "pkg-1.0.tar.gz",
+                    "upload_time_iso_8601": "2024-01-01T00:00:00Z",
+                },
+                {
+                    "filename": "pkg-1.0.whl",
+                    "upload_time_iso_8601": "2024-01-02T00:00:00Z",
+                },
+            ],
+            "1.1": [],
+        },
+    }
+    body = json.dumps(project).encode()
+
+    trimmed = json.loads(trim_body("https://pypi.org/pypi/pkg/json", 200, body))
+    assert trimmed == {
+        "info": {"name": "pkg", "version": "1.1"},
+        "releases": {
+            "1.0": [{"upload_time_iso_8601": "2024-01-02T00:00:00Z"}],
+            "1.1": [],
+        },
+    }
+    # Error pages and unknown hosts are saved as they came
+    assert (
+        trim_body("https://pypi.org/pypi/pkg/json", 404, b"Not Found") == b"Not Found"
+    )
+    assert trim_body("http://127.0.0.1:8000/pkg.json", 200, body) == body
@@ -63,7 +63,7 @@ def test_get_ruby_release_date_with_ground_truth(
     version: str, expected_date: date
 ) -> None:
     """Test that get_ruby_release_date returns correct dates from the ground truth data."""
-    with patch("requests.get") as mock_get:
+    with patch("llm_lib_lag.fetchers.http.get") as mock_get:
         mock_get.return_value.status_code = 200
         mock_get.return_value.text = MOCK_HTML
 
@@ -73,7 +73,7 @@ def test_get_ruby_release_date_with_ground_truth(
 
 def test_get_ruby_release_date_invalid_version() -> None:
     """Test that get_ruby_release_date raises KeyError for invalid versions."""
-    with patch("requests.get") as mock_get:
+    with patch("llm_lib_lag.fetchers.http.get") as mock_get:
         mock_get.return_value.status_code = 200
         mock_get.return_value.text = MOCK_HTML
 
@@ -83,6 +83,7 @@ def test_get_ruby_release_date_invalid_version() -> None:
             get_ruby_release_date("99.99.99", releases)
 
 
+@pytest.mark.network
 def test_real_fetch_ruby_releases() -> None:
     """Test that fetch_ruby_releases fetches the correct releases."""
     releases = fetch_ruby_releases()
@@ -0,0 +1,119 @@
+"""Tests for registry snapshots and the offline mode of the fetchers."""
+
+from datetime import date, datetime, UTC
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from llm_lib_lag.fetchers import (
+    fetch_latest_version_and_date,
+    fetch_release_history,
+    fetch_version_date,
+)
+from llm_lib_lag.fetchers.fetchers import (
+    LanguageVersionNotFoundError,
+    LibraryVersionNotFoundError,
+)
+from llm_lib_lag.fetchers.snapshot import (
+    RegistrySnapshot,
+    TechTimeline,
+    capture_timelines,
+    use_snapshot,
+    write_snapshot,
+)
+from llm_lib_lag.models import Language, LibraryIdentifier, PackageManager
+
+FASTAPI = LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi")
+REACT = LibraryIdentifier(package_manager=PackageManager.NPM, name="react")
+
+TIMELINES = [
+    TechTimeline(
+        tech=FASTAPI,
+        releases={"0.115.7": date(2025, 1, 22), "0.115.8": date(2025, 1, 30)},
+        latest=("0.115.8", date(2025, 1, 30)),
+    ),
+    TechTimeline(
+        tech=Language.RUST,
+        releases={"1.84.0": date(2025, 1, 9), "1.84.1": date(2025, 1, 30)},
+        latest=("1.84.1", date(2025, 1, 30)),
+    ),
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path: Path) -> Path:
+    path = tmp_path / "registry.snap"
+    write_snapshot(path, TIMELINES, created_at=datetime(2025, 2, 1, tzinfo=UTC))
+    return path
+
+
+@pytest.fixture
+def offline(snapshot_path: Path) -> Iterator[None]:
+    use_snapshot(snapshot_path)
+    try:
+        # Any network access in offline mode is a bug
+        with patch(
+            "llm_lib_lag.fetchers.http.get", side_effect=AssertionError("network")
+        ):
+            yield
+    finally:
+        use_snapshot(None)
+
+
+def test_round_trip(snapshot_path: Path) -> None:
+    snapshot = RegistrySnapshot(snapshot_path)
+    assert snapshot.created_at == datetime(2025, 2, 1, tzinfo=UTC)
+    assert snapshot.techs == [FASTAPI, Language.RUST]
+    assert snapshot.releases(FASTAPI) == TIMELINES[0].releases
+    assert snapshot.latest(Language.RUST) == ("1.84.1", date(2025, 1, 30))
+    assert snapshot.release_date(FASTAPI, "0.115.7") == date(2025, 1, 22)
+    assert snapshot.release_date(FASTAPI, "9.9.9") is None
+    assert REACT not in snapshot
+    snapshot.close()
+
+
+def test_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    path.write_text('{"not": "a snapshot"}\n')
+    with pytest.raises(ValueError, match="not a registry snapshot"):
+        RegistrySnapshot(path)
+
+
+@pytest.mark.usefixtures("offline")
+def test_fetchers_answer_from_snapshot() -> None:
+    assert fetch_latest_version_and_date(FASTAPI) == ("0.115.8", date(2025, 1, 30))
+    assert fetch_version_date(Language.RUST, "1.84.0") == date(2025, 1, 9)
+    assert fetch_release_history(Language.RUST) == TIMELINES[1].releases
+
+
+@pytest.mark.usefixtures("offline")
+def test_offline_misses_raise_not_found() -> None:
+    with pytest.raises(LibraryVersionNotFoundError):
+        fetch_version_date(FASTAPI, "0.1.0")
+    with pytest.raises(LibraryVersionNotFoundError):
+        fetch_latest_version_and_date(REACT)
+    with pytest.raises(LanguageVersionNotFoundError):
+        fetch_release_history(Language.RUBY)
+
+
+def test_capture_reports_failures() -> None:
+    def history(tech: LibraryIdentifier | Language) -> dict[str, date]:
+        if tech == REACT:
+            raise RuntimeError("registry down")
+        return {"0.115.7": date(2025, 1, 22)}
+
+    with (
+        patch("llm_lib_lag.fetchers.fetchers.fetch_release_history", history),
+        patch(
+            "llm_lib_lag.fetchers.fetchers.fetch_latest_version_and_date",
+            return_value=("0.115.8", date(2025, 1, 30)),
+        ),
+    ):
+        timelines, errors = capture_timelines([FASTAPI, REACT, FASTAPI])
+
+    assert [t.tech for t in timelines] == [FASTAPI]
+    # The latest version is always resolvable offline
+    assert timelines[0].releases["0.115.8"] == date(2025, 1, 30)
+    assert errors == {REACT: "RuntimeError: registry down"}
@@ -0,0 +1,126 @@
+"""Tests for the incremental metrics aggregator."""
+
+import random
+from datetime import datetime, UTC
+
+import numpy as np
+import pytest
+
+from llm_lib_lag.aggregator import LagSketch, MetricsAggregator
+from llm_lib_lag.metrics import compute_metrics
+from llm_lib_lag.models import EvaluationRun, LLMConfig
+
+from .factories import make_run
+from .test_metrics import CLAUDE, FASTAPI, GPT, RUST
+
+
+def test_sketch_quantiles_within_relative_accuracy() -> None:
+    rng = random.Random(0)
+    values = [rng.randint(-50, 2000) for _ in range(5000)]
+    sketch = LagSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+
+    for q in (0.5, 0.9, 0.95):
+        exact = float(np.quantile(values, q, method="lower"))
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02, abs=1)
+    assert sketch.mean == pytest.approx(np.mean(values))
+
+
+def test_sketch_merge_and_remove() -> None:
+    left, right = LagSketch(), LagSketch()
+    for v in range(100):
+        (left if v % 2 else right).add(v)
+    left.merge(right)
+    assert left.count == 100
+
+    for v in range(50, 100):
+        left.remove(v)
+    assert left.count == 50
+    assert left.quantile(1.0) == pytest.approx(49, rel=0.01)
+
+
+def test_superseded_run_is_replaced() -> None:
+    aggregator = MetricsAggregator()
+    old = make_run(
+        FASTAPI,
+        GPT,
+        "0.100.0",
+        lag_days=400,
+        timestamp=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    new = make_run(
+        FASTAPI, GPT, "0.115.8", lag_days=0, timestamp=datetime(2025, 2, 1, tzinfo=UTC)
+    )
+
+    assert aggregator.add(old)
+    assert aggregator.add(new)
+    assert not aggregator.add(old)  # stale run arriving late is ignored
+
+    overall = aggregator.snapshot().overall
+    assert overall.total_runs == 1
+    assert overall.exact_matches == 1
+    assert overall.lag is not None and overall.lag.max == 0
+
+
+def sample_runs() -> list[EvaluationRun]:
+    rng = random.Random(42)
+    runs: list[EvaluationRun] = []
+    for day in range(1, 20):
+        for gt in (FASTAPI, RUST):
+            for llm in (GPT, CLAUDE, LLMConfig(provider="groq", model="x")):
+                major = gt.version.split(".")[0]
+                runs.append(
+                    make_run(
+                        gt,
+                        llm,
+                        f"{major}.{rng.randint(80, 116)}.0",
+                        lag_days=rng.randint(0, 300),
+                        timestamp=datetime(2025, 1, day, tzinfo=UTC),
+                        execution_time_seconds=rng.random(),
+                    )
+                )
+    rng.shuffle(runs)
+    return runs
+
+
+def test_matches_batch_evaluation() -> None:
+    runs = sample_runs()
+    aggregator = MetricsAggregator()
+    aggregator.add_all(runs)
+
+    incremental = aggregator.snapshot()
+    batch = compute_metrics(runs)
+
+    assert incremental.input_runs == batch.input_runs
+    for name, expected in batch.by_llm.items():
+        actual = incremental.by_llm[name]
+        assert actual.total_runs == expected.total_runs
+        assert actual.exact_matches == expected.exact_matches
+        assert actual.minor_matches == expected.minor_matches
+        assert actual.avg_execution_time == pytest.approx(expected.avg_execution_time)
+        assert actual.lag is not None and expected.lag is not None
+        assert actual.lag.mean == pytest.approx(expected.lag.mean)
+
+
+def test_merged_partials_equal_single_aggregate() -> None:
+    runs = sample_runs()
+    single = MetricsAggregator()
+    single.add_all(runs)
+
+    partials = [MetricsAggregator() for _ in range(3)]
+    for i, run in enumerate(runs):
+        partials[i % 3].add(run)
+    merged = MetricsAggregator()
+    for partial in partials:
+        merged.merge(partial)
+
+    expected, actual = single.snapshot(), merged.snapshot()
+    assert actual.input_runs == expected.input_runs
+    for name, metrics in expected.by_tech.items():
+        assert actual.by_tech[name].total_runs == metrics.total_runs
+        assert actual.by_tech[name].exact_matches == metrics.exact_matches
+        assert metrics.lag is not None
+        assert actual.by_tech[name].lag is not None
+        assert actual.by_tech[name].lag.median == metrics.lag.median
+        assert actual.by_tech[name].lag.mean == pytest.approx(metrics.lag.mean)
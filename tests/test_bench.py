@@ -0,0 +1,94 @@
+"""Tests for the benchmark suite, at tiny sizes."""
+
+from pathlib import Path
+
+from llm_lib_lag.bench import (
+    BENCHMARKS,
+    Baseline,
+    BenchResult,
+    compare_to_baselines,
+    load_baselines,
+    run_benchmarks,
+    save_baselines,
+    synthetic_ruby_releases_html,
+    synthetic_runs,
+)
+from llm_lib_lag.fetchers.ruby_fetchers import parse_ruby_releases
+from llm_lib_lag.io_utils import get_missing_runs
+
+
+def _result(name: str = "evaluate_runs", seconds: float = 1.0) -> BenchResult:
+    return BenchResult(
+        name=name, size=1000, items=1000, seconds=seconds, peak_memory_bytes=1_000_000
+    )
+
+
+def test_synthetic_runs_are_deterministic() -> None:
+    assert synthetic_runs(50) == synthetic_runs(50)
+    assert len({run.llm_config for run in synthetic_runs(50)}) == 8
+
+
+def test_synthetic_ruby_page_parses() -> None:
+    releases = parse_ruby_releases(synthetic_ruby_releases_html(25))
+    assert len(releases) == 25
+    assert "0.2.4" in releases
+
+
+def test_run_every_benchmark() -> None:
+    seen: list[str] = []
+    results = run_benchmarks(
+        sizes=[20], repeat=1, on_result=lambda r: seen.append(r.key)
+    )
+
+    assert [r.name for r in results] == [b.name for b in BENCHMARKS]
+    assert seen == [r.key for r in results]
+    for result in results:
+        assert result.items > 0
+        assert result.seconds > 0
+        assert result.peak_memory_bytes > 0
+
+
+def test_only_selects_by_prefix() -> None:
+    results = run_benchmarks(sizes=[10], only=["fetch_latest"], repeat=1)
+    assert {r.name for r in results} == {
+        "fetch_latest_npm",
+        "fetch_latest_pypi",
+        "fetch_latest_maven",
+    }
+
+
+def test_synthetic_runs_cover_their_own_pairs() -> None:
+    runs = synthetic_runs(100)
+    pairs = [(run.llm_config, run.ground_truth) for run in runs]
+    assert get_missing_runs(pairs, runs) == []
+
+
+def test_baselines_round_trip_and_merge(tmp_path: Path) -> None:
+    path = tmp_path / "baselines.json"
+    assert load_baselines(path) == {}
+
+    save_baselines(path, [_result("a"), _result("b")])
+    save_baselines(path, [_result("b", seconds=2.0)])
+
+    baselines = load_baselines(path)
+    assert set(baselines) == {"a@1000", "b@1000"}
+    assert baselines["b@1000"].items_per_second == 500
+
+
+def test_compare_to_baselines() -> None:
+    baselines = {
+        "evaluate_runs@1000": Baseline(
+            items_per_second=1000, peak_memory_bytes=1_000_000
+        )
+    }
+
+    assert compare_to_baselines([_result(seconds=1.1)], baselines, 0.2) == []
+    assert compare_to_baselines([_result("other", seconds=10)], baselines, 0.2) == []
+
+    (slower,) = compare_to_baselines([_result(seconds=2.0)], baselines, 0.2)
+    assert slower.metric == "items_per_second"
+    assert slower.change == -0.5
+
+    bigger = _result().model_copy(update={"peak_memory_bytes": 2_000_000})
+    (regression,) = compare_to_baselines([bigger], baselines, 0.2)
+    assert regression.metric == "peak_memory_bytes"
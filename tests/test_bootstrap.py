@@ -0,0 +1,69 @@
+"""Tests for bootstrap confidence intervals."""
+
+import pytest
+
+from llm_lib_lag.bootstrap import bootstrap_metrics
+from llm_lib_lag.models import EvaluationRun, LLMConfig, RunStatus
+
+from .test_aggregator import sample_runs
+from .factories import make_run
+from .test_metrics import FASTAPI, GPT
+
+
+def test_same_seed_gives_same_intervals() -> None:
+    runs = sample_runs()
+    first = bootstrap_metrics(runs, n_resamples=500, seed=7)
+    second = bootstrap_metrics(runs, n_resamples=500, seed=7)
+    assert first == second
+
+
+def test_intervals_bracket_the_estimate() -> None:
+    report = bootstrap_metrics(sample_runs(), n_resamples=1000, seed=0)
+    for intervals in [report.overall, *report.by_llm.values()]:
+        for interval in (
+            intervals.exact_match_rate,
+            intervals.minor_match_rate,
+            intervals.avg_execution_time,
+            intervals.lag_median,
+        ):
+            assert interval is not None
+            assert interval.low <= interval.estimate <= interval.high
+
+
+def test_interval_width_shrinks_with_more_runs() -> None:
+    def runs_for(n: int) -> list[EvaluationRun]:
+        return [
+            make_run(
+                FASTAPI,
+                LLMConfig(provider="openai", model=f"m{i}"),
+                "0.115.8" if i % 2 else "0.110.0",
+                lag_days=i % 50,
+            )
+            for i in range(n)
+        ]
+
+    small = bootstrap_metrics(runs_for(20), n_resamples=1000, seed=1).overall
+    large = bootstrap_metrics(runs_for(500), n_resamples=1000, seed=1).overall
+
+    assert small.exact_match_rate.estimate == pytest.approx(0.5)
+    small_width = small.exact_match_rate.high - small.exact_match_rate.low
+    large_width = large.exact_match_rate.high - large.exact_match_rate.low
+    assert large_width < small_width / 3
+
+
+def test_no_lag_intervals_without_lag_data() -> None:
+    report = bootstrap_metrics([make_run(FASTAPI, GPT, None)], n_resamples=10)
+    assert report.overall.lag_median is None
+    assert report.overall.exact_match_rate.high == 0
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        bootstrap_metrics([], n_resamples=10)
+    with pytest.raises(ValueError):
+        bootstrap_metrics(sample_runs(), n_resamples=0)
+    timed_out = make_run(FASTAPI, GPT, None).model_copy(
+        update={"status": RunStatus.TIMEOUT}
+    )
+    with pytest.raises(ValueError):
+        bootstrap_metrics([timed_out], n_resamples=10)
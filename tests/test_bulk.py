@@ -0,0 +1,156 @@
+"""Tests for bulk ground-truth generation against a local stand-in registry."""
+
+import json
+import threading
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from llm_lib_lag.bulk import (
+    ResolutionCache,
+    merge_ground_truths,
+    read_package_list,
+    resolve_packages,
+)
+from llm_lib_lag.fetchers.http import (
+    RegistryEndpoints,
+    get_session,
+    set_registry_endpoints,
+)
+from llm_lib_lag.models import LibraryIdentifier, PackageManager, TechVersionGroundTruth
+
+BROKEN = "broken-package"
+
+
+class _Registry(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits: Counter[str] = Counter()
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.hits[self.path] += 1
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "pypi" and parts[-1] == "json":
+            name = parts[1]
+            if name.startswith("missing"):
+                return self._send(404, b"{}")
+            if name == BROKEN:
+                return self._send(200, b"not json")
+            version = f"1.{len(name)}.0"
+            body = {
+                "info": {"version": version},
+                "releases": {
+                    version: [{"upload_time_iso_8601": "2025-02-01T10:00:00Z"}]
+                },
+            }
+        elif parts[0] == "npm":
+            body = {
+                "dist-tags": {"latest": "19.0.0"},
+                "time": {"19.0.0": "2024-12-05T18:10:24.000Z"},
+            }
+        else:
+            return self._send(404, b"{}")
+        self._send(200, json.dumps(body).encode())
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def registry() -> Iterator[Counter[str]]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Registry)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    _Registry.hits = Counter()
+    set_registry_endpoints(
+        RegistryEndpoints.from_base_url(f"http://127.0.0.1:{server.server_port}")
+    )
+    try:
+        yield _Registry.hits
+    finally:
+        set_registry_endpoints(None)
+        # Drop the keep-alive connections, ending the server's handler threads
+        get_session().close()
+        server.shutdown()
+        server.server_close()
+
+
+def pypi(name: str) -> LibraryIdentifier:
+    return LibraryIdentifier(package_manager=PackageManager.PYPI, name=name)
+
+
+def test_read_package_list(tmp_path: Path) -> None:
+    path = tmp_path / "top.txt"
+    path.write_text("# top PyPI\nboto3\n\nFlask_Login\nflask-login\nrequests\nnumpy\n")
+    techs = read_package_list(path, PackageManager.PYPI, limit=3)
+    assert [t.name for t in techs] == ["boto3", "flask-login", "requests"]
+
+
+def test_resolve_reports_failures_per_package(registry: Counter[str]) -> None:
+    techs = [pypi(f"pkg{i}") for i in range(300)]
+    techs[10] = pypi("missing-one")
+    techs[20] = pypi(BROKEN)
+
+    result = resolve_packages(techs, max_workers=16, batch_size=64)
+
+    assert len(result.ground_truths) == 298
+    assert [f.tech.name for f in result.failures] == ["missing-one", BROKEN]
+    assert "LibraryVersionNotFoundError" in result.failures[0].error
+    assert result.ground_truths[0] == TechVersionGroundTruth(
+        tech=pypi("pkg0"), version="1.4.0", release_date=date(2025, 2, 1)
+    )
+    # Input order is kept despite concurrent fetching
+    assert [gt.tech for gt in result.ground_truths] == [
+        t for t in techs if t.name not in ("missing-one", BROKEN)
+    ]
+
+
+def test_npm_through_stand_in(registry: Counter[str]) -> None:
+    react = LibraryIdentifier(package_manager=PackageManager.NPM, name="react")
+    result = resolve_packages([react])
+    assert result.ground_truths[0].version == "19.0.0"
+    assert registry["/npm/react"] == 1
+
+
+def test_cache_skips_resolved_packages(registry: Counter[str], tmp_path: Path) -> None:
+    techs = [pypi(f"pkg{i}") for i in range(50)] + [pypi("missing-one")]
+    cache_path = tmp_path / "cache.json"
+
+    first = resolve_packages(techs, cache=ResolutionCache(cache_path), batch_size=20)
+    fetched = sum(registry.values())
+    second = resolve_packages(techs, cache=ResolutionCache(cache_path))
+
+    assert first.cache_hits == 0
+    assert second.cache_hits == 50
+    assert second.ground_truths == first.ground_truths
+    # Only the failing package is queried again
+    assert sum(registry.values()) == fetched + 1
+
+
+def test_merge_keeps_positions_and_appends() -> None:
+    old = [
+        TechVersionGroundTruth(tech=pypi("a"), version="1.0.0"),
+        TechVersionGroundTruth(tech=pypi("b"), version="1.0.0"),
+    ]
+    new = [
+        TechVersionGroundTruth(tech=pypi("c"), version="3.0.0"),
+        TechVersionGroundTruth(tech=pypi("a"), version="2.0.0"),
+    ]
+    merged = merge_ground_truths(old, new)
+    assert [(gt.tech.name, gt.version) for gt in merged] == [  # type: ignore[union-attr]
+        ("a", "2.0.0"),
+        ("b", "1.0.0"),
+        ("c", "3.0.0"),
+    ]
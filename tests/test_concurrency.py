@@ -0,0 +1,209 @@
+"""Tests for the adaptive per-provider concurrency."""
+
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from llm_lib_lag.concurrency import AdaptiveExecutor, AIMDLimiter, rate_limit_signal
+from llm_lib_lag.models import (
+    EvaluationRun,
+    Language,
+    LLMConfig,
+    RunStatus,
+    SimulationConfig,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.monitoring import CONCURRENCY_LIMIT
+from llm_lib_lag.simulated import (
+    SimulatedChatModel,
+    SimulatedProviderError,
+    SimulatedRateLimitError,
+)
+
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.85.0")
+SIM = LLMConfig(provider="simulated", model="concurrency-test")
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, headers: dict[str, str]) -> None:
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers)
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_rate_limit_signal() -> None:
+    assert rate_limit_signal(SimulatedRateLimitError(2.5)).retry_after == 2.5
+    assert rate_limit_signal(_HTTPError(429, {"retry-after": "3"})).retry_after == 3
+    assert rate_limit_signal(_HTTPError(529, {})).retry_after is None
+    assert rate_limit_signal(RateLimitError("slow down")) is not None
+
+    in_a_minute = format_datetime(datetime.now(UTC) + timedelta(seconds=60), True)
+    signal = rate_limit_signal(_HTTPError(503, {"retry-after": in_a_minute}))
+    assert signal is not None and 50 < signal.retry_after <= 60
+
+    # Wrapped by an integration
+    try:
+        try:
+            raise SimulatedRateLimitError(1)
+        except SimulatedRateLimitError as e:
+            raise RuntimeError("invoke failed") from e
+    except RuntimeError as wrapped:
+        assert rate_limit_signal(wrapped) is not None
+
+    assert rate_limit_signal(SimulatedProviderError("boom")) is None
+    assert rate_limit_signal(ValueError("no version")) is None
+
+
+def test_additive_increase_multiplicative_decrease() -> None:
+    limiter = AIMDLimiter(initial=4, max_limit=8, default_retry_after=0)
+    for _ in range(4):
+        limiter.on_success(limiter.acquire())  # type: ignore[arg-type]
+    # One window of successes adds about one slot
+    assert 4.9 < limiter.limit < 5.1
+
+    first, second = limiter.acquire(), limiter.acquire()
+    assert first is not None and second is not None
+    limiter.on_rate_limit(first, retry_after=0)
+    limiter.on_rate_limit(second, retry_after=0)
+    # Both calls were sent at the old limit: one congestion event, one halving
+    assert 2.4 < limiter.limit < 2.6
+    assert limiter.in_flight == 0
+
+    for _ in range(10):
+        started = limiter.acquire()
+        assert started is not None
+        limiter.on_rate_limit(started, retry_after=0)
+    assert limiter.limit == limiter.min_limit == 1
+
+
+def test_limit_and_retry_after_are_honoured() -> None:
+    limiter = AIMDLimiter(initial=1, max_limit=4)
+    started = limiter.acquire()
+    assert started is not None
+
+    stop = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+    # The single slot is taken: waits until stopped
+    assert limiter.acquire(stop) is None
+
+    limiter.on_rate_limit(started, retry_after=0.1)
+    before = time.monotonic()
+    assert limiter.acquire() is not None
+    assert time.monotonic() - before >= 0.09
+
+
+def test_executor_converges_on_the_provider_limit() -> None:
+    model = SimulatedChatModel(
+        simulation=SimulationConfig(
+            latency_ms=10,
+            latency_distribution="constant",
+            max_concurrency=4,
+            retry_after_seconds=0.01,
+        ),
+        ground_truths={"Rust": "1.85.0"},
+    )
+
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        message = HumanMessage(f"What is the latest stable version of {gt.tech}?")
+        return EvaluationRun(
+            ground_truth=gt,
+            llm_config=llm,
+            execution_time_seconds=0.01,
+            output=str(model.invoke([message]).content),
+        )
+
+    executor = AdaptiveExecutor(
+        evaluate, initial_concurrency=1, max_concurrency=16, max_attempts=50
+    )
+    outcomes = list(executor.run([(SIM, RUST)] * 200))
+
+    assert len(outcomes) == 200
+    assert all(outcome.run is not None for outcome in outcomes)
+    limit = executor.limiters["simulated"].limit
+    # Oscillates around the simulated account limit of 4
+    assert 1 <= limit <= 8
+    assert CONCURRENCY_LIMIT.value(provider="simulated") == limit
+
+
+def test_one_limiter_per_provider() -> None:
+    executor = AdaptiveExecutor(lambda llm, gt: None)  # type: ignore[arg-type,return-value]
+    barrier = threading.Barrier(16)
+    limiters: list[AIMDLimiter] = []
+
+    def first_call() -> None:
+        barrier.wait()
+        limiters.append(executor.limiter("simulated"))
+
+    threads = [threading.Thread(target=first_call) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(limiter is limiters[0] for limiter in limiters)
+
+
+def test_executor_reports_failures() -> None:
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        if llm.model == "broken":
+            raise SimulatedProviderError("boom")
+        raise SimulatedRateLimitError(0)
+
+    executor = AdaptiveExecutor(evaluate, max_attempts=3)
+    broken = LLMConfig(provider="openai", model="broken")
+    outcomes = {
+        o.llm_config.model: o for o in executor.run([(broken, RUST), (SIM, RUST)])
+    }
+
+    assert isinstance(outcomes["broken"].error, SimulatedProviderError)
+    assert isinstance(outcomes[SIM.model].error, SimulatedRateLimitError)
+    assert outcomes[SIM.model].run is None
+
+
+def test_timeouts_shrink_the_limit() -> None:
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        return EvaluationRun(
+            ground_truth=gt,
+            llm_config=llm,
+            status=RunStatus.TIMEOUT,
+            execution_time_seconds=30.0,
+            output="",
+        )
+
+    executor = AdaptiveExecutor(evaluate, initial_concurrency=8)
+    outcomes = list(executor.run([(SIM, RUST)] * 5))
+
+    assert all(o.run is not None for o in outcomes)
+    limiter = executor.limiters["simulated"]
+    assert limiter.limit < 8
+    assert limiter.in_flight == 0
+
+
+class _Abort(BaseException):
+    pass
+
+
+def test_worker_dying_does_not_hang_the_run() -> None:
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        raise _Abort()
+
+    executor = AdaptiveExecutor(evaluate, max_concurrency=1)
+    with pytest.raises(_Abort):
+        list(executor.run([(SIM, RUST)] * 3))
+    assert executor.limiters["simulated"].in_flight == 0
+
+
+def test_invalid_limiter_settings() -> None:
+    with pytest.raises(ValueError):
+        AIMDLimiter(decrease=1.5)
+    with pytest.raises(ValueError):
+        AIMDLimiter(initial=10, max_limit=4)
+    with pytest.raises(ValueError):
+        AdaptiveExecutor(lambda llm, gt: pytest.fail("not called"), max_attempts=0)
@@ -0,0 +1,141 @@
+"""Tests for run deadlines and timed out runs."""
+
+import threading
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_lib_lag.aggregator import MetricsAggregator
+from llm_lib_lag.deadlines import Deadline, DeadlineExceededError, call_with_deadline
+from llm_lib_lag.io_utils import get_missing_runs
+from llm_lib_lag.metrics import compute_metrics
+from llm_lib_lag.models import (
+    EvaluationRun,
+    Language,
+    LLMConfig,
+    RunStatus,
+    SimulationConfig,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.monitoring import RUN_TIMEOUTS
+from llm_lib_lag.tracing import configure_tracing, current_span, get_tracer
+from llm_lib_lag.versions import VERSION_REGEX
+
+from .factories import make_run
+
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.85.0")
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+
+
+def test_call_returns_or_raises_like_the_function() -> None:
+    deadline = Deadline(5)
+    assert call_with_deadline(lambda: 42, deadline, "step") == 42
+    with pytest.raises(KeyError):
+        call_with_deadline(lambda: {}["missing"], deadline, "step")
+    assert call_with_deadline(lambda: 1, Deadline(None), "step") == 1
+
+
+def test_slow_call_is_abandoned_at_the_deadline() -> None:
+    deadline = Deadline(0.05)
+    hung = threading.Event()
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceededError) as excinfo:
+        call_with_deadline(lambda: hung.wait(10), deadline, "llm.invoke")
+    assert time.perf_counter() - start < 1
+    hung.set()  # let the abandoned call end
+    assert excinfo.value.stage == "llm.invoke"
+    assert deadline.expired
+
+    # The budget is shared: later steps fail without being started
+    started: list[bool] = []
+    with pytest.raises(DeadlineExceededError):
+        call_with_deadline(lambda: started.append(True), deadline, "registry.lookup")
+    assert not started
+
+
+def test_call_runs_in_the_callers_context(tmp_path: Path) -> None:
+    configure_tracing(tmp_path / "trace.jsonl")
+    try:
+        with get_tracer(__name__).start_as_current_span("outer"):
+            outer = current_span()
+            assert call_with_deadline(current_span, Deadline(5), "step") is outer
+    finally:
+        configure_tracing(None)
+
+
+def test_invalid_budget() -> None:
+    with pytest.raises(ValueError):
+        Deadline(0)
+    with pytest.raises(ValueError):
+        LLMConfig(provider="openai", model="gpt-4o-mini", timeout_seconds=-1)
+
+
+def test_timeout_left_out_when_unset() -> None:
+    # Unchanged task keys and run lines for configs without a deadline
+    assert "timeout_seconds" not in GPT.model_dump_json()
+    config = GPT.model_copy(update={"timeout_seconds": 30.0})
+    assert config.model_dump()["timeout_seconds"] == 30.0
+
+
+def test_timed_out_runs_are_not_scored_and_retried() -> None:
+    completed = make_run(RUST, GPT, "1.85.0")
+    timed_out = make_run(
+        RUST,
+        GPT,
+        None,
+        timestamp=datetime(2025, 2, 2, tzinfo=UTC),
+        status=RunStatus.TIMEOUT,
+    )
+
+    # The later timeout does not replace the completed run
+    report = compute_metrics([completed, timed_out])
+    assert report.overall.total_runs == 1
+    assert report.overall.exact_matches == 1
+
+    aggregator = MetricsAggregator()
+    assert not aggregator.add(timed_out)
+    assert len(aggregator) == 0
+    aggregator.add(completed)
+    assert aggregator.snapshot().overall.exact_matches == 1
+
+    assert get_missing_runs([(GPT, RUST)], [timed_out]) == [(GPT, RUST)]
+    assert get_missing_runs([(GPT, RUST)], [timed_out, completed]) == []
+
+
+def test_status_round_trip() -> None:
+    run = make_run(RUST, GPT, None, status=RunStatus.TIMEOUT)
+    assert EvaluationRun.model_validate_json(run.model_dump_json()) == run
+    # Runs written before statuses existed are completed runs
+    legacy = run.model_dump(mode="json", exclude={"status"})
+    assert EvaluationRun.model_validate(legacy).status == RunStatus.COMPLETED
+
+
+def test_runner_records_timeouts() -> None:
+    # The runner needs the full langchain install (provider integrations)
+    runner = pytest.importorskip("llm_lib_lag.runner", exc_type=ImportError)
+    llm_config = LLMConfig(
+        provider="simulated",
+        model="sim-hung",
+        simulation=SimulationConfig(latency_ms=1000, latency_distribution="constant"),
+        timeout_seconds=0.1,
+    )
+    prompt = ChatPromptTemplate.from_messages(
+        [("user", "What is the latest stable version of {software_name}?")]
+    )
+    before = RUN_TIMEOUTS.value(
+        provider="simulated", model="sim-hung", stage="llm.invoke"
+    )
+
+    start = time.perf_counter()
+    run = runner.run_single_evaluation(llm_config, RUST, prompt, VERSION_REGEX)
+
+    assert time.perf_counter() - start < 0.9
+    assert run.status == RunStatus.TIMEOUT
+    assert run.parsed_version is None
+    assert (
+        RUN_TIMEOUTS.value(provider="simulated", model="sim-hung", stage="llm.invoke")
+        == before + 1
+    )
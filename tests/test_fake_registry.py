@@ -0,0 +1,149 @@
+"""Tests for the local stand-in registry, through the real fetchers."""
+
+import time
+from datetime import date
+from typing import Iterator
+
+import pytest
+import requests
+
+from llm_lib_lag.fake_registry import FakeRegistry, FakeRegistryConfig
+from llm_lib_lag.fetchers import (
+    fetch_latest_version_and_date,
+    fetch_release_history,
+    fetch_version_date,
+)
+from llm_lib_lag.fetchers.fetchers import (
+    LibraryVersionNotFoundError,
+    _fetch_python_versions_manifest,
+)
+from llm_lib_lag.fetchers.http import get_session, set_registry_endpoints
+from llm_lib_lag.fetchers.ruby_fetchers import fetch_ruby_releases
+from llm_lib_lag.models import Language, LibraryIdentifier, PackageManager
+
+AS_OF = date(2025, 2, 1)
+SPRING = LibraryIdentifier(
+    package_manager=PackageManager.MAVEN,
+    name="org.springframework.boot:spring-boot-starter-parent",
+)
+
+
+def _start(config: FakeRegistryConfig) -> FakeRegistry:
+    registry = FakeRegistry(config).start()
+    set_registry_endpoints(registry.endpoints)
+    _fetch_python_versions_manifest.cache_clear()
+    fetch_ruby_releases.cache_clear()
+    return registry
+
+
+def _stop(registry: FakeRegistry) -> None:
+    set_registry_endpoints(None)
+    get_session().close()
+    registry.stop()
+    _fetch_python_versions_manifest.cache_clear()
+    fetch_ruby_releases.cache_clear()
+
+
+@pytest.fixture
+def registry() -> Iterator[FakeRegistry]:
+    registry = _start(FakeRegistryConfig(versions_per_package=250, as_of=AS_OF))
+    try:
+        yield registry
+    finally:
+        _stop(registry)
+
+
+@pytest.mark.parametrize(
+    "tech",
+    [
+        LibraryIdentifier(package_manager=PackageManager.NPM, name="react"),
+        LibraryIdentifier(package_manager=PackageManager.NPM, name="@angular/core"),
+        LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi"),
+        SPRING,
+        Language.RUST,
+        Language.PYTHON,
+        Language.DOTNET,
+        Language.RUBY,
+    ],
+)
+def test_fetchers_parse_every_route(
+    registry: FakeRegistry, tech: LibraryIdentifier | Language
+) -> None:
+    version, release_date = fetch_latest_version_and_date(tech)
+    assert release_date == AS_OF
+
+    history = fetch_release_history(tech)
+    # Paginated sources (GitHub, Solr) are fully traversed; Ruby's history
+    # also includes the built-in table of old releases
+    assert len(history) == 250 or tech == Language.RUBY
+    assert history[version] == AS_OF
+
+
+def test_version_dates(registry: FakeRegistry) -> None:
+    fastapi = LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi")
+    history = fetch_release_history(fastapi)
+    oldest = min(history, key=history.__getitem__)
+    assert fetch_version_date(fastapi, oldest) == history[oldest]
+    spring_version, spring_date = fetch_latest_version_and_date(SPRING)
+    assert fetch_version_date(SPRING, spring_version) == spring_date
+
+    with pytest.raises(LibraryVersionNotFoundError):
+        fetch_version_date(fastapi, "0.0.1")
+    with pytest.raises(LibraryVersionNotFoundError):
+        fetch_latest_version_and_date(
+            LibraryIdentifier(package_manager=PackageManager.NPM, name="missing-pkg")
+        )
+
+
+def test_keep_alive_and_stats(registry: FakeRegistry) -> None:
+    for name in ("a", "b", "c", "d"):
+        fetch_latest_version_and_date(
+            LibraryIdentifier(package_manager=PackageManager.PYPI, name=name)
+        )
+    stats = registry.stats()
+    assert stats.requests == 4
+    assert stats.by_route == {"pypi": 4}
+    assert stats.by_status == {200: 4}
+    assert stats.connections == 1
+    assert stats.bytes_sent > 0
+
+
+def test_latency_errors_and_padding() -> None:
+    registry = _start(
+        FakeRegistryConfig(latency_ms=30, rate_limit_rate=1.0, retry_after_seconds=7)
+    )
+    try:
+        start = time.perf_counter()
+        response = requests.get(f"{registry.url}/pypi/fastapi/json")
+        assert time.perf_counter() - start >= 0.03
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+    finally:
+        _stop(registry)
+
+    registry = _start(FakeRegistryConfig(error_rate=1.0))
+    try:
+        assert requests.get(f"{registry.url}/npm/react").status_code == 500
+        assert registry.stats().by_status == {500: 1}
+    finally:
+        _stop(registry)
+
+    sizes = []
+    for padding in (0, 100_000):
+        registry = _start(FakeRegistryConfig(padding_bytes=padding))
+        try:
+            sizes.append(len(requests.get(f"{registry.url}/npm/react").content))
+        finally:
+            _stop(registry)
+    assert sizes[1] - sizes[0] >= 100_000
+
+
+def test_deterministic_timelines() -> None:
+    histories = []
+    for _ in range(2):
+        registry = _start(FakeRegistryConfig())
+        try:
+            histories.append(fetch_release_history(Language.RUST))
+        finally:
+            _stop(registry)
+    assert histories[0] == histories[1]
@@ -0,0 +1,105 @@
+"""Tests for the data-file-backed ground truths."""
+
+import json
+import os
+import stat
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from llm_lib_lag import ground_truths as gt_module
+from llm_lib_lag.ground_truths import (
+    GROUND_TRUTHS_FILE,
+    load_ground_truths,
+    refresh_ground_truths,
+    save_ground_truths,
+)
+from llm_lib_lag.models import (
+    Language,
+    LibraryIdentifier,
+    PackageManager,
+    TechVersionGroundTruth,
+)
+
+FASTAPI = LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi")
+RUST = Language.RUST
+
+SAMPLE = [
+    TechVersionGroundTruth(
+        tech=FASTAPI, version="0.115.8", release_date=date(2025, 1, 30)
+    ),
+    TechVersionGroundTruth(tech=RUST, version="1.84.1", release_date=date(2025, 1, 30)),
+]
+
+
+def test_packaged_file_loads() -> None:
+    ground_truths = load_ground_truths(GROUND_TRUTHS_FILE)
+    assert ground_truths
+    assert len({gt.tech for gt in ground_truths}) == len(ground_truths)
+
+
+def test_lazy_module_attribute() -> None:
+    assert gt_module.GROUND_TRUTHS == load_ground_truths(GROUND_TRUTHS_FILE)
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "ground_truths.json"
+    save_ground_truths(SAMPLE, path)
+    assert load_ground_truths(path) == SAMPLE
+    # No temporary file left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["ground_truths.json"]
+
+
+def test_failed_write_keeps_original(tmp_path: Path) -> None:
+    path = tmp_path / "ground_truths.json"
+    save_ground_truths(SAMPLE, path)
+    with patch("llm_lib_lag.io_utils.os.replace", side_effect=OSError("disk")):
+        with pytest.raises(OSError):
+            save_ground_truths(SAMPLE[:1], path)
+    assert load_ground_truths(path) == SAMPLE
+    assert [p.name for p in tmp_path.iterdir()] == ["ground_truths.json"]
+
+
+def test_write_keeps_file_permissions(tmp_path: Path) -> None:
+    path = tmp_path / "ground_truths.json"
+    umask = os.umask(0)
+    os.umask(umask)
+
+    save_ground_truths(SAMPLE, path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    path.chmod(0o640)
+    save_ground_truths(SAMPLE[:1], path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_env_override(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "custom.json"
+    save_ground_truths(SAMPLE[1:], path)
+    monkeypatch.setenv("LLM_LIB_LAG_GROUND_TRUTHS", str(path))
+    assert load_ground_truths() == SAMPLE[1:]
+
+
+def test_newer_schema_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "ground_truths.json"
+    path.write_text(json.dumps({"schema_version": 99, "ground_truths": []}))
+    with pytest.raises(ValueError, match="schema version 99"):
+        load_ground_truths(path)
+
+
+def test_refresh_reports_changes_and_failures() -> None:
+    def fake_fetch(tech: LibraryIdentifier | Language) -> tuple[str, date]:
+        if tech == RUST:
+            raise RuntimeError("registry down")
+        return "0.116.0", date(2025, 2, 10)
+
+    with patch("llm_lib_lag.ground_truths.fetch_latest_version_and_date", fake_fetch):
+        updates = refresh_ground_truths(SAMPLE, max_workers=2)
+
+    assert [u.old for u in updates] == SAMPLE
+    assert updates[0].changed
+    assert updates[0].new is not None and updates[0].new.version == "0.116.0"
+    assert updates[1].new is None and not updates[1].changed
+    assert updates[1].error == "registry down"
@@ -0,0 +1,156 @@
+"""Tests for hedged LLM calls."""
+
+import threading
+import time
+from typing import Callable
+
+import pytest
+
+from llm_lib_lag.concurrency import AIMDLimiter
+from llm_lib_lag.deadlines import Deadline, DeadlineExceededError
+from llm_lib_lag.hedging import HEDGE, PRIMARY, Hedger, hedge_delays
+from llm_lib_lag.models import (
+    Language,
+    LLMConfig,
+    RunStatus,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.monitoring import HEDGED_CALLS
+
+from .factories import make_run
+
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.85.0")
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+O3 = LLMConfig(provider="openai", model="o3-mini")
+SLOW = LLMConfig(provider="simulated", model="hedging-test")
+
+
+def _first_call_hangs(release: threading.Event) -> Callable[[], str]:
+    """A call whose first invocation blocks until `release`, later ones answer."""
+    calls: list[int] = []
+    lock = threading.Lock()
+
+    def call() -> str:
+        with lock:
+            attempt = len(calls)
+            calls.append(attempt)
+        if attempt == 0:
+            release.wait(10)
+        return f"answer {attempt}"
+
+    return call
+
+
+def test_hedge_delays() -> None:
+    runs = [
+        make_run(RUST, GPT, None, execution_time_seconds=float(i))
+        for i in range(1, 101)
+    ]
+    runs += [make_run(RUST, O3, None, execution_time_seconds=50.0) for _ in range(5)]
+    runs += [
+        make_run(
+            RUST, GPT, None, execution_time_seconds=1000.0, status=RunStatus.TIMEOUT
+        )
+        for _ in range(50)
+    ]
+
+    delays = hedge_delays(runs, percentile=90, min_runs=20)
+
+    assert delays["openai/gpt-4o-mini"] == pytest.approx(90.1)
+    # Too few runs for o3-mini: it falls back to the provider's delay
+    assert "openai/o3-mini" not in delays
+    hedger = Hedger(delays)
+    assert hedger.delay(O3) == delays["openai"]
+    assert hedger.delay(SLOW) is None
+
+
+def test_fast_call_is_not_hedged() -> None:
+    hedger = Hedger({"simulated": 1.0}, budget=1.0)
+    result = hedger.call(lambda: "answer", SLOW, Deadline(5))
+    assert result.value == "answer"
+    assert not result.hedged
+    assert result.winner == PRIMARY
+    assert hedger.hedges == 0
+
+
+def test_slow_call_is_hedged_and_the_hedge_wins() -> None:
+    hedger = Hedger({"simulated/hedging-test": 0.02}, budget=1.0)
+    release = threading.Event()
+    wins = HEDGED_CALLS.value(
+        provider="simulated", model="hedging-test", winner="hedge"
+    )
+
+    start = time.perf_counter()
+    result = hedger.call(_first_call_hangs(release), SLOW, Deadline(5))
+    release.set()
+
+    assert time.perf_counter() - start < 1
+    assert result.value == "answer 1"
+    assert result.hedged
+    assert result.winner == HEDGE
+    # The primary's latency, censored at the hedge's answer, not the hedge's
+    assert 0.02 <= result.seconds < 0.5
+    assert (
+        HEDGED_CALLS.value(provider="simulated", model="hedging-test", winner="hedge")
+        == wins + 1
+    )
+
+
+def test_budget_limits_hedges() -> None:
+    hedger = Hedger({"simulated": 0.0}, budget=0.5)
+    release = threading.Event()
+    release.set()  # calls answer at once, but after the zero delay
+
+    for _ in range(10):
+        hedger.call(_first_call_hangs(release), SLOW, Deadline(5))
+
+    assert hedger.calls == 10
+    assert hedger.hedges <= 5
+
+    no_budget = Hedger({"simulated": 0.0}, budget=0.0)
+    result = no_budget.call(lambda: "answer", SLOW, Deadline(5))
+    assert not result.hedged
+    with pytest.raises(ValueError):
+        Hedger({}, budget=2)
+
+
+def test_errors_are_not_hedged() -> None:
+    hedger = Hedger({"simulated": 1.0}, budget=1.0)
+
+    def fail() -> str:
+        raise ConnectionError("boom")
+
+    with pytest.raises(ConnectionError):
+        hedger.call(fail, SLOW, Deadline(5))
+    assert hedger.hedges == 0
+
+
+def test_deadline_applies_to_hedged_calls() -> None:
+    hedger = Hedger({"simulated": 0.01}, budget=1.0)
+    release = threading.Event()
+
+    with pytest.raises(DeadlineExceededError):
+        hedger.call(lambda: str(release.wait(10)), SLOW, Deadline(0.1))
+    release.set()
+    assert hedger.hedges == 1
+
+
+def test_hedges_take_a_limiter_slot() -> None:
+    limiter = AIMDLimiter(initial=2, max_limit=2)
+    hedger = Hedger({"simulated": 0.01}, budget=1.0, limiter=lambda _: limiter)
+    release = threading.Event()
+
+    # The primary holds one slot, as it would under the executor
+    limiter.acquire()
+    result = hedger.call(_first_call_hangs(release), SLOW, Deadline(5))
+    assert result.winner == HEDGE
+    # The hedge gave its slot back on answering
+    assert limiter.in_flight == 1
+
+    # With every slot taken, the call waits for the primary instead
+    limiter.acquire()
+    release.clear()
+    threading.Timer(0.1, release.set).start()
+    result = hedger.call(_first_call_hangs(release), SLOW, Deadline(5))
+    assert not result.hedged
+    assert hedger.hedges == 1
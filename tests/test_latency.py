@@ -0,0 +1,137 @@
+"""Tests for per-sweep latency analytics and regression detection."""
+
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+import pytest
+
+from llm_lib_lag.latency import (
+    LatencyStats,
+    SweepLatency,
+    detect_regressions,
+    load_latency_history,
+    merge_latency_history,
+    save_latency_history,
+    split_sweeps,
+    sweep_latencies,
+)
+from llm_lib_lag.models import (
+    Language,
+    LLMConfig,
+    TechVersionGroundTruth,
+)
+
+from .factories import make_run
+
+START = datetime(2025, 2, 1, tzinfo=UTC)
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+CLAUDE = LLMConfig(provider="anthropic", model="claude-3-5-haiku-latest")
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.84.1")
+
+
+def _sweep(llm: str, day: int, p95: float, count: int = 50) -> SweepLatency:
+    at = START + timedelta(days=day)
+    return SweepLatency(
+        sweep_started_at=at,
+        sweep_ended_at=at + timedelta(hours=1),
+        llm=llm,
+        stats=LatencyStats(count=count, mean=1, p50=1, p95=p95, p99=p95, max=p95),
+    )
+
+
+def test_split_sweeps_on_gaps() -> None:
+    runs = [
+        make_run(
+            RUST,
+            GPT,
+            None,
+            timestamp=START + timedelta(minutes=10),
+            execution_time_seconds=1,
+        ),
+        make_run(RUST, GPT, None, timestamp=START, execution_time_seconds=1),
+        make_run(
+            RUST,
+            GPT,
+            None,
+            timestamp=START + timedelta(hours=8),
+            execution_time_seconds=1,
+        ),
+    ]
+    sweeps = split_sweeps(runs, sweep_gap=timedelta(hours=6))
+    assert [len(s) for s in sweeps] == [2, 1]
+    assert sweeps[0][0].timestamp == START
+
+
+def test_sweep_latencies_percentiles() -> None:
+    runs = [
+        make_run(
+            RUST,
+            GPT,
+            None,
+            timestamp=START + timedelta(seconds=i),
+            execution_time_seconds=i + 1,
+        )
+        for i in range(100)
+    ]
+    runs += [
+        make_run(
+            RUST,
+            CLAUDE,
+            None,
+            timestamp=START + timedelta(seconds=i),
+            execution_time_seconds=2.0,
+        )
+        for i in range(10)
+    ]
+
+    gpt, claude = sorted(sweep_latencies(runs), key=lambda s: s.llm, reverse=True)
+    assert gpt.llm == "openai/gpt-4o-mini"
+    assert gpt.stats.count == 100
+    assert gpt.stats.p50 == pytest.approx(50.5)
+    assert gpt.stats.p95 == pytest.approx(95.05)
+    assert gpt.stats.p99 == pytest.approx(99.01)
+    assert gpt.stats.max == 100
+    assert claude.stats.p99 == 2.0
+    assert gpt.sweep_started_at == claude.sweep_started_at == START
+
+
+def test_history_round_trip_and_merge(tmp_path: Path) -> None:
+    path = tmp_path / "latency.json"
+    assert load_latency_history(path) == []
+
+    save_latency_history(path, [_sweep("a", 0, 1.0), _sweep("a", 1, 1.0)])
+    merged = merge_latency_history(load_latency_history(path), [_sweep("a", 1, 2.0)])
+    save_latency_history(path, merged)
+
+    history = load_latency_history(path)
+    assert len(history) == 2
+    assert history[-1].stats.p95 == 2.0
+
+
+def test_detect_regressions() -> None:
+    history = [
+        _sweep("stable", 0, 2.0),
+        _sweep("stable", 1, 2.2),
+        _sweep("stable", 2, 2.1),
+        _sweep("slower", 0, 2.0),
+        _sweep("slower", 1, 2.0),
+        _sweep("slower", 2, 3.0),
+        # Too few runs in the latest sweep to be trusted
+        _sweep("noisy", 0, 1.0),
+        _sweep("noisy", 1, 9.0, count=3),
+        # A single sweep has nothing to compare to
+        _sweep("new", 2, 50.0),
+    ]
+
+    (regression,) = detect_regressions(history, threshold=0.25)
+    assert regression.llm == "slower"
+    assert regression.baseline == 2.0
+    assert regression.current == 3.0
+    assert regression.change == pytest.approx(0.5)
+
+    assert detect_regressions(history, threshold=0.6) == []
+    with pytest.raises(ValueError):
+        detect_regressions(history, percentile="p90")
+    with pytest.raises(ValueError):
+        # An empty baseline would have no median
+        detect_regressions(history, baseline_sweeps=0)
@@ -0,0 +1,96 @@
+"""Tests for the columnar metrics engine."""
+
+from datetime import datetime, UTC
+
+import numpy as np
+import pytest
+
+from llm_lib_lag.evaluation import evaluate_runs
+from llm_lib_lag.metrics import build_run_frame, compute_metrics
+from llm_lib_lag.models import (
+    Language,
+    LLMConfig,
+    LibraryIdentifier,
+    PackageManager,
+    TechVersionGroundTruth,
+)
+
+from .factories import make_run
+
+FASTAPI = TechVersionGroundTruth(
+    tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi"),
+    version="0.115.8",
+)
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.85.0")
+
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+CLAUDE = LLMConfig(provider="anthropic", model="claude-3-5-haiku-20241022")
+
+
+def test_match_flags() -> None:
+    """Exact, major and minor matches are computed from parsed versions."""
+    frame = build_run_frame(
+        [
+            make_run(FASTAPI, GPT, "0.115.8"),
+            make_run(FASTAPI, CLAUDE, "0.110.0", lag_days=120),
+            make_run(RUST, GPT, "1.85"),  # same version, different spelling
+            make_run(RUST, CLAUDE, None),
+        ]
+    )
+    assert frame.exact.tolist() == [True, False, True, False]
+    assert frame.major.tolist() == [True, True, True, False]
+    assert frame.minor.tolist() == [True, False, True, False]
+    assert frame.lag_days[1] == 120
+
+
+def test_unparsable_version_counts_as_miss() -> None:
+    frame = build_run_frame([make_run(FASTAPI, GPT, "not-a-version", lag_days=3)])
+    assert not frame.exact[0] and not frame.major[0] and not frame.minor[0]
+    # The stored lag of an unparsable answer is not trusted
+    assert np.isnan(frame.lag_days[0])
+
+
+def test_only_latest_run_per_key_is_kept() -> None:
+    old = make_run(FASTAPI, GPT, "0.100.0", timestamp=datetime(2025, 1, 1, tzinfo=UTC))
+    new = make_run(FASTAPI, GPT, "0.115.8", timestamp=datetime(2025, 2, 1, tzinfo=UTC))
+
+    report = compute_metrics([new, old])
+
+    assert report.input_runs == 2
+    assert report.overall.total_runs == 1
+    assert report.overall.exact_matches == 1
+
+
+def test_grouped_aggregates() -> None:
+    runs = [
+        make_run(FASTAPI, GPT, "0.115.0", lag_days=10, execution_time_seconds=1.0),
+        make_run(RUST, GPT, "1.80.0", lag_days=200, execution_time_seconds=3.0),
+        make_run(FASTAPI, CLAUDE, "0.115.8", lag_days=0, execution_time_seconds=2.0),
+        make_run(RUST, CLAUDE, None, execution_time_seconds=2.0),
+    ]
+
+    report = compute_metrics(runs)
+
+    assert report.overall.total_runs == 4
+    assert report.overall.exact_matches == 1
+    assert report.overall.minor_matches == 2
+    assert report.overall.avg_execution_time == pytest.approx(2.0)
+
+    gpt = report.by_llm["openai/gpt-4o-mini"]
+    assert gpt.total_runs == 2
+    assert gpt.avg_execution_time == pytest.approx(2.0)
+    assert gpt.lag is not None
+    assert gpt.lag.mean == pytest.approx(105.0)
+    assert gpt.lag.median == pytest.approx(105.0)
+    assert gpt.lag.max == 200
+
+    rust = report.by_tech["rust"]
+    assert rust.lag is not None and rust.lag.count == 1
+    assert report.by_tech["fastapi"].exact_match_rate == pytest.approx(0.5)
+
+
+def test_evaluate_runs_returns_report() -> None:
+    assert evaluate_runs([]) is None
+    report = evaluate_runs([make_run(FASTAPI, GPT, "0.115.8")])
+    assert report is not None
+    assert report.overall.exact_matches == 1
@@ -0,0 +1,134 @@
+"""Tests for the Prometheus metrics and their exporters."""
+
+from pathlib import Path
+
+import pytest
+import requests
+
+from llm_lib_lag.fake_registry import FakeRegistry
+from llm_lib_lag.fetchers import fetch_latest_version_and_date
+from llm_lib_lag.fetchers.http import get_session, set_registry_endpoints
+from llm_lib_lag.models import LibraryIdentifier, PackageManager
+from llm_lib_lag.monitoring import (
+    FETCH_CACHE,
+    NONEXISTENT_VERSIONS,
+    PARSE_FAILURES,
+    QUEUE_DEPTH,
+    REGISTRY_REQUESTS,
+    RUNS,
+    THROUGHPUT,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    TextfileExporter,
+    record_run,
+    serve_metrics,
+)
+from llm_lib_lag.run_writer import RunWriter
+
+
+def test_text_exposition_format() -> None:
+    registry = MetricsRegistry()
+    runs = Counter("runs_total", "Runs", ("model",), registry=registry)
+    depth = Gauge("queue_depth", "Depth", registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency", ("model",), buckets=(0.5, 1.0), registry=registry
+    )
+
+    runs.inc(model='gpt "4"')
+    runs.inc(2, model='gpt "4"')
+    depth.set_function(lambda: 7)
+    for value in (0.2, 0.7, 3.0):
+        latency.observe(value, model="m")
+
+    assert registry.render() == (
+        "# HELP runs_total Runs\n"
+        "# TYPE runs_total counter\n"
+        'runs_total{model="gpt \\"4\\""} 3\n'
+        "# HELP queue_depth Depth\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 7\n"
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{model="m",le="0.5"} 1\n'
+        'latency_seconds_bucket{model="m",le="1"} 2\n'
+        'latency_seconds_bucket{model="m",le="+Inf"} 3\n'
+        'latency_seconds_sum{model="m"} 3.9\n'
+        'latency_seconds_count{model="m"} 3\n'
+    )
+
+
+def test_labels_must_match() -> None:
+    counter = Counter("c_total", "C", ("a",), registry=MetricsRegistry())
+    with pytest.raises(ValueError):
+        counter.inc(b="x")
+    with pytest.raises(ValueError):
+        counter.inc(-1, a="x")
+
+
+def test_record_run() -> None:
+    labels = {"provider": "simulated", "model": "monitoring-test"}
+    record_run(**labels, llm_seconds=0.3, parsed=False, version_exists=None)
+    record_run(**labels, llm_seconds=0.4, parsed=True, version_exists=False)
+
+    assert RUNS.value(**labels) == 2
+    assert PARSE_FAILURES.value(**labels) == 1
+    assert NONEXISTENT_VERSIONS.value(**labels) == 1
+    assert THROUGHPUT.value() > 0
+
+
+def test_registry_requests_and_fetch_cache() -> None:
+    with FakeRegistry() as registry:
+        set_registry_endpoints(registry.endpoints)
+        try:
+            host = registry.url.split("://", 1)[1]
+            before = REGISTRY_REQUESTS.value(host=host, status="200")
+            misses = FETCH_CACHE.value(fetch="fetch.latest", result="miss")
+            fetch_latest_version_and_date(
+                LibraryIdentifier(package_manager=PackageManager.NPM, name="react")
+            )
+        finally:
+            set_registry_endpoints(None)
+            get_session().close()
+
+    assert REGISTRY_REQUESTS.value(host=host, status="200") == before + 1
+    assert FETCH_CACHE.value(fetch="fetch.latest", result="miss") == misses + 1
+
+
+def test_run_writer_queue_depth(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    with RunWriter(path):
+        assert f'file="{path}"' in QUEUE_DEPTH.render()
+        assert QUEUE_DEPTH.value(file=str(path)) == 0
+    assert f'file="{path}"' not in QUEUE_DEPTH.render()
+
+
+def test_textfile_exporter(tmp_path: Path) -> None:
+    registry = MetricsRegistry()
+    counter = Counter("events_total", "Events", registry=registry)
+    path = tmp_path / "metrics.prom"
+
+    exporter = TextfileExporter(path, interval=60, registry=registry).start()
+    counter.inc()
+    exporter.stop()
+
+    assert "events_total 1\n" in path.read_text()
+
+
+def test_http_endpoint() -> None:
+    registry = MetricsRegistry()
+    Counter("events_total", "Events", registry=registry).inc(5)
+    server = serve_metrics(0, registry=registry)
+    try:
+        port = server.server_address[1]
+        response = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "events_total 5" in response.text
+        assert (
+            requests.get(f"http://127.0.0.1:{port}/nope", timeout=5).status_code == 404
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
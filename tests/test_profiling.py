@@ -0,0 +1,94 @@
+"""Tests for the per-phase profiling sessions."""
+
+import json
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+
+from llm_lib_lag.profiling import (
+    OTHER_PHASE,
+    ProfileMode,
+    ProfileSession,
+    active_session,
+    measure_startup,
+    profile_phase,
+)
+
+
+def _busy(seconds: float) -> int:
+    total = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_phase_without_session_is_a_no_op() -> None:
+    assert active_session() is None
+    with profile_phase("anything"):
+        pass
+
+
+def test_deterministic_profile_per_phase(tmp_path: Path) -> None:
+    with ProfileSession(tmp_path, ProfileMode.DETERMINISTIC) as session:
+        assert active_session() is session
+        with profile_phase("run_loading"):
+            _busy(0.02)
+        with profile_phase("metric_aggregation"):
+            _busy(0.01)
+            with profile_phase("nested"):
+                _busy(0.02)
+    assert active_session() is None
+
+    phases = json.loads((tmp_path / "phases.json").read_text())
+    assert {"run_loading", "metric_aggregation", "nested"} <= set(phases)
+    # Time of a nested phase is not charged to its parent
+    assert phases["metric_aggregation"] < phases["nested"]
+
+    stats = pstats.Stats(str(tmp_path / "run_loading.prof"))
+    assert any(func[2] == "_busy" for func in stats.stats)  # type: ignore[attr-defined]
+    summary = (tmp_path / "summary.txt").read_text()
+    assert "== run_loading:" in summary
+    assert "_busy" in summary
+
+
+def test_recorded_phase_is_timed_only(tmp_path: Path) -> None:
+    session = ProfileSession(tmp_path)
+    session.record("startup", 0.5)
+    session.start()
+    session.close()
+
+    assert json.loads((tmp_path / "phases.json").read_text())["startup"] == 0.5
+    assert "(timed only, not profiled)" in (tmp_path / "summary.txt").read_text()
+
+
+def test_sampling_profile(tmp_path: Path) -> None:
+    with ProfileSession(tmp_path, ProfileMode.SAMPLING, sample_interval=0.001):
+        with profile_phase("evaluation_loop"):
+            _busy(0.1)
+
+    collapsed = (tmp_path / "evaluation_loop.collapsed").read_text().splitlines()
+    assert collapsed
+    stack, count = collapsed[0].rsplit(" ", 1)
+    assert "_busy" in stack
+    assert int(count) > 0
+    assert "evaluation_loop" in (tmp_path / "summary.txt").read_text()
+    assert OTHER_PHASE in json.loads((tmp_path / "phases.json").read_text())
+
+
+def test_runner_imports_no_provider_integration() -> None:
+    profile = measure_startup("llm_lib_lag.runner", args=None, repeat=1)
+
+    assert profile.seconds >= profile.interpreter_seconds > 0
+    assert "llm_lib_lag" in profile.modules
+    providers = {"langchain", "langchain_community", "openai", "anthropic"}
+    assert not providers & profile.modules
+
+
+def test_cli_help_imports_only_the_cli() -> None:
+    pytest.importorskip("typer")
+    profile = measure_startup(repeat=1)
+
+    assert not {"pydantic", "numpy", "requests", "langchain_core"} & profile.modules
@@ -0,0 +1,113 @@
+"""Tests for as-of queries over release histories."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from llm_lib_lag.evaluation import evaluate_runs
+from llm_lib_lag.models import Language
+from llm_lib_lag.release_history import (
+    ReleaseHistory,
+    get_release_history,
+    ground_truth_as_of,
+    rescore_run,
+    rescore_runs,
+)
+
+from .factories import make_run
+from .test_metrics import CLAUDE, GPT
+
+RUBY_RELEASES = {
+    "3.3.0": date(2023, 12, 25),
+    "3.3.6": date(2024, 11, 5),
+    "3.4.0-rc1": date(2024, 12, 12),
+    "3.4.0": date(2024, 12, 25),
+    "3.4.1": date(2024, 12, 25),
+    "3.3.7": date(2025, 1, 15),
+    "3.2.7": date(2025, 2, 4),
+}
+
+
+@pytest.fixture
+def history() -> ReleaseHistory:
+    return ReleaseHistory(RUBY_RELEASES)
+
+
+@pytest.mark.parametrize(
+    "when,expected",
+    [
+        (date(2023, 12, 24), None),
+        (date(2023, 12, 25), ("3.3.0", date(2023, 12, 25))),
+        (date(2024, 12, 20), ("3.3.6", date(2024, 11, 5))),  # rc is not stable
+        (date(2024, 12, 25), ("3.4.1", date(2024, 12, 25))),
+        (date(2025, 3, 1), ("3.4.1", date(2024, 12, 25))),  # backports don't win
+    ],
+)
+def test_latest_as_of(
+    history: ReleaseHistory, when: date, expected: tuple[str, date] | None
+) -> None:
+    assert history.latest_as_of(when) == expected
+
+
+def test_release_date_accepts_equivalent_spellings(history: ReleaseHistory) -> None:
+    assert history.release_date("3.3") == date(2023, 12, 25)
+    assert history.release_date("v3.4.0-rc1") == date(2024, 12, 12)
+    assert history.release_date("9.9.9") is None
+
+
+def test_ground_truth_as_of(history: ReleaseHistory) -> None:
+    gt = ground_truth_as_of(Language.RUBY, date(2024, 12, 1), history)
+    assert (gt.version, gt.release_date) == ("3.3.6", date(2024, 11, 5))
+    with pytest.raises(ValueError):
+        ground_truth_as_of(Language.RUBY, date(2000, 1, 1), history)
+
+
+def test_rescore_run(history: ReleaseHistory) -> None:
+    gt = ground_truth_as_of(Language.RUBY, date(2025, 3, 1), history)
+    run = make_run(gt, GPT, "3.3.6", lag_days=50)
+
+    rescored = rescore_run(run, date(2024, 12, 1), history)
+
+    assert rescored.ground_truth.version == "3.3.6"
+    assert rescored.lag_days == 0
+    assert rescored.parsed_version_exists
+    assert rescored.output == run.output
+
+    hallucinated = rescore_run(make_run(gt, GPT, "3.5.0"), date(2025, 1, 1), history)
+    assert hallucinated.parsed_version_exists is False
+    assert hallucinated.lag_days is None
+
+
+def test_evaluate_against_per_llm_cutoffs(history: ReleaseHistory) -> None:
+    gt = ground_truth_as_of(Language.RUBY, date(2025, 3, 1), history)
+    runs = [make_run(gt, GPT, "3.3.6"), make_run(gt, CLAUDE, "3.3.6")]
+
+    get_release_history.cache_clear()
+    with patch(
+        "llm_lib_lag.release_history.fetch_release_history",
+        return_value=RUBY_RELEASES,
+    ):
+        report = evaluate_runs(
+            runs, as_of={GPT: date(2024, 12, 1), CLAUDE: date(2025, 1, 1)}
+        )
+    get_release_history.cache_clear()
+
+    assert report is not None
+    assert report.by_llm["openai/gpt-4o-mini"].exact_matches == 1
+    assert report.by_llm["anthropic/claude-3-5-haiku-20241022"].exact_matches == 0
+
+
+def test_failed_history_fetched_once_per_rescore(history: ReleaseHistory) -> None:
+    gt = ground_truth_as_of(Language.RUBY, date(2025, 3, 1), history)
+    runs = [make_run(gt, GPT, "3.3.6"), make_run(gt, CLAUDE, "3.3.6")]
+
+    get_release_history.cache_clear()
+    with patch(
+        "llm_lib_lag.release_history.fetch_release_history",
+        side_effect=ConnectionError("registry down"),
+    ) as fetch:
+        assert rescore_runs(runs, date(2025, 1, 1)) == []
+    get_release_history.cache_clear()
+
+    assert fetch.call_count == 1
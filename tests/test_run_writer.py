@@ -0,0 +1,140 @@
+"""Tests for the background run writer."""
+
+import threading
+from pathlib import Path
+from typing import TextIO
+from unittest.mock import patch
+
+import pytest
+
+from llm_lib_lag.io_utils import load_runs_from_jsonl
+from llm_lib_lag.models import (
+    EvaluationRun,
+    LLMConfig,
+    LibraryIdentifier,
+    PackageManager,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.run_writer import RunWriter, repair_torn_tail
+
+from .factories import make_run
+
+GROUND_TRUTH = TechVersionGroundTruth(
+    tech=LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi"),
+    version="0.115.8",
+)
+
+
+def numbered_run(i: int) -> EvaluationRun:
+    return make_run(
+        GROUND_TRUTH,
+        LLMConfig(provider="openai", model=f"model-{i}"),
+        f"0.{i}.0",
+        execution_time_seconds=0.1,
+    )
+
+
+def test_writes_all_runs_in_order(tmp_path: Path) -> None:
+    """Every queued run ends up in the file, in submission order."""
+    path = tmp_path / "runs.jsonl"
+    runs = [numbered_run(i) for i in range(500)]
+
+    with RunWriter(path, batch_size=64) as writer:
+        for run in runs:
+            writer.write(run)
+
+    assert load_runs_from_jsonl(str(path)) == runs
+
+
+def test_writes_are_batched(tmp_path: Path) -> None:
+    """Runs queued while the writer is busy share a single write call."""
+    path = tmp_path / "runs.jsonl"
+    busy = threading.Event()
+    release = threading.Event()
+    batch_sizes: list[int] = []
+
+    def slow_write(self: RunWriter, file: TextIO, batch: list[str]) -> None:
+        batch_sizes.append(len(batch))
+        busy.set()
+        release.wait()
+
+    with patch.object(RunWriter, "_write_batch", slow_write):
+        with RunWriter(path, batch_size=100, fsync="never") as writer:
+            writer.write(numbered_run(0))
+            busy.wait()
+            for i in range(250):
+                writer.write(numbered_run(i))
+            release.set()
+
+    assert batch_sizes == [1, 100, 100, 50]
+
+
+def test_flush_makes_runs_visible(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    with RunWriter(path, fsync="interval") as writer:
+        writer.write(numbered_run(1))
+        writer.flush()
+        assert len(load_runs_from_jsonl(str(path))) == 1
+
+
+def test_flush_raises_once_the_writer_failed(tmp_path: Path) -> None:
+    def failing_write(self: RunWriter, file: TextIO, batch: list[str]) -> None:
+        raise OSError("disk full")
+
+    with patch.object(RunWriter, "_write_batch", failing_write):
+        writer = RunWriter(tmp_path / "runs.jsonl", poll_interval=0.01)
+        writer.open()
+        writer.write(numbered_run(1))
+        assert writer._thread is not None
+        writer._thread.join(5)
+        # A run queued just as the thread died is never taken
+        writer._queue.put(numbered_run(2).model_dump_json() + "\n")
+        with pytest.raises(RuntimeError):
+            writer.flush()
+        with pytest.raises(RuntimeError):
+            writer.close()
+
+
+def test_unknown_fsync_policy(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        RunWriter(tmp_path / "runs.jsonl", fsync="always")  # type: ignore[arg-type]
+
+
+def test_torn_last_record_is_truncated(tmp_path: Path) -> None:
+    """A partial last line left by a killed process is removed on open."""
+    path = tmp_path / "runs.jsonl"
+    complete = numbered_run(1).model_dump_json() + "\n"
+    torn = numbered_run(2).model_dump_json()[:40]
+    path.write_text(complete + torn)
+
+    assert repair_torn_tail(path) == len(torn)
+    assert path.read_text() == complete
+
+    with RunWriter(path) as writer:
+        writer.write(numbered_run(3))
+
+    assert [run.llm_config.model for run in load_runs_from_jsonl(str(path))] == [
+        "model-1",
+        "model-3",
+    ]
+
+
+def test_complete_last_record_gets_its_newline(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    records = [numbered_run(i).model_dump_json() for i in (1, 2)]
+    path.write_text("\n".join(records))
+
+    assert repair_torn_tail(path) == 0
+    assert path.read_text() == "".join(record + "\n" for record in records)
+
+
+def test_intact_file_is_untouched(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    path.write_text(numbered_run(1).model_dump_json() + "\n")
+    assert repair_torn_tail(path) == 0
+    assert repair_torn_tail(tmp_path / "missing.jsonl") == 0
+
+
+def test_write_requires_open_writer(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        RunWriter(tmp_path / "runs.jsonl").write(numbered_run(1))
@@ -0,0 +1,122 @@
+"""Tests for the run query service."""
+
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import pytest
+import requests
+
+from llm_lib_lag.metrics import compute_metrics
+from llm_lib_lag.models import EvaluationRun
+from llm_lib_lag.server import RunIndex, RunQueryService, serve_runs
+
+from .factories import make_run
+from .test_metrics import CLAUDE, FASTAPI, GPT, RUST
+
+JAN = datetime(2025, 1, 10, tzinfo=UTC)
+FEB = datetime(2025, 2, 10, tzinfo=UTC)
+
+
+def _append(path: Path, *runs: EvaluationRun) -> None:
+    with open(path, "a") as f:
+        for run in runs:
+            f.write(run.model_dump_json() + "\n")
+
+
+@pytest.fixture
+def runs_file(tmp_path: Path) -> Path:
+    path = tmp_path / "runs.jsonl"
+    _append(
+        path,
+        make_run(FASTAPI, GPT, "0.100.0", lag_days=300, timestamp=JAN),
+        make_run(FASTAPI, CLAUDE, "0.110.0", lag_days=100, timestamp=JAN),
+        make_run(RUST, GPT, "1.80.0", lag_days=200, timestamp=FEB),
+    )
+    return path
+
+
+def test_index_matches_full_evaluation(runs_file: Path) -> None:
+    index = RunIndex(runs_file)
+    assert index.refresh() == 3
+
+    # A re-run in February supersedes the January answer
+    rerun = make_run(FASTAPI, GPT, "0.115.8", lag_days=0, timestamp=FEB)
+    _append(runs_file, rerun)
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+
+    report = index.report()
+    assert report is not None
+    expected = compute_metrics(
+        [EvaluationRun.model_validate_json(line) for line in runs_file.open()]
+    )
+    assert report.overall.total_runs == expected.overall.total_runs == 3
+    assert report.overall.exact_matches == expected.overall.exact_matches == 1
+
+
+def test_date_ranges(runs_file: Path) -> None:
+    index = RunIndex(runs_file)
+    index.refresh()
+
+    january = index.report(until=date(2025, 1, 31))
+    assert january is not None
+    assert set(january.by_tech) == {"fastapi"}
+    assert january.overall.total_runs == 2
+    february = index.report(since=date(2025, 2, 1))
+    assert february is not None and set(february.by_tech) == {"rust"}
+    assert index.report(since=date(2026, 1, 1)) is None
+
+
+def test_partial_lines_and_worker_files(runs_file: Path) -> None:
+    index = RunIndex(runs_file)
+    index.refresh()
+    line = make_run(RUST, CLAUDE, "1.85.0", lag_days=0, timestamp=FEB).model_dump_json()
+    worker_file = runs_file.with_name("runs.worker-a.jsonl")
+    worker_file.write_text(line[:20])
+
+    assert index.refresh() == 0
+    worker_file.write_text(line + "\n")
+    assert index.refresh() == 1
+    assert len(index) == 4
+
+
+def test_queries_are_cached_until_runs_land(runs_file: Path) -> None:
+    service = RunQueryService(RunIndex(runs_file), refresh_interval=0)
+
+    status, top = service.query("/lag/top?n=1&statistic=max")
+    assert status == 200
+    assert [row["llm"] for row in top] == ["openai/gpt-4o-mini"]
+    assert service.query("/lag/top?n=1&statistic=max") == (200, top)
+    assert (service.hits, service.misses) == (1, 1)
+
+    _append(runs_file, make_run(RUST, CLAUDE, "1.0.0", lag_days=900, timestamp=FEB))
+    _, top = service.query("/lag/top?n=1&statistic=max")
+    assert [row["llm"] for row in top] == ["anthropic/claude-3-5-haiku-20241022"]
+    assert service.misses == 2
+
+
+def test_invalid_queries(runs_file: Path) -> None:
+    service = RunQueryService(RunIndex(runs_file))
+    assert service.query("/lag/llm?since=yesterday")[0] == 400
+    assert service.query("/lag/top?statistic=min")[0] == 400
+    assert service.query("/lag/top?n=0")[0] == 400
+    assert service.query("/nowhere")[0] == 404
+
+
+def test_http_etags(runs_file: Path) -> None:
+    server = serve_runs(RunQueryService(RunIndex(runs_file)), port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/lag/tech"
+    try:
+        response = requests.get(url, params={"since": "2025-01-01"}, timeout=5)
+        assert response.status_code == 200
+        assert set(response.json()) == {"fastapi", "rust"}
+        assert response.json()["rust"]["lag"]["median"] == pytest.approx(200, rel=0.02)
+
+        headers = {"If-None-Match": response.headers["ETag"]}
+        again = requests.get(
+            url, params={"since": "2025-01-01"}, headers=headers, timeout=5
+        )
+        assert again.status_code == 304 and again.content == b""
+    finally:
+        server.shutdown()
+        server.server_close()
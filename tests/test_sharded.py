@@ -0,0 +1,84 @@
+"""Tests for sharded map-reduce evaluation."""
+
+from datetime import datetime, UTC
+from pathlib import Path
+
+import pytest
+
+from llm_lib_lag.metrics import compute_metrics
+from llm_lib_lag.models import RunStatus
+from llm_lib_lag.sharded import aggregate_shard, evaluate_run_files, plan_shards
+
+from .test_aggregator import sample_runs
+from .factories import make_run
+from .test_metrics import FASTAPI, GPT
+
+
+def _write(path: Path, lines: list[str]) -> None:
+    path.write_text("".join(line + "\n" for line in lines))
+
+
+def test_every_record_read_exactly_once(tmp_path: Path) -> None:
+    runs = sample_runs()
+    path = tmp_path / "runs.jsonl"
+    _write(path, [run.model_dump_json() for run in runs])
+
+    # Tiny shards so that most boundaries fall in the middle of a record
+    shards = plan_shards([path], chunk_bytes=777)
+    assert len(shards) > 10
+    assert sum(aggregate_shard(s).input_runs for s in shards) == len(runs)
+
+
+def test_latest_run_resolved_across_files(tmp_path: Path) -> None:
+    old = make_run(FASTAPI, GPT, "0.100.0", timestamp=datetime(2025, 1, 1, tzinfo=UTC))
+    new = make_run(FASTAPI, GPT, "0.115.8", timestamp=datetime(2025, 2, 1, tzinfo=UTC))
+    # The newer run lives in the first file
+    _write(tmp_path / "runs-a.jsonl", [new.model_dump_json()])
+    _write(tmp_path / "runs-b.jsonl", [old.model_dump_json()])
+
+    report = evaluate_run_files(
+        sorted(tmp_path.glob("runs*.jsonl")), workers=1, chunk_bytes=100
+    )
+    assert report is not None
+    assert report.input_runs == 2
+    assert report.overall.total_runs == 1
+    assert report.overall.exact_matches == 1
+
+
+def test_parallel_matches_single_process(tmp_path: Path) -> None:
+    runs = sample_runs()
+    half = len(runs) // 2
+    _write(tmp_path / "runs-1.jsonl", [r.model_dump_json() for r in runs[:half]])
+    _write(tmp_path / "runs-2.jsonl", [r.model_dump_json() for r in runs[half:]])
+    paths = sorted(tmp_path.glob("runs*.jsonl"))
+
+    report = evaluate_run_files(paths, workers=2, chunk_bytes=4096)
+    expected = compute_metrics(runs)
+    assert report is not None
+
+    assert report.overall.total_runs == expected.overall.total_runs
+    assert report.overall.exact_matches == expected.overall.exact_matches
+    for name, metrics in expected.by_llm.items():
+        assert report.by_llm[name].minor_matches == metrics.minor_matches
+        assert report.by_llm[name].avg_execution_time == pytest.approx(
+            metrics.avg_execution_time
+        )
+
+
+def test_invalid_lines_are_skipped(tmp_path: Path) -> None:
+    path = tmp_path / "runs.jsonl"
+    _write(path, [make_run(FASTAPI, GPT, "0.115.8").model_dump_json(), "{torn"])
+    assert aggregate_shard(plan_shards([path])[0]).input_runs == 1
+
+
+def test_no_completed_run(tmp_path: Path) -> None:
+    empty = tmp_path / "runs-empty.jsonl"
+    empty.touch()
+    assert evaluate_run_files([empty], workers=1) is None
+
+    timed_out = make_run(FASTAPI, GPT, None).model_copy(
+        update={"status": RunStatus.TIMEOUT}
+    )
+    path = tmp_path / "runs-timeouts.jsonl"
+    _write(path, [timed_out.model_dump_json()])
+    assert evaluate_run_files([empty, path], workers=1) is None
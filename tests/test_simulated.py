@@ -0,0 +1,126 @@
+"""Tests for the simulated LLM provider."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from llm_lib_lag.ground_truths import load_ground_truths
+from llm_lib_lag.models import (
+    Language,
+    LLMConfig,
+    SimulationConfig,
+)
+from llm_lib_lag.simulated import (
+    SimulatedChatModel,
+    SimulatedProviderError,
+    SimulatedRateLimitError,
+)
+from llm_lib_lag.versions import VERSION_REGEX, extract_versions
+
+GROUND_TRUTHS = {"React": "19.0.0", "React Native": "0.77.0", "Rust": "1.84.1"}
+INSTANT = dict(latency_ms=0, latency_distribution="constant")
+
+
+def _model(**config: object) -> SimulatedChatModel:
+    return SimulatedChatModel(
+        simulation=SimulationConfig.model_validate({**INSTANT, **config}),
+        ground_truths=GROUND_TRUTHS,
+    )
+
+
+def _ask(model: SimulatedChatModel, name: str) -> str:
+    message = HumanMessage(f"What is the latest stable version of {name}?")
+    return str(model.invoke([message]).content)
+
+
+def test_answer_is_a_single_parseable_version() -> None:
+    model = _model(seed=0)
+    for _ in range(50):
+        output = _ask(model, "Rust")
+        assert output.startswith("<thinking>")
+        assert len(extract_versions(output, VERSION_REGEX)) == 1
+
+
+def test_exact_rate_one_answers_the_ground_truth() -> None:
+    model = _model(exact_rate=1.0, hallucination_rate=0.0, seed=0)
+    assert "<answer>19.0.0</answer>" in _ask(model, "React")
+    # The longest matching name wins
+    assert "<answer>0.77.0</answer>" in _ask(model, "React Native")
+
+
+def test_rates_are_respected() -> None:
+    model = _model(exact_rate=0.5, hallucination_rate=0.2, seed=42)
+    answers = [
+        extract_versions(_ask(model, "Rust"), VERSION_REGEX)[0] for _ in range(400)
+    ]
+    exact = sum(a == "1.84.1" for a in answers) / len(answers)
+    future = sum(int(a.split(".")[0]) > 1 for a in answers) / len(answers)
+    assert 0.4 < exact < 0.6
+    assert 0.12 < future < 0.28
+
+
+def test_seed_makes_answers_reproducible() -> None:
+    first = [_ask(_model(seed=7), "Rust") for _ in range(5)]
+    second = [_ask(_model(seed=7), "Rust") for _ in range(5)]
+    assert first == second
+
+
+def test_error_injection() -> None:
+    with pytest.raises(SimulatedProviderError):
+        _ask(_model(error_rate=1.0), "Rust")
+
+
+def test_rate_limit_injection() -> None:
+    with pytest.raises(SimulatedRateLimitError) as info:
+        _ask(_model(rate_limit_rate=1.0, retry_after_seconds=2.5), "Rust")
+    assert info.value.retry_after == 2.5
+    assert info.value.status_code == 429
+
+
+def test_latency_and_token_rate() -> None:
+    model = _model(latency_ms=50, thinking_tokens=5, tokens_per_second=1000)
+    start = time.perf_counter()
+    message = model.invoke([HumanMessage("Latest version of Rust?")])
+    elapsed = time.perf_counter() - start
+    output_tokens = message.usage_metadata["output_tokens"]  # type: ignore[index]
+    assert elapsed >= 0.05 + output_tokens / 1000
+
+
+def test_simulation_settings_left_out_when_unset() -> None:
+    # Configs of real providers serialize as before simulations existed
+    real = LLMConfig(provider="openai", model="gpt-4o-mini")
+    assert real.model_dump() == {"provider": "openai", "model": "gpt-4o-mini"}
+
+    simulated = LLMConfig(
+        provider="simulated", model="sim", simulation=SimulationConfig(seed=1)
+    )
+    assert simulated.model_dump(mode="json")["simulation"]["seed"] == 1
+    assert LLMConfig.model_validate_json(simulated.model_dump_json()) == simulated
+
+
+def test_runner_with_simulated_provider() -> None:
+    # The runner needs the full langchain install (provider integrations)
+    runner = pytest.importorskip("llm_lib_lag.runner", exc_type=ImportError)
+    llm_config = LLMConfig(
+        provider="simulated",
+        model="sim-test",
+        simulation=SimulationConfig(**INSTANT, exact_rate=1.0, hallucination_rate=0.0),
+    )
+    # The simulated model knows the shipped ground truths
+    ground_truth = next(gt for gt in load_ground_truths() if gt.tech == Language.RUST)
+    prompt = ChatPromptTemplate.from_messages(
+        [("user", "What is the latest stable version of {software_name}?")]
+    )
+    with patch(
+        "llm_lib_lag.runner.fetch_version_date", return_value=ground_truth.release_date
+    ):
+        run = runner.run_single_evaluation(
+            llm_config, ground_truth, prompt, VERSION_REGEX
+        )
+
+    assert run.parsed_version == ground_truth.version
+    assert run.lag_days == 0
+    assert run.llm_config.simulation == llm_config.simulation
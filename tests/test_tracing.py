@@ -0,0 +1,172 @@
+"""Tests for the tracing spans and their JSON Lines export."""
+
+import json
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator
+from unittest.mock import patch
+
+import pytest
+
+from llm_lib_lag.fetchers import fetch_version_date
+from llm_lib_lag.fetchers.snapshot import TechTimeline, use_snapshot, write_snapshot
+from llm_lib_lag.models import (
+    EvaluationRun,
+    Language,
+    LLMConfig,
+    SimulationConfig,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.run_writer import RunWriter
+from llm_lib_lag.tracing import (
+    NOOP_SPAN,
+    configure_tracing,
+    current_span,
+    flush_tracing,
+    get_tracer,
+    tracing_enabled,
+)
+from llm_lib_lag.versions import VERSION_REGEX
+
+tracer = get_tracer(__name__)
+
+RUST = TechVersionGroundTruth(tech=Language.RUST, version="1.84.1")
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / "trace.jsonl"
+    configure_tracing(path)
+    yield path
+    configure_tracing(None)
+
+
+def _spans(path: Path) -> list[dict[str, Any]]:
+    flush_tracing()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_tracing_is_a_no_op(tmp_path: Path) -> None:
+    configure_tracing(None)
+    assert not tracing_enabled()
+    with tracer.start_as_current_span("ignored", {"a": 1}) as span:
+        span.set_attribute("b", 2)
+        assert span is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+
+
+def test_nested_spans_share_a_trace(trace_file: Path) -> None:
+    with tracer.start_as_current_span("outer", {"tech": "react"}) as outer:
+        with tracer.start_as_current_span("inner") as inner:
+            inner.set_attribute("cache.hit", True)
+            assert current_span() is inner
+        assert current_span() is outer
+        assert outer.child_count == 1
+
+    inner_span, outer_span = _spans(trace_file)
+    assert inner_span["name"] == "inner"
+    assert inner_span["trace_id"] == outer_span["trace_id"]
+    assert inner_span["parent_span_id"] == outer_span["span_id"]
+    assert outer_span["parent_span_id"] is None
+    assert outer_span["attributes"] == {"tech": "react"}
+    assert inner_span["attributes"] == {"cache.hit": True}
+    assert outer_span["duration_ms"] >= inner_span["duration_ms"]
+
+
+def test_exception_sets_error_status(trace_file: Path) -> None:
+    with pytest.raises(ValueError):
+        with tracer.start_as_current_span("failing"):
+            raise ValueError("boom")
+
+    (span,) = _spans(trace_file)
+    assert span["status"] == {"code": "ERROR", "description": "ValueError: boom"}
+    assert span["events"][0]["attributes"]["exception.type"] == "ValueError"
+
+
+def test_traced_decorator(trace_file: Path) -> None:
+    @tracer.traced("work")
+    def work(x: int) -> int:
+        return x * 2
+
+    assert work(21) == 42
+    assert [s["name"] for s in _spans(trace_file)] == ["work"]
+
+
+def test_fetcher_spans_mark_snapshot_hits(trace_file: Path, tmp_path: Path) -> None:
+    snapshot = tmp_path / "snapshot.bin"
+    write_snapshot(
+        snapshot,
+        [
+            TechTimeline(
+                tech=Language.RUST,
+                releases={"1.84.1": date(2025, 1, 30)},
+                latest=("1.84.1", date(2025, 1, 30)),
+            )
+        ],
+    )
+    use_snapshot(snapshot)
+    try:
+        assert fetch_version_date(Language.RUST, "1.84.1") == date(2025, 1, 30)
+    finally:
+        use_snapshot(None)
+
+    (span,) = _spans(trace_file)
+    assert span["name"] == "fetch.version_date"
+    assert span["attributes"] == {
+        "tech": "rust",
+        "source": "snapshot",
+        "cache.hit": True,
+    }
+
+
+def test_llm_init_cache_hits_are_per_call(trace_file: Path) -> None:
+    runner = pytest.importorskip("llm_lib_lag.runner", exc_type=ImportError)
+    from langchain_core.prompts import ChatPromptTemplate
+
+    from llm_lib_lag.simulated import SimulatedChatModel
+
+    simulation = SimulationConfig(latency_ms=0, latency_distribution="constant")
+    warm = LLMConfig(provider="simulated", model="warm", simulation=simulation)
+    new = LLMConfig(provider="simulated", model="new", simulation=simulation)
+    prompt = ChatPromptTemplate.from_messages([("user", "{software_name}?")])
+
+    def evaluate(llm_config: LLMConfig) -> None:
+        runner.run_single_evaluation(llm_config, RUST, prompt, VERSION_REGEX)
+
+    def create_while_another_thread_hits(**kwargs: Any) -> SimulatedChatModel:
+        thread = threading.Thread(target=evaluate, args=(warm,))
+        thread.start()
+        thread.join()
+        return SimulatedChatModel(**kwargs)
+
+    with patch("llm_lib_lag.runner.fetch_version_date", return_value=None):
+        evaluate(warm)
+        with patch(
+            "llm_lib_lag.runner.SimulatedChatModel",
+            side_effect=create_while_another_thread_hits,
+        ):
+            evaluate(new)
+
+    hits = [
+        span["attributes"]["cache.hit"]
+        for span in _spans(trace_file)
+        if span["name"] == "llm.init"
+    ]
+    # The other thread's hit does not make the creation of `new` a hit
+    assert hits == [False, True, False]
+
+
+def test_run_writer_spans(trace_file: Path, tmp_path: Path) -> None:
+    run = EvaluationRun(
+        ground_truth=TechVersionGroundTruth(tech=Language.RUST, version="1.84.1"),
+        llm_config=LLMConfig(provider="simulated", model="sim"),
+        execution_time_seconds=0.1,
+        output="<answer>1.84.1</answer>",
+    )
+    with RunWriter(tmp_path / "runs.jsonl") as writer:
+        writer.write(run)
+
+    names = [span["name"] for span in _spans(trace_file)]
+    assert names.count("run_writer.write") == 1
+    assert names.count("run_writer.write_batch") == 1
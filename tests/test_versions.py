@@ -0,0 +1,96 @@
+"""Tests for the shared version parsing helpers."""
+
+import pytest
+
+from llm_lib_lag.versions import (
+    compare_versions,
+    extract_versions,
+    parse_version,
+    version_sort_key,
+    version_spellings,
+)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("<answer>3.12.1</answer>", "3.12.1"),
+        ("<answer> 3.12.1 </answer>", "3.12.1"),
+        (
+            """<answer>
+The latest stable version of pydantic is <version>2.3.3</version>.
+</answer>""",
+            "2.3.3",
+        ),
+        (
+            """</thinking>
+<answer>
+FastAPI version 0.110.0
+</answer>""",
+            "0.110.0",
+        ),
+    ],
+)
+def test_extract_version_from_answer(text: str, expected: str) -> None:
+    assert extract_versions(text) == [expected]
+
+
+def test_equivalent_spellings_count_once() -> None:
+    text = "<answer>1.85</answer> then <answer>1.85.0</answer>"
+    assert extract_versions(text) == ["1.85"]
+    assert extract_versions("<answer>1.85</answer><answer>1.84</answer>") == [
+        "1.85",
+        "1.84",
+    ]
+
+
+@pytest.mark.parametrize(
+    "raw", ["v1.85", "1.85", "1.85.0", " 1.85.0 ", "1.85.0.0", "1.85.0.0.0"]
+)
+def test_canonical_form(raw: str) -> None:
+    parsed = parse_version(raw)
+    assert parsed.canonical == "1.85.0"
+    assert parsed.release == (1, 85, 0)
+
+
+def test_extra_components_kept_unless_zero() -> None:
+    assert parse_version("1.85.0.1").canonical == "1.85.0.1"
+    assert parse_version("1.85.0.0rc1").canonical == "1.85.0rc1"
+    assert compare_versions("1.85.0", "1.85.0.0") == (True, True, True)
+
+
+def test_ruby_preview_is_a_prerelease() -> None:
+    parsed = parse_version("3.4.0-preview2")
+    assert parsed.is_valid
+    assert parsed.release == (3, 4, 0)
+    assert version_sort_key("3.4.0-preview2") < version_sort_key("3.4.0")
+
+
+def test_invalid_version() -> None:
+    parsed = parse_version("latest")
+    assert not parsed.is_valid
+    assert compare_versions("1.0.0", "latest") is None
+    with pytest.raises(ValueError):
+        version_sort_key("latest")
+
+
+def test_parse_is_cached() -> None:
+    assert parse_version("2.10.6") is parse_version("2.10.6")
+
+
+def test_compare_versions() -> None:
+    assert compare_versions("1.85.0", "v1.85") == (True, True, True)
+    assert compare_versions("1.85.0", "1.85.1") == (False, True, True)
+    assert compare_versions("1.85.0", "1.84.0") == (False, True, False)
+    assert compare_versions("1.85.0", "2.0.0") == (False, False, False)
+    assert compare_versions("1.85.0", None) is None
+
+
+def test_version_spellings() -> None:
+    assert version_spellings("1.85") == ("1.85", "1.85.0")
+    assert version_spellings("v3.4.1") == ("3.4.1",)
+    assert version_spellings("19.0.0") == (
+        "19.0.0",
+        "19.0",
+    )
+    assert version_spellings("3.4.0-preview2") == ("3.4.0-preview2",)
@@ -0,0 +1,151 @@
+"""Tests for watch mode, against the local stand-in registry."""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from llm_lib_lag.fake_registry import FakeRegistry, FakeRegistryConfig
+from llm_lib_lag.fetchers import fetch_latest_version_and_date
+from llm_lib_lag.fetchers.fetchers import clear_page_caches
+from llm_lib_lag.fetchers.http import (
+    ResponseCache,
+    get_session,
+    set_registry_endpoints,
+    use_response_cache,
+)
+from llm_lib_lag.ground_truths import load_ground_truths, save_ground_truths
+from llm_lib_lag.models import (
+    Language,
+    LibraryIdentifier,
+    LLMConfig,
+    PackageManager,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.watch import poll, rescore_for_new_release, watch
+from llm_lib_lag.work_queue import PENDING, WorkQueue
+
+from .factories import make_run
+
+AS_OF = date(2025, 2, 1)
+TECHS = [
+    LibraryIdentifier(package_manager=PackageManager.PYPI, name="fastapi"),
+    LibraryIdentifier(package_manager=PackageManager.NPM, name="react"),
+    Language.RUBY,
+]
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+
+
+@pytest.fixture
+def registry() -> Iterator[FakeRegistry]:
+    registry = FakeRegistry(FakeRegistryConfig(as_of=AS_OF)).start()
+    set_registry_endpoints(registry.endpoints)
+    clear_page_caches()
+    try:
+        yield registry
+    finally:
+        use_response_cache(None)
+        set_registry_endpoints(None)
+        get_session().close()
+        registry.stop()
+        clear_page_caches()
+
+
+def _ground_truths() -> list[TechVersionGroundTruth]:
+    return [
+        TechVersionGroundTruth(tech=tech, version=version, release_date=release_date)
+        for tech in TECHS
+        for version, release_date in [fetch_latest_version_and_date(tech)]
+    ]
+
+
+def test_rescore_grows_the_lag() -> None:
+    old = TechVersionGroundTruth(
+        tech=Language.RUST, version="1.84.0", release_date=date(2025, 1, 9)
+    )
+    new = old.model_copy(
+        update={"version": "1.84.1", "release_date": date(2025, 1, 30)}
+    )
+
+    rescored = rescore_for_new_release(
+        make_run(old, GPT, "1.0.0", 100, parsed_version_exists=True), new
+    )
+
+    assert rescored.ground_truth == new
+    assert rescored.lag_days == 121
+    assert rescored.parsed_version == "1.0.0"
+    undated = new.model_copy(update={"release_date": None})
+    assert (
+        rescore_for_new_release(
+            make_run(old, GPT, "1.0.0", 100, parsed_version_exists=True), undated
+        ).lag_days
+        is None
+    )
+
+
+def test_unchanged_registries_are_revalidated(
+    registry: FakeRegistry, tmp_path: Path
+) -> None:
+    path = tmp_path / "ground_truths.json"
+    save_ground_truths(_ground_truths(), path)
+    cache = ResponseCache()
+    use_response_cache(cache)
+
+    for _ in range(2):
+        event = poll(path)
+        assert event.changes == [] and event.failures == []
+
+    # The second poll only got empty 304s
+    assert cache.revalidations == cache.misses == len(TECHS)
+    assert registry.stats().by_status[304] == len(TECHS)
+
+
+def test_fresh_responses_are_reused(registry: FakeRegistry, tmp_path: Path) -> None:
+    path = tmp_path / "ground_truths.json"
+    save_ground_truths(_ground_truths(), path)
+    requests = registry.stats().requests
+
+    watch(path, interval=0, ttl_seconds=60, iterations=3)
+
+    assert registry.stats().requests == requests + len(TECHS)
+
+
+def test_new_releases_update_and_schedule_their_techs(
+    registry: FakeRegistry, tmp_path: Path
+) -> None:
+    path = tmp_path / "ground_truths.json"
+    ground_truths = _ground_truths()
+    save_ground_truths(ground_truths, path)
+    # Rust is not watched: its runs are left alone
+    untracked = TechVersionGroundTruth(tech=Language.RUST, version="1.84.1")
+    runs_file = tmp_path / "runs.jsonl"
+    runs_file.write_text(
+        "".join(
+            make_run(gt, GPT, "1.0.0", 50, parsed_version_exists=True).model_dump_json()
+            + "\n"
+            for gt in [*ground_truths, untracked]
+        )
+    )
+    use_response_cache(ResponseCache())
+    assert poll(path).changes == []
+
+    # Ten days later, every package has one more release
+    registry.config = registry.config.model_copy(
+        update={"as_of": AS_OF + timedelta(days=10), "versions_per_package": 31}
+    )
+    with WorkQueue(tmp_path / "queue.db") as queue:
+        event = poll(path, run_files=[runs_file], queue=queue)
+
+        assert {c.old.tech for c in event.changes} == set(TECHS)
+        assert event.scheduled == len(TECHS)
+        assert queue.counts()[PENDING] == len(TECHS)
+
+    saved = load_ground_truths(path)
+    assert saved == [c.new for c in event.changes]
+    assert all(run.lag_days == 60 for run in event.rescored)
+    assert {run.ground_truth for run in event.rescored} == set(saved)
+
+    # Already up to date: nothing is rescored or scheduled again
+    event = poll(path, run_files=[runs_file])
+    assert event.changes == [] and event.rescored == []
@@ -0,0 +1,204 @@
+"""Tests for the shared work queue of sharded sweeps."""
+
+import threading
+import time
+from pathlib import Path
+
+from llm_lib_lag.concurrency import AdaptiveExecutor
+from llm_lib_lag.models import (
+    EvaluationRun,
+    RunStatus,
+    Language,
+    LLMConfig,
+    TechVersionGroundTruth,
+)
+from llm_lib_lag.work_queue import (
+    DONE,
+    FAILED,
+    LEASED,
+    PENDING,
+    Heartbeat,
+    WorkQueue,
+    drain,
+    sweep_run_files,
+    worker_runs_file,
+)
+
+GPT = LLMConfig(provider="openai", model="gpt-4o-mini")
+CLAUDE = LLMConfig(provider="anthropic", model="claude-3-5-haiku-latest")
+PAIRS = [
+    (llm, TechVersionGroundTruth(tech=tech, version="1.0.0"))
+    for llm in (GPT, CLAUDE)
+    for tech in Language
+]
+
+
+def test_enqueue_ignores_known_tasks(tmp_path: Path) -> None:
+    with WorkQueue(tmp_path / "queue.db") as queue:
+        assert queue.enqueue(PAIRS) == len(PAIRS)
+        assert queue.enqueue(PAIRS[:3]) == 0
+        assert queue.counts()[PENDING] == len(PAIRS)
+
+
+def test_enqueue_requeues_finished_tasks(tmp_path: Path) -> None:
+    with WorkQueue(tmp_path / "queue.db", max_attempts=1) as queue:
+        queue.enqueue(PAIRS[:3])
+        done, failed, leased = queue.claim("w", 3)
+        queue.complete(done, "w")
+        queue.fail(failed, "w", "boom")
+
+        # Finished tasks are only re-run on request
+        assert queue.enqueue(PAIRS[:3]) == 0
+        assert queue.counts() == {PENDING: 0, LEASED: 1, DONE: 1, FAILED: 1}
+        assert queue.enqueue(PAIRS[:3], requeue_finished=True) == 2
+        assert queue.counts() == {PENDING: 2, LEASED: 1, DONE: 0, FAILED: 0}
+        # Attempts start over
+        assert [lease.attempts for lease in queue.claim("w", 3)] == [1, 1]
+
+
+def test_claims_are_exclusive(tmp_path: Path) -> None:
+    path = tmp_path / "queue.db"
+    with WorkQueue(path) as a, WorkQueue(path) as b:
+        a.enqueue(PAIRS)
+        first = a.claim("a", 5)
+        second = b.claim("b", 100)
+
+        assert len(first) == 5
+        assert len(second) == len(PAIRS) - 5
+        assert not {lease.task_id for lease in first} & {
+            lease.task_id for lease in second
+        }
+        assert (first[0].llm_config, first[0].ground_truth) == PAIRS[0]
+        assert b.claim("b", 1) == []
+
+        assert a.complete(first[0], "a")
+        # Only the holder can finish a task
+        assert not b.complete(first[1], "b")
+        assert a.counts() == {PENDING: 0, LEASED: len(PAIRS) - 1, DONE: 1, FAILED: 0}
+
+
+def test_expired_leases_go_to_other_workers(tmp_path: Path) -> None:
+    path = tmp_path / "queue.db"
+    with WorkQueue(path, lease_seconds=0.05) as queue:
+        queue.enqueue(PAIRS[:1])
+        (crashed,) = queue.claim("crashed")
+        assert queue.claim("alive") == []
+
+        time.sleep(0.1)
+        (taken_over,) = queue.claim("alive")
+
+        assert taken_over.task_id == crashed.task_id
+        assert taken_over.attempts == 2
+        assert queue.heartbeat("crashed", [crashed.task_id]) == {crashed.task_id}
+        assert not queue.complete(crashed, "crashed")
+        assert queue.complete(taken_over, "alive")
+
+
+def test_heartbeat_keeps_leases(tmp_path: Path) -> None:
+    with WorkQueue(tmp_path / "queue.db", lease_seconds=0.2) as queue:
+        queue.enqueue(PAIRS[:1])
+        leases = queue.claim("slow")
+        with Heartbeat(queue, "slow", interval=0.05) as heartbeat:
+            heartbeat.hold(leases)
+            time.sleep(0.5)
+            assert queue.claim("other") == []
+        assert not heartbeat.lost
+
+
+def test_failing_task_is_retried_then_failed(tmp_path: Path) -> None:
+    with WorkQueue(tmp_path / "queue.db", max_attempts=2) as queue:
+        queue.enqueue(PAIRS[:1])
+        (lease,) = queue.claim("w")
+        queue.fail(lease, "w", "boom")
+        assert queue.counts()[PENDING] == 1
+
+        (lease,) = queue.claim("w")
+        queue.fail(lease, "w", "boom again")
+        assert queue.counts()[FAILED] == 1
+        assert queue.is_drained()
+
+
+def test_workers_drain_a_sweep_without_duplicates(tmp_path: Path) -> None:
+    path = tmp_path / "queue.db"
+    with WorkQueue(path) as queue:
+        queue.enqueue(PAIRS)
+
+    evaluated: dict[str, list[EvaluationRun]] = {}
+
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        time.sleep(0.005)
+        return EvaluationRun(
+            ground_truth=gt, llm_config=llm, execution_time_seconds=0.005, output=""
+        )
+
+    def worker(worker_id: str) -> None:
+        runs = evaluated.setdefault(worker_id, [])
+        with WorkQueue(path) as queue:
+            executor = AdaptiveExecutor(evaluate, initial_concurrency=2)
+            for outcome in drain(
+                queue, executor, worker_id, batch_size=3, poll_interval=0.01
+            ):
+                assert outcome.run is not None
+                runs.append(outcome.run)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    done = [
+        (run.llm_config, run.ground_truth)
+        for runs in evaluated.values()
+        for run in runs
+    ]
+    assert sorted(map(str, done)) == sorted(map(str, PAIRS))
+    with WorkQueue(path) as queue:
+        assert queue.counts()[DONE] == len(PAIRS)
+
+
+def test_drain_settles_tasks_after_flush(tmp_path: Path) -> None:
+    def evaluate(llm: LLMConfig, gt: TechVersionGroundTruth) -> EvaluationRun:
+        if gt.tech == Language.PYTHON:
+            raise RuntimeError("boom")
+        status = RunStatus.TIMEOUT if gt.tech == Language.RUST else RunStatus.COMPLETED
+        return EvaluationRun(
+            ground_truth=gt,
+            llm_config=llm,
+            execution_time_seconds=0.0,
+            output="",
+            status=status,
+        )
+
+    with WorkQueue(tmp_path / "queue.db", max_attempts=1) as queue:
+        queue.enqueue(PAIRS)
+        flushed: list[dict[str, int]] = []
+        outcomes = drain(
+            queue,
+            AdaptiveExecutor(evaluate),
+            "w",
+            batch_size=len(PAIRS),
+            poll_interval=0.01,
+            flush=lambda: flushed.append(queue.counts()),
+        )
+        assert len(list(outcomes)) == len(PAIRS)
+
+        # Nothing was settled before the runs were flushed
+        assert flushed == [{PENDING: 0, LEASED: len(PAIRS), DONE: 0, FAILED: 0}]
+        # Errors and timeouts are failed, not done
+        assert queue.counts() == {
+            PENDING: 0,
+            LEASED: 0,
+            DONE: len(PAIRS) - 4,
+            FAILED: 4,
+        }
+
+
+def test_worker_run_files(tmp_path: Path) -> None:
+    runs_file = tmp_path / "runs.jsonl"
+    worker_file = worker_runs_file(runs_file, "host-1")
+    assert worker_file == tmp_path / "runs.worker-host-1.jsonl"
+
+    worker_file.touch()
+    (tmp_path / "runs.simulated.jsonl").touch()
+    assert sweep_run_files(runs_file) == [runs_file, worker_file]